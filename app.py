@@ -2,12 +2,26 @@
 STUDENT DROPOUT PREDICTION - STREAMLIT APP
 ===========================================
 Interactive web app for predicting student dropout risk
+
+"Look up scored students" mode reads the nightly risk table built by
+risk_table.py instead of re-scoring.
 """
 
+import time
+_import_start = time.perf_counter()
+
 import streamlit as st
-import pandas as pd
-from pycaret.classification import load_model, predict_model
-import plotly.graph_objects as go
+from model_registry import ModelRouter
+from prediction_cache import PredictionCache
+from prediction_log import default_logger
+from risk_factors import CATEGORIES, describe_student
+from risk_table import RiskTable
+from schema import FEATURE_NAMES, FEATURES, STEM_DEPARTMENTS, validate
+from what_if import SWEEPS, sweep
+
+# plotly and (if no exported scorer exists) pycaret are imported lazily,
+# only once a prediction is actually requested
+_import_seconds = time.perf_counter() - _import_start
 
 # Page config
 st.set_page_config(
@@ -91,44 +105,217 @@ st.markdown("""
 st.markdown('<p class="main-header">🎓 Student Dropout Prediction System</p>', unsafe_allow_html=True)
 st.markdown('<p class="sub-header">AI-Powered Early Warning System for University Student Retention</p>', unsafe_allow_html=True)
 
-# Load model silently
 @st.cache_resource
-def load_trained_model():
-    return load_model('student_dropout_model')
+def startup_timings():
+    """Process-wide cold-start breakdown in seconds (import, load, first predict)."""
+    return {"import": _import_seconds, "load": None, "first_predict": None}
+
+
+def record_timing(stage, seconds):
+    timings = startup_timings()
+    if timings[stage] is None:
+        timings[stage] = seconds
+        print(f" Startup: {stage} took {seconds * 1000:.1f} ms")
+
+
+@st.cache_resource
+def model_router():
+    """Process-wide router to the model versions in the registry (see model_registry.py)."""
+    return ModelRouter()
+
+
+@st.cache_resource
+def prediction_cache():
+    """Process-wide LRU of predictions, shared by every session.
+
+    Cleared whenever the router's aliases (or the model file) change.
+    """
+    return PredictionCache(model_router().watch_path)
+
+
+@st.cache_resource
+def prediction_logger():
+    """Process-wide background writer for the prediction audit log (None if disabled)."""
+    return default_logger()
+
+
+# Load the model that serves this student. Versions are loaded lazily and
+# kept in the router's LRU, so moving an alias swaps models without a restart.
+def load_trained_model(student=None):
+    start = time.perf_counter()
+    model = model_router().model_for(student)
+    record_timing("load", time.perf_counter() - start)
+    return model
+
+# Attributions for the radar, precomputed once per model version (None if the
+# estimator has no attribution method - the rule-based radar is used instead)
+def load_model_explainer(model):
+    try:
+        return model.explainer()
+    except (ValueError, FileNotFoundError) as exc:
+        print(f" Attributions unavailable, using rule-based radar: {exc}")
+        return None
+
+# What-if panel: its widgets rerun only this fragment, and every variant is
+# scored in one batched call
+@st.fragment
+def what_if_panel(student):
+    import numpy as np
+    import plotly.graph_objects as go
+
+    model = load_trained_model(student)
+    features = sorted(SWEEPS)
+    col1, col2 = st.columns(2)
+    x = col1.selectbox("Vary", features, index=features.index("attendance_percentage"),
+                       key="what_if_x")
+    y = col2.selectbox("Against (optional)", ["None"] + [f for f in features if f != x],
+                       key="what_if_y")
+    start = time.perf_counter()
+    axes, probability = sweep(model, student, [x] if y == "None" else [x, y])
+    elapsed = time.perf_counter() - start
+
+    if y == "None":
+        fig = go.Figure(go.Scatter(x=axes[0], y=probability * 100, mode="lines+markers",
+                                   line=dict(color="#1B5E20", width=3), name="Dropout probability"))
+        current = np.flatnonzero(axes[0] == student[x])
+        fig.add_trace(go.Scatter(x=axes[0][current], y=probability[current] * 100, mode="markers",
+                                 marker=dict(size=14, color="#F44336"), name="Current"))
+        high, moderate = model.risk_thresholds(student["department"])
+        fig.add_hline(y=high * 100, line_dash="dash", line_color="#F44336")
+        fig.add_hline(y=moderate * 100, line_dash="dash", line_color="#FF9800")
+        fig.update_layout(xaxis_title=x.replace("_", " ").title(), yaxis_title="Dropout probability (%)",
+                          yaxis_range=[0, 100], showlegend=False, height=400)
+    else:
+        fig = go.Figure(go.Heatmap(x=axes[0], y=axes[1], z=probability.T * 100, zmin=0, zmax=100,
+                                   colorscale="RdYlGn_r", colorbar=dict(title="%")))
+        fig.add_trace(go.Scatter(x=[student[x]], y=[student[y]], mode="markers",
+                                 marker=dict(size=14, color="white", line=dict(color="black", width=2)),
+                                 name="Current"))
+        fig.update_layout(xaxis_title=x.replace("_", " ").title(),
+                          yaxis_title=y.replace("_", " ").title(), showlegend=False, height=450)
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"{probability.size:,} variants scored in one batch in {elapsed * 1000:.0f} ms")
 
 try:
+    cache = prediction_cache()
     model = load_trained_model()
 except:
     st.error(" Model not found! Please run 'python train.py' first.")
     st.stop()
 
+# Lookup mode: students already scored by the nightly job (risk_table.py),
+# fetched from the indexed table instead of re-entered and re-scored
+@st.cache_data
+def risk_table_choices(path, run_id):
+    return RiskTable(path).choices()
+
+def lookup_page(table):
+    st.sidebar.header("🔎 Student Lookup")
+    if not table.exists():
+        st.info(f"👈 No risk table at `{table.path}` yet. Build it with "
+                "`python risk_table.py build <roster.csv>` (e.g. nightly), then look students up here.")
+        return
+    run = table.last_run()
+    if run:
+        st.caption(f"Scores from the {run['mode']} build at {run['started_at']} "
+                   f"({run['students']:,} students from {run['source']})")
+    choices = risk_table_choices(table.path, run["run_id"] if run else None)
+
+    student_id = st.sidebar.text_input("Student ID").strip()
+    if student_id:
+        start = time.perf_counter()
+        record = table.student(student_id)
+        elapsed = time.perf_counter() - start
+        if record is None:
+            st.warning(f"Student `{student_id}` is not in the risk table.")
+        else:
+            card_class = {"HIGH RISK": "high-risk", "MODERATE RISK": "moderate-risk",
+                          "LOW RISK": "low-risk"}[record["risk_level"]]
+            st.markdown(f"""
+                <div class="{card_class}">
+                    <h1 style="margin: 0;"> Student {record['student_id']}: {record['risk_level']}</h1>
+                    <div class="risk-percentage">{record['dropout_probability']*100:.1f}%</div>
+                    <p style="font-size: 1.2rem; margin: 0;">Probability of Dropping Out</p>
+                </div>
+            """, unsafe_allow_html=True)
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Department", record["department"].replace("_", " "))
+            col2.metric("Year", record["year_of_study"])
+            col3.metric("Current CGPA", f"{record['current_cgpa']:.2f}")
+            col4.metric("Attendance", f"{record['attendance_percentage']:.0f}%")
+            st.markdown("### 🔍 Top Contributing Factors")
+            for feature, value in record["top_factors"]:
+                label = feature.replace("_", " ").title()
+                if value is None:
+                    st.markdown(f"⚠️ **{label}**")
+                else:
+                    st.markdown(f"{'🔺' if value > 0 else '🔻'} **{label}**: {value:+.3f}")
+            serving = model_router().model_for(record).version
+            st.caption(f"Scored {record['scored_at']} by model {record['model_version']} "
+                       f"· fetched in {elapsed * 1000:.1f} ms")
+            if record["model_version"] != serving:
+                st.info(f"ℹ️ Model {serving} now serves this department; "
+                        "the score refreshes at the next risk table build.")
+
+    st.markdown("### 🚨 Riskiest Students")
+    col1, col2, col3, col4 = st.columns(4)
+    department = col1.selectbox("Department", ["All"] + choices["department"])
+    year = col2.selectbox("Year", ["All"] + choices["year_of_study"])
+    state = col3.selectbox("State", ["All"] + choices["state_of_origin"])
+    n = col4.number_input("Show", 5, 500, 20, 5)
+    start = time.perf_counter()
+    top = table.top(n, None if department == "All" else department,
+                    None if year == "All" else year, None if state == "All" else state)
+    elapsed = time.perf_counter() - start
+    top["top_factors"] = [", ".join(f for f, _ in factors) for factors in top["top_factors"]]
+    st.dataframe(
+        top.drop(columns=["model_key"]).style.format({"dropout_probability": "{:.1%}",
+                                                      "current_cgpa": "{:.2f}"}),
+        use_container_width=True, hide_index=True,
+    )
+    st.caption(f"{len(top):,} students fetched in {elapsed * 1000:.1f} ms")
+
+mode = st.sidebar.radio("Mode", ["✍️ Assess a student", "🔎 Look up scored students"])
+if mode.startswith("🔎"):
+    lookup_page(RiskTable())
+    st.stop()
+
 # Sidebar - Student Information
+# Option lists and limits come from schema.py; each widget writes straight
+# into the input record
 st.sidebar.header("👤 Student Information")
+input_data = {}
+
+def options(feature):
+    return FEATURES[feature]["values"]
+
+def bounds(feature):
+    return FEATURES[feature]["range"]
 
 # Demographics
 st.sidebar.subheader("📋 Demographics")
-age = st.sidebar.slider("Age", 16, 35, 20)
-gender = st.sidebar.radio("Gender", ['Male', 'Female'])
-state_of_origin = st.sidebar.selectbox(
-    "State of Origin",
-    ['Lagos', 'Kano', 'Rivers', 'Oyo', 'Anambra', 'Kaduna', 
-     'Enugu', 'Ogun', 'Delta', 'Edo', 'Katsina', 'Borno', 
-     'Cross_River', 'Imo', 'Ekiti']
-)
-distance_from_home_km = st.sidebar.slider("Distance from Home (km)", 10, 800, 200)
-marital_status = st.sidebar.radio("Marital Status", ['Single', 'Married'])
-has_children = st.sidebar.checkbox("Has Children")
+input_data['age'] = st.sidebar.slider("Age", *bounds('age'), 20)
+input_data['gender'] = st.sidebar.radio("Gender", options('gender'))
+input_data['state_of_origin'] = st.sidebar.selectbox("State of Origin", options('state_of_origin'))
+input_data['distance_from_home_km'] = st.sidebar.slider(
+    "Distance from Home (km)", *bounds('distance_from_home_km'), 200)
+input_data['marital_status'] = st.sidebar.radio("Marital Status", options('marital_status'))
+input_data['has_children'] = int(st.sidebar.checkbox("Has Children"))
 
 # Academic Background
 st.sidebar.subheader("📚 Academic Background")
-admission_score = st.sidebar.slider("Admission Score (JAMB)", 180, 350, 250)
-secondary_school_type = st.sidebar.radio("Secondary School Type", ['Public', 'Private'])
-secondary_cgpa = st.sidebar.slider("Secondary School CGPA", 2.0, 5.0, 3.5, 0.1)
+input_data['admission_score'] = st.sidebar.slider("Admission Score (JAMB)", *bounds('admission_score'), 250)
+input_data['secondary_school_type'] = st.sidebar.radio("Secondary School Type",
+                                                       options('secondary_school_type'))
+input_data['secondary_cgpa'] = st.sidebar.slider("Secondary School CGPA", *bounds('secondary_cgpa'), 3.5, 0.1)
 
 # Current Academic Status
 st.sidebar.subheader("🎯 Current Academic Status")
-year_of_study = st.sidebar.selectbox("Year of Study", [1, 2, 3, 4, 5])
-current_cgpa = st.sidebar.slider("Current CGPA", 1.5, 5.0, 3.0, 0.1, help="Most important predictor!")
+first_year, final_year = bounds('year_of_study')
+input_data['year_of_study'] = st.sidebar.selectbox("Year of Study", list(range(first_year, final_year + 1)))
+current_cgpa = st.sidebar.slider("Current CGPA", *bounds('current_cgpa'), 3.0, 0.1,
+                                 help="Most important predictor!")
+input_data['current_cgpa'] = current_cgpa
 
 # CGPA status indicator
 if current_cgpa >= 4.5:
@@ -142,153 +329,128 @@ elif current_cgpa >= 2.0:
 else:
     st.sidebar.error("🚨 Below Pass Grade")
 
-course_load_per_semester = st.sidebar.slider("Course Load (Credits)", 12, 30, 18)
-attendance_percentage = st.sidebar.slider("Attendance Percentage", 30, 100, 75)
-number_of_failed_courses = st.sidebar.number_input("Failed Courses", 0, 20, 2)
-number_of_repeated_courses = st.sidebar.number_input("Repeated Courses", 0, 10, 0)
-semester_gpa_trend = st.sidebar.select_slider(
+input_data['course_load_per_semester'] = st.sidebar.slider(
+    "Course Load (Credits)", *bounds('course_load_per_semester'), 18)
+input_data['attendance_percentage'] = st.sidebar.slider(
+    "Attendance Percentage", *bounds('attendance_percentage'), 75)
+input_data['number_of_failed_courses'] = st.sidebar.number_input(
+    "Failed Courses", *bounds('number_of_failed_courses'), 2)
+input_data['number_of_repeated_courses'] = st.sidebar.number_input(
+    "Repeated Courses", *bounds('number_of_repeated_courses'), 0)
+input_data['semester_gpa_trend'] = st.sidebar.select_slider(
     "Semester GPA Trend",
-    options=['Declining', 'Stable', 'Improving'],
+    options=options('semester_gpa_trend'),
     value='Stable'
 )
-previous_warnings = st.sidebar.number_input("Academic Warnings", 0, 5, 0)
-probation_status = st.sidebar.checkbox("Currently on Academic Probation")
+input_data['previous_warnings'] = st.sidebar.number_input(
+    "Academic Warnings", *bounds('previous_warnings'), 0)
+input_data['probation_status'] = int(st.sidebar.checkbox("Currently on Academic Probation"))
 
 # Program Details
 st.sidebar.subheader("🏫 Program Details")
-department = st.sidebar.selectbox(
-    "Department",
-    ['Engineering', 'Medicine', 'Law', 'Science', 'Arts',
-     'Social_Sciences', 'Education', 'Business_Admin',
-     'Agriculture', 'Environmental_Studies']
-)
-program_difficulty = st.sidebar.select_slider(
+input_data['department'] = st.sidebar.selectbox("Department", options('department'))
+input_data['program_difficulty'] = st.sidebar.select_slider(
     "Program Difficulty",
-    options=['Low', 'Moderate', 'High', 'Very_High'],
+    options=options('program_difficulty'),
     value='Moderate'
 )
-is_stem = 1 if department in ['Engineering', 'Medicine', 'Science'] else 0
+input_data['is_stem'] = int(input_data['department'] in STEM_DEPARTMENTS)
 
 # Financial Situation
 st.sidebar.subheader("💰 Financial Situation")
-scholarship_status = st.sidebar.selectbox("Scholarship Status", ['None', 'Partial', 'Full'])
-family_income_level = st.sidebar.selectbox("Family Income Level", ['Low', 'Medium', 'High'])
-fee_payment_status = st.sidebar.selectbox("Fee Payment Status", ['Fully_Paid', 'Partially_Paid', 'Owing'])
-has_part_time_job = st.sidebar.checkbox("Has Part-time Job")
-receives_allowance = st.sidebar.checkbox("Receives Regular Allowance")
-financial_stress_level = st.sidebar.select_slider(
+input_data['scholarship_status'] = st.sidebar.selectbox("Scholarship Status",
+                                                        options('scholarship_status'))
+input_data['family_income_level'] = st.sidebar.selectbox("Family Income Level",
+                                                         options('family_income_level'))
+input_data['fee_payment_status'] = st.sidebar.selectbox("Fee Payment Status",
+                                                        options('fee_payment_status'))
+input_data['has_part_time_job'] = int(st.sidebar.checkbox("Has Part-time Job"))
+input_data['receives_allowance'] = int(st.sidebar.checkbox("Receives Regular Allowance"))
+input_data['financial_stress_level'] = st.sidebar.select_slider(
     "Financial Stress Level",
-    options=['Low', 'Moderate', 'High', 'Very_High'],
+    options=options('financial_stress_level'),
     value='Moderate'
 )
 
 # Academic Engagement
 st.sidebar.subheader("📖 Academic Engagement")
-library_visits_per_week = st.sidebar.slider("Library Visits per Week", 0, 15, 3)
-online_platform_usage_hours = st.sidebar.slider("LMS/E-Learning Hours per Week", 0, 30, 5)
-participation_in_clubs = st.sidebar.checkbox("Participates in Student Clubs")
-has_mentor = st.sidebar.checkbox("Has Academic/Personal Mentor")
-peer_study_groups = st.sidebar.checkbox("Joins Peer Study Groups")
-social_integration_score = st.sidebar.slider("Social Integration Score", 1, 10, 6, help="1=Isolated, 10=Well integrated")
+input_data['library_visits_per_week'] = st.sidebar.slider(
+    "Library Visits per Week", *bounds('library_visits_per_week'), 3)
+input_data['online_platform_usage_hours'] = st.sidebar.slider(
+    "LMS/E-Learning Hours per Week", *bounds('online_platform_usage_hours'), 5)
+input_data['participation_in_clubs'] = int(st.sidebar.checkbox("Participates in Student Clubs"))
+input_data['has_mentor'] = int(st.sidebar.checkbox("Has Academic/Personal Mentor"))
+input_data['peer_study_groups'] = int(st.sidebar.checkbox("Joins Peer Study Groups"))
+input_data['social_integration_score'] = st.sidebar.slider(
+    "Social Integration Score", *bounds('social_integration_score'), 6,
+    help="1=Isolated, 10=Well integrated")
 
 # Support & Wellbeing
 st.sidebar.subheader("🏥 Support & Wellbeing")
-received_academic_counseling = st.sidebar.checkbox("Received Academic Counseling")
-tutoring_sessions_attended = st.sidebar.slider("Tutoring Sessions Attended", 0, 20, 2)
-accommodation_type = st.sidebar.selectbox(
-    "Accommodation Type",
-    ['Campus_Hostel', 'Off_Campus', 'Living_with_Family', 'Private_Hostel']
-)
-health_status = st.sidebar.selectbox("Health Status", ['Excellent', 'Good', 'Fair', 'Poor'])
-stress_level = st.sidebar.select_slider(
+input_data['received_academic_counseling'] = int(st.sidebar.checkbox("Received Academic Counseling"))
+input_data['tutoring_sessions_attended'] = st.sidebar.slider(
+    "Tutoring Sessions Attended", *bounds('tutoring_sessions_attended'), 2)
+input_data['accommodation_type'] = st.sidebar.selectbox("Accommodation Type",
+                                                        options('accommodation_type'))
+input_data['health_status'] = st.sidebar.selectbox("Health Status", options('health_status'))
+input_data['stress_level'] = st.sidebar.select_slider(
     "Stress Level",
-    options=['Low', 'Moderate', 'High', 'Very_High'],
+    options=options('stress_level'),
     value='Moderate'
 )
 
 # Personal Factors
 st.sidebar.subheader(" Personal Factors")
-motivation_level = st.sidebar.select_slider(
+input_data['motivation_level'] = st.sidebar.select_slider(
     "Motivation Level",
-    options=['Very_Low', 'Low', 'Moderate', 'High', 'Very_High'],
+    options=options('motivation_level'),
     value='Moderate'
 )
-career_clarity = st.sidebar.select_slider(
+input_data['career_clarity'] = st.sidebar.select_slider(
     "Career Goal Clarity",
-    options=['Very_Unclear', 'Unclear', 'Somewhat_Clear', 'Clear', 'Very_Clear'],
+    options=options('career_clarity'),
     value='Somewhat_Clear'
 )
-family_support = st.sidebar.select_slider(
+input_data['family_support'] = st.sidebar.select_slider(
     "Family Support Level",
-    options=['Very_Low', 'Low', 'Moderate', 'High', 'Very_High'],
+    options=options('family_support'),
     value='Moderate'
 )
 
 # Predict Button
 if st.sidebar.button("🔍 Assess Dropout Risk", type="primary"):
     
-    # Create input DataFrame with ALL 41 features
-    input_data = pd.DataFrame({
-        'age': [age],
-        'gender': [gender],
-        'state_of_origin': [state_of_origin],
-        'distance_from_home_km': [distance_from_home_km],
-        'marital_status': [marital_status],
-        'has_children': [1 if has_children else 0],
-        'admission_score': [admission_score],
-        'secondary_school_type': [secondary_school_type],
-        'secondary_cgpa': [secondary_cgpa],
-        'year_of_study': [year_of_study],
-        'current_cgpa': [current_cgpa],
-        'course_load_per_semester': [course_load_per_semester],
-        'attendance_percentage': [attendance_percentage],
-        'number_of_failed_courses': [number_of_failed_courses],
-        'number_of_repeated_courses': [number_of_repeated_courses],
-        'semester_gpa_trend': [semester_gpa_trend],
-        'department': [department],
-        'program_difficulty': [program_difficulty],
-        'scholarship_status': [scholarship_status],
-        'family_income_level': [family_income_level],
-        'fee_payment_status': [fee_payment_status],
-        'has_part_time_job': [1 if has_part_time_job else 0],
-        'receives_allowance': [1 if receives_allowance else 0],
-        'financial_stress_level': [financial_stress_level],
-        'library_visits_per_week': [library_visits_per_week],
-        'online_platform_usage_hours': [online_platform_usage_hours],
-        'participation_in_clubs': [1 if participation_in_clubs else 0],
-        'has_mentor': [1 if has_mentor else 0],
-        'peer_study_groups': [1 if peer_study_groups else 0],
-        'social_integration_score': [social_integration_score],
-        'accommodation_type': [accommodation_type],
-        'health_status': [health_status],
-        'stress_level': [stress_level],
-        'received_academic_counseling': [1 if received_academic_counseling else 0],
-        'tutoring_sessions_attended': [tutoring_sessions_attended],
-        'motivation_level': [motivation_level],
-        'career_clarity': [career_clarity],
-        'family_support': [family_support],
-        'previous_warnings': [previous_warnings],
-        'probation_status': [1 if probation_status else 0],
-        'is_stem': [is_stem]
-    })
-    
-    # Make prediction
-    prediction = predict_model(model, data=input_data)
-    dropout_probability = prediction['prediction_score'].values[0]
+    # Input record with ALL 41 features, in schema order
+    input_data = {name: input_data[name] for name in FEATURE_NAMES}
+    problems = validate(input_data).messages()
+    if problems:
+        st.error("⚠️ The student record doesn't match the feature schema:\n\n- " + "\n- ".join(problems))
+        st.stop()
+    
+    # Make prediction - repeat assessments are served from the cache
+    model = load_trained_model(input_data)
+    lookup_start = time.perf_counter()
+    dropout_probability = cache.get(input_data)
+    cached = dropout_probability is not None
+    if not cached:
+        predict_start = time.perf_counter()
+        dropout_probability = float(model.dropout_probability(input_data)[0])
+        record_timing("first_predict", time.perf_counter() - predict_start)
+        cache.put(input_data, dropout_probability)
+    latency_ms = (time.perf_counter() - lookup_start) * 1000
     
     # Determine risk level
-    if dropout_probability >= 0.7:
-        risk_level = "HIGH RISK"
-        card_class = "high-risk"
-        risk_color = "#F44336"
-    elif dropout_probability >= 0.4:
-        risk_level = "MODERATE RISK"
-        card_class = "moderate-risk"
-        risk_color = "#FF9800"
-    else:
-        risk_level = "LOW RISK"
-        card_class = "low-risk"
-        risk_color = "#4CAF50"
+    risk_level = model.risk_level(dropout_probability, input_data["department"])
+    card_class, risk_color = {
+        "HIGH RISK": ("high-risk", "#F44336"),
+        "MODERATE RISK": ("moderate-risk", "#FF9800"),
+        "LOW RISK": ("low-risk", "#4CAF50"),
+    }[risk_level]
+
+    # Audit trail - queued here, written by a background thread
+    if prediction_logger():
+        prediction_logger().log(input_data, dropout_probability, risk_level, model.model_hash,
+                                latency_ms, source="app", cached=cached, model_version=model.version)
     
     # Display Results
     st.markdown("---")
@@ -302,29 +464,13 @@ if st.sidebar.button("🔍 Assess Dropout Risk", type="primary"):
         </div>
     """, unsafe_allow_html=True)
     
-    # Risk Factors Analysis
+    # Risk Factors Analysis - same rule engine used for bulk scoring
+    risk_factors, protective, scores = describe_student(input_data)
+    explainer = load_model_explainer(model)
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("### 🚨 Risk Factors")
-        risk_factors = []
-        
-        if current_cgpa < 2.5:
-            risk_factors.append(f"⚠️ **Low CGPA**: {current_cgpa:.2f} (Below 2.5)")
-        if attendance_percentage < 70:
-            risk_factors.append(f"⚠️ **Poor Attendance**: {attendance_percentage}%")
-        if number_of_failed_courses >= 5:
-            risk_factors.append(f"⚠️ **Many Failures**: {number_of_failed_courses} courses")
-        if fee_payment_status == 'Owing':
-            risk_factors.append("⚠️ **Owing Fees**: Financial barrier")
-        if probation_status:
-            risk_factors.append("⚠️ **On Probation**: Critical academic status")
-        if semester_gpa_trend == 'Declining':
-            risk_factors.append("⚠️ **GPA Declining**: Negative trend")
-        if motivation_level in ['Very_Low', 'Low']:
-            risk_factors.append(f"⚠️ **Low Motivation**: {motivation_level}")
-        if social_integration_score <= 3:
-            risk_factors.append(f"⚠️ **Socially Isolated**: Score {social_integration_score}/10")
         
         if risk_factors:
             for factor in risk_factors:
@@ -334,22 +480,6 @@ if st.sidebar.button("🔍 Assess Dropout Risk", type="primary"):
     
     with col2:
         st.markdown("### 🛡️ Protective Factors")
-        protective = []
-        
-        if current_cgpa >= 3.5:
-            protective.append(f" **Strong CGPA**: {current_cgpa:.2f}")
-        if has_mentor:
-            protective.append(" **Has Mentor**: Support system in place")
-        if scholarship_status == 'Full':
-            protective.append(" **Full Scholarship**: Financial security")
-        if attendance_percentage >= 85:
-            protective.append(f" **Excellent Attendance**: {attendance_percentage}%")
-        if peer_study_groups:
-            protective.append(" **Study Groups**: Peer support")
-        if family_support in ['High', 'Very_High']:
-            protective.append(f" **Strong Family Support**: {family_support}")
-        if social_integration_score >= 7:
-            protective.append(f" **Well Integrated**: Score {social_integration_score}/10")
         
         if protective:
             for factor in protective:
@@ -403,55 +533,18 @@ if st.sidebar.button("🔍 Assess Dropout Risk", type="primary"):
     # Risk Profile Visualization
     st.markdown("### 📊 Risk Profile Breakdown")
     
-    # Calculate risk scores by category
-    categories = ['Academic', 'Financial', 'Engagement', 'Personal', 'Support']
-    
-    # Academic risk
-    academic_risk = 0
-    if current_cgpa < 2.5: academic_risk += 40
-    if number_of_failed_courses > 4: academic_risk += 30
-    if attendance_percentage < 70: academic_risk += 20
-    if semester_gpa_trend == 'Declining': academic_risk += 10
-    
-    # Financial risk
-    financial_risk = 0
-    if fee_payment_status == 'Owing': financial_risk += 40
-    if financial_stress_level in ['High', 'Very_High']: financial_risk += 30
-    if scholarship_status == 'None' and family_income_level == 'Low': financial_risk += 30
-    
-    # Engagement risk
-    engagement_risk = 0
-    if library_visits_per_week < 2: engagement_risk += 25
-    if online_platform_usage_hours < 5: engagement_risk += 25
-    if social_integration_score < 5: engagement_risk += 30
-    if not participation_in_clubs: engagement_risk += 20
-    
-    # Personal risk
-    personal_risk = 0
-    if motivation_level in ['Very_Low', 'Low']: personal_risk += 40
-    if stress_level in ['High', 'Very_High']: personal_risk += 30
-    if family_support in ['Very_Low', 'Low']: personal_risk += 20
-    if career_clarity in ['Very_Unclear', 'Unclear']: personal_risk += 10
-    
-    # Support deficit
-    support_deficit = 100
-    if has_mentor: support_deficit -= 30
-    if received_academic_counseling: support_deficit -= 20
-    if peer_study_groups: support_deficit -= 20
-    if tutoring_sessions_attended > 5: support_deficit -= 30
-    
-    scores = [
-        min(100, academic_risk),
-        min(100, financial_risk),
-        min(100, engagement_risk),
-        min(100, personal_risk),
-        max(0, support_deficit)
-    ]
-    
+    # Radar from the model's own feature attributions when available
+    if explainer is not None:
+        scores = [round(float(s), 1) for s in explainer.category_scores(input_data)[0]]
+        radar_title = "Risk Profile (50 = typical student, higher = pushes toward dropout)"
+    else:
+        radar_title = "Risk Profile (0=Low Risk, 100=High Risk)"
+
     # Create radar chart
+    import plotly.graph_objects as go
     fig = go.Figure(data=go.Scatterpolar(
         r=scores,
-        theta=categories,
+        theta=CATEGORIES,
         fill='toself',
         fillcolor=risk_color,
         opacity=0.6,
@@ -467,12 +560,24 @@ if st.sidebar.button("🔍 Assess Dropout Risk", type="primary"):
             )
         ),
         showlegend=False,
-        title="Risk Profile (0=Low Risk, 100=High Risk)",
+        title=radar_title,
         height=450
     )
     
     st.plotly_chart(fig, use_container_width=True)
-    
+
+    if explainer is not None:
+        with st.expander("🔍 What drove this prediction"):
+            st.caption(f"Contribution of each input to the model's decision ({explainer.units}), "
+                       f"relative to an average student. Positive values raise the dropout risk.")
+            for feature, value in explainer.top_features(input_data, 8)[0]:
+                arrow = "🔺" if value > 0 else "🔻"
+                st.markdown(f"{arrow} **{feature.replace('_', ' ').title()}**: {value:+.3f}")
+    
+    # What-if sweeps around this student
+    st.markdown("### 🔀 What-If Analysis")
+    what_if_panel(input_data)
+
     # Contact Information
     st.markdown("### 📞 Get Help Now")
     
@@ -537,6 +642,38 @@ else:
     
     st.success("🚀 **This system helps save students before it's too late!**")
 
+# Cold-start report for this server process
+with st.sidebar.expander("⏱️ Startup Timings"):
+    for stage, seconds in startup_timings().items():
+        label = stage.replace("_", " ").title()
+        st.write(f"**{label}**: " + ("-" if seconds is None else f"{seconds * 1000:.1f} ms"))
+
+with st.sidebar.expander("🗄️ Prediction Cache"):
+    stats = cache.stats()
+    st.write(f"**Entries**: {stats['size']} / {stats['maxsize']} (TTL {stats['ttl']:.0f}s)")
+    st.write(f"**Hits / Misses**: {stats['hits']} / {stats['misses']} ({stats['hit_rate']:.0%} hit rate)")
+    st.write(f"**Model**: `{stats['model_hash']}` ({stats['invalidations']} invalidations)")
+
+with st.sidebar.expander("📦 Models"):
+    router_stats = model_router().stats()
+    if router_stats["registry"]:
+        st.write(f"**Registry**: `{router_stats['registry']}` (serving `{router_stats['alias']}`)")
+        for alias, version in sorted(router_stats["aliases"].items()):
+            st.write(f"- `{alias}` → {version}")
+        if router_stats["canary_share"]:
+            st.write(f"**Canary share**: {router_stats['canary_share']:.0%}")
+    else:
+        st.write("**Registry**: none - serving the student_dropout_* files")
+    st.write(f"**Loaded**: {len(router_stats['loaded'])} / {router_stats['max_loaded']} "
+             f"({router_stats['swaps']} swaps, {router_stats['evictions']} evictions)")
+
+if prediction_logger():
+    with st.sidebar.expander("📝 Prediction Log"):
+        log_stats = prediction_logger().stats()
+        st.write(f"**File**: `{log_stats['path']}`")
+        st.write(f"**Written / Dropped**: {log_stats['written']} / {log_stats['dropped']}")
+        st.write(f"**Rotations**: {log_stats['rotations']}")
+
 # Footer
 st.markdown("---")
 st.markdown("""
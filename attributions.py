@@ -0,0 +1,507 @@
+"""
+STUDENT DROPOUT PREDICTION - FEATURE ATTRIBUTIONS
+==================================================
+Per-student explanations of what the saved model actually learned.
+
+Every prediction is split into one contribution per input feature, measured
+against a background of real students:
+
+    tree ensembles   exact TreeSHAP (AdaBoost, gradient boosting, random /
+                     extra trees, decision trees; LightGBM via its own
+                     pred_contrib)
+    linear models    coefficient x (standardized value - background mean)
+
+Contributions are in the model's decision units (log-odds for boosting and
+linear models, probability for forests) and add up exactly to the student's
+decision minus the background average. One-hot columns are summed back into
+their source feature, and features into the five radar categories.
+
+Everything that depends only on the model - node covers from the background
+students, expected values, the column -> feature -> category maps and the
+radar scale - is precomputed once and saved next to the model with the
+checksum of the student_dropout_model.pkl it came from. A stale file is
+rebuilt on load. Explaining is then vectorized over any number of students.
+
+Usage:
+    python attributions.py export     # student_dropout_model.pkl -> student_dropout_explainer.pkl
+    python attributions.py check      # additivity against the model on the dataset
+    python attributions.py show --row 12
+"""
+
+import argparse
+import math
+import os
+import pickle
+import warnings
+
+import numpy as np
+
+from inference import MODEL_NAME, SCORER_PATH, TARGET, DropoutScorer
+from risk_factors import CATEGORIES
+
+EXPLAINER_PATH = "student_dropout_explainer.pkl"
+FORMAT_VERSION = 1
+DATA_PATH = "student_dropout_dataset.csv"
+BACKGROUND_ROWS = 1000
+SEED = 42
+# |category contribution| that maps to the edge of the radar (0 or 100),
+# measured on the first SCALE_ROWS background students
+SCALE_PERCENTILE = 95
+SCALE_ROWS = 250
+# Elements per (rows x leaves x path) block in the TreeSHAP loop
+LEAF_TABLE_BUDGET = 4_000_000
+
+# Input feature -> radar category
+FEATURE_CATEGORIES = {
+    'Academic': [
+        'admission_score', 'secondary_cgpa', 'secondary_school_type', 'current_cgpa',
+        'semester_gpa_trend', 'year_of_study', 'department', 'program_difficulty', 'is_stem',
+        'course_load_per_semester', 'attendance_percentage', 'number_of_failed_courses',
+        'number_of_repeated_courses', 'previous_warnings', 'probation_status',
+    ],
+    'Financial': [
+        'scholarship_status', 'family_income_level', 'fee_payment_status',
+        'financial_stress_level', 'has_part_time_job', 'receives_allowance',
+    ],
+    'Engagement': [
+        'library_visits_per_week', 'online_platform_usage_hours', 'participation_in_clubs',
+        'social_integration_score', 'accommodation_type', 'distance_from_home_km',
+    ],
+    'Personal': [
+        'age', 'gender', 'state_of_origin', 'marital_status', 'has_children', 'health_status',
+        'stress_level', 'motivation_level', 'career_clarity', 'family_support',
+    ],
+    'Support': [
+        'has_mentor', 'peer_study_groups', 'received_academic_counseling',
+        'tutoring_sessions_attended',
+    ],
+}
+
+
+def _pipeline_hash(model_name=MODEL_NAME):
+    from train_cache import file_hash
+    path = f"{model_name}.pkl"
+    return file_hash(path) if os.path.exists(path) else None
+
+
+# ---- TreeSHAP ----------------------------------------------------------------
+# Exact path-dependent TreeSHAP (Lundberg et al.), organised around leaves so
+# that it vectorizes. Along the path to a leaf with value v, each distinct
+# feature j has a zero fraction z_j (the share of background cover that
+# follows the path's splits on j) and a one fraction o_j(x) (1 if x satisfies
+# them, else 0). Feature i then receives
+#
+#     v * (o_i - z_i) * sum_k k! (D-k-1)! / D! * [t^k] prod_{j != i} (z_j + o_j t)
+#
+# Leaves of all trees with the same path length D go through the same few
+# array operations together.
+
+def _leaf_paths(tree, values, cover):
+    """(path, value) per leaf; path maps feature -> (zero fraction, lower, upper)."""
+    t = tree.tree_
+    leaves, stack = [], [(0, {})]
+    while stack:
+        node, path = stack.pop()
+        left, right = t.children_left[node], t.children_right[node]
+        if left == -1:
+            leaves.append((path, values[node]))
+            continue
+        f, threshold = t.feature[node], t.threshold[node]
+        zero, lower, upper = path.get(f, (1.0, -np.inf, np.inf))
+        stack.append((left, {**path, f: (zero * cover[left] / cover[node], lower, min(upper, threshold))}))
+        stack.append((right, {**path, f: (zero * cover[right] / cover[node], max(lower, threshold), upper)}))
+    return leaves
+
+
+def _leaf_table(pairs, background):
+    """Padded per-leaf path arrays for every tree, and the summed expected value.
+
+    Cover is the number of background students reaching each node, plus one
+    pseudo-student spread by the tree's own training weights so no branch
+    ever has zero cover.
+    """
+    paths, leaf_values, expected = [], [], 0.0
+    for tree, values in pairs:
+        t = tree.tree_
+        reached = np.asarray(tree.decision_path(background).sum(axis=0)).ravel()
+        cover = reached + t.weighted_n_node_samples / t.weighted_n_node_samples[0]
+        leaf = t.children_left == -1
+        expected += float(np.sum(cover[leaf] * values[leaf]) / cover[0])
+        for path, value in _leaf_paths(tree, values, cover):
+            paths.append(path)
+            leaf_values.append(value)
+
+    # Shortest paths first, so each path length is one contiguous block
+    order = sorted(range(len(paths)), key=lambda i: len(paths[i]))
+    paths = [paths[i] for i in order]
+    leaf_values = [leaf_values[i] for i in order]
+    depth = max(1, max(len(path) for path in paths))
+    table = {
+        "length": np.array([len(path) for path in paths], dtype=np.int32),
+        "feature": np.zeros((len(paths), depth), dtype=np.int32),
+        "zero": np.ones((len(paths), depth)),
+        "lower": np.full((len(paths), depth), -np.inf),
+        "upper": np.full((len(paths), depth), np.inf),
+        "value": np.asarray(leaf_values, dtype=np.float64),
+    }
+    for i, path in enumerate(paths):
+        for j, (f, (zero, lower, upper)) in enumerate(path.items()):
+            table["feature"][i, j] = f
+            table["zero"][i, j] = zero
+            table["lower"][i, j] = lower
+            table["upper"][i, j] = upper
+    return table, expected
+
+
+def _path_shap(feature, zero, lower, upper, value, x):
+    """(rows x leaves x D) contributions of leaves whose paths all have length D."""
+    n_leaves, depth = feature.shape
+    weights = np.array([math.factorial(k) * math.factorial(depth - k - 1) / math.factorial(depth)
+                        for k in range(depth)])
+    x = x[:, feature]
+    inside = (x > lower) & (x <= upper)
+    if depth == 1:
+        # Single split (e.g. boosted stumps): leaf value times (o - z)
+        return np.where(inside, value[:, None] * (1 - zero), -value[:, None] * zero)
+    one = inside.astype(np.float64)
+
+    # Coefficients (lowest power first) of prod_j (z_j + o_j t)
+    poly = np.zeros(x.shape[:2] + (depth + 1,))
+    poly[..., 0] = 1.0
+    for j in range(depth):
+        shifted = poly[..., :-1] * one[..., j, None]
+        poly *= zero[:, j, None]
+        poly[..., 1:] += shifted
+
+    contribution = np.empty(x.shape)
+    for i in range(depth):
+        z = zero[:, i]
+        # Divide out (z_i + t) when o_i = 1: synthetic division from the top
+        q = poly[..., depth]
+        hot = weights[depth - 1] * q
+        for k in range(depth - 2, -1, -1):
+            q = poly[..., k + 1] - z * q
+            hot += weights[k] * q
+        # ... or the constant z_i when o_i = 0
+        cold = (poly[..., :depth] @ weights) / z
+        contribution[..., i] = value * (one[..., i] - z) * np.where(one[..., i] == 1, hot, cold)
+    return contribution
+
+
+def _tree_shap(table, X, columns):
+    """(rows x model columns) SHAP values of the trees in ``table``.
+
+    ``columns`` is the sparse (leaves*D x model columns) map from path slots
+    to the column they split on. Leaves are grouped by path length so short
+    paths are not padded to the deepest one.
+    """
+    feature, lengths = table["feature"], table["length"]
+    n_leaves, depth = feature.shape
+    groups = [(length, slice(*np.searchsorted(lengths, [length, length + 1])))
+              for length in np.unique(lengths) if length > 0]
+    chunk = max(1, LEAF_TABLE_BUDGET // (n_leaves * (depth + 1)))
+    out = []
+    for start in range(0, len(X), chunk):
+        x = X[start:start + chunk]
+        contribution = np.zeros((len(x), n_leaves, depth))
+        for length, leaves in groups:
+            contribution[:, leaves, :length] = _path_shap(
+                feature[leaves, :length], table["zero"][leaves, :length],
+                table["lower"][leaves, :length], table["upper"][leaves, :length],
+                table["value"][leaves], x)
+        out.append(np.asarray((columns.T @ contribution.reshape(len(x), -1).T).T))
+    return np.vstack(out) if out else np.empty((0, columns.shape[1]))
+
+
+# ---- precomputation ------------------------------------------------------------
+
+def _leaf_values(estimator):
+    """(tree, per-node decision contribution) pairs and the output units."""
+    from sklearn.ensemble import (AdaBoostClassifier, ExtraTreesClassifier,
+                                  GradientBoostingClassifier, RandomForestClassifier)
+    from sklearn.tree import DecisionTreeClassifier
+
+    positive = list(estimator.classes_).index(1)
+    if isinstance(estimator, AdaBoostClassifier):
+        # Same leaf scores as model_artifact: the binary decision is their
+        # positive-minus-negative difference over the total estimator weight
+        from model_artifact import _flatten_estimator
+        trees = estimator.estimators_
+        arrays = {}
+        _flatten_estimator(estimator, arrays)
+        score = arrays["adaboost.node_score"]
+        score = (score[:, positive] - score[:, 1 - positive]) / np.sum(estimator.estimator_weights_)
+        bounds = np.cumsum([0] + [tree.tree_.node_count for tree in trees])
+        return [(tree, score[a:b]) for tree, a, b in zip(trees, bounds[:-1], bounds[1:])], "log-odds"
+    if isinstance(estimator, GradientBoostingClassifier):
+        rate = estimator.learning_rate
+        sign = 1.0 if positive == 1 else -1.0
+        return [(tree, sign * rate * tree.tree_.value[:, 0, 0])
+                for tree in estimator.estimators_[:, 0]], "log-odds"
+    if isinstance(estimator, (RandomForestClassifier, ExtraTreesClassifier, DecisionTreeClassifier)):
+        trees = getattr(estimator, "estimators_", [estimator])
+        pairs = []
+        for tree in trees:
+            counts = tree.tree_.value[:, 0, :]
+            pairs.append((tree, counts[:, positive] / counts.sum(axis=1) / len(trees)))
+        return pairs, "probability"
+    return None, None
+
+
+def _column_features(scorer):
+    """(model columns x input features) 0/1 matrix: which feature each column encodes."""
+    position = {name: i for i, name in enumerate(scorer.feature_names)}
+    output = {name: i for i, name in enumerate(scorer.output_columns)}
+    matrix = np.zeros((len(scorer.output_columns), len(scorer.feature_names)))
+    for feature in scorer.numeric_features:
+        matrix[output[feature], position[feature]] = 1.0
+    for feature, (kind, _, values) in scorer.encoders.items():
+        columns = [values[0]] if kind == "ordinal" else values
+        matrix[np.asarray(columns, dtype=int), position[feature]] = 1.0
+    return matrix
+
+
+def _feature_categories(feature_names):
+    """(input features x categories) 0/1 matrix."""
+    matrix = np.zeros((len(feature_names), len(CATEGORIES)))
+    for j, category in enumerate(CATEGORIES):
+        for feature in FEATURE_CATEGORIES[category]:
+            if feature in feature_names:
+                matrix[feature_names.index(feature), j] = 1.0
+    return matrix
+
+
+def background_students(data_path=DATA_PATH, rows=BACKGROUND_ROWS, seed=SEED):
+    """Fixed random sample of the training students, features only."""
+    from data_io import drop_invalid, load_students
+    data, _ = drop_invalid(load_students(data_path).fillna({"scholarship_status": "None"}))
+    data = data.sample(min(rows, len(data)), random_state=seed)
+    data["scholarship_status"] = data["scholarship_status"].astype(object).fillna("None")
+    return data.drop(columns=[TARGET])
+
+
+class Explainer:
+    """Vectorized feature attributions for one saved model.
+
+    ``explain(X)`` takes anything the scorers accept (DataFrame, dict or
+    list of dicts) and returns a (rows x features) array of contributions.
+    """
+
+    def __init__(self, state, scorer):
+        self.state = state
+        self.scorer = scorer
+        self.feature_names = state["feature_names"]
+        self.units = state["units"]
+        self.expected_value = state["expected_value"]
+        self.category_scale = state.get("category_scale")
+        self._column_features = state["column_features"]
+        self._feature_categories = state["feature_categories"]
+        self._linear = state.get("linear")
+        self._leaves = state.get("leaves")
+        self._booster = state.get("booster")
+        if self._leaves is not None:
+            from scipy import sparse
+            slots = self._leaves["feature"].ravel()
+            self._slot_columns = sparse.csr_matrix(
+                (np.ones(len(slots)), (np.arange(len(slots)), slots)),
+                shape=(len(slots), len(self._column_features)))
+
+    @classmethod
+    def build(cls, scorer, background, pipeline_sha256=None):
+        """Precompute everything that depends only on the model and the background."""
+        estimator = scorer.estimator
+        Z = scorer.transform(background)
+        state = {
+            "format_version": FORMAT_VERSION,
+            "pipeline_sha256": pipeline_sha256,
+            "feature_names": list(scorer.feature_names),
+            "column_features": _column_features(scorer),
+            "feature_categories": _feature_categories(list(scorer.feature_names)),
+            "background_rows": len(Z),
+        }
+        pairs, units = _leaf_values(estimator)
+        if pairs is not None:
+            Z32 = Z.astype(np.float32)
+            state["leaves"], expected = _leaf_table(pairs, Z32)
+            state["trees"] = len(pairs)
+            base = 0.0
+            if hasattr(estimator, "init_") and units == "log-odds":
+                with warnings.catch_warnings():
+                    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+                    base = float(estimator._raw_predict_init(Z32[:1])[0, 0])
+                base *= 1.0 if list(estimator.classes_).index(1) == 1 else -1.0
+            state["expected_value"] = base + expected
+        elif type(estimator).__name__ == "LGBMClassifier":
+            units = "log-odds"
+            state["booster"] = estimator.booster_
+            state["expected_value"] = float(estimator.booster_.predict(Z[:1], pred_contrib=True)[0, -1])
+        elif hasattr(estimator, "coef_") and np.asarray(estimator.coef_).shape[0] == 1:
+            units = "log-odds" if hasattr(estimator, "predict_proba") else "decision"
+            coef = np.asarray(estimator.coef_, dtype=np.float64)[0]
+            if list(estimator.classes_).index(1) == 0:
+                coef = -coef
+            state["linear"] = {"coef": coef, "mean": Z.mean(axis=0)}
+            state["expected_value"] = float(
+                (Z.mean(axis=0) @ coef) + np.ravel(getattr(estimator, "intercept_", 0.0))[0]
+                * (1.0 if list(estimator.classes_).index(1) == 1 else -1.0))
+        else:
+            raise ValueError(f"No attribution method for {type(estimator).__name__}")
+        state["units"] = units
+
+        explainer = cls(state, scorer)
+        totals = np.abs(explainer.category_contributions(background.iloc[:SCALE_ROWS]))
+        state["category_scale"] = np.maximum(np.percentile(totals, SCALE_PERCENTILE, axis=0), 1e-12)
+        explainer.category_scale = state["category_scale"]
+        return explainer
+
+    # ---- attributions ----------------------------------------------------------
+    def column_contributions(self, X):
+        """(rows x model columns) contributions, before one-hot columns are merged."""
+        Z = self.scorer.transform(X)
+        if self._linear is not None:
+            return (Z - self._linear["mean"]) * self._linear["coef"]
+        if self._booster is not None:
+            return self._booster.predict(Z, pred_contrib=True)[:, :-1]
+        # sklearn trees compare float32 inputs against float64 thresholds
+        return _tree_shap(self._leaves, Z.astype(np.float32), self._slot_columns)
+
+    def explain(self, X):
+        """(rows x input features) contributions; rows sum to decision - expected_value."""
+        return self.column_contributions(X) @ self._column_features
+
+    def category_contributions(self, X):
+        """(rows x CATEGORIES) contributions."""
+        return self.explain(X) @ self._feature_categories
+
+    def category_scores(self, X):
+        """0-100 radar scores: 50 is a typical student, 100 pushes toward dropout as
+        hard as the top 5% of background students do in that category."""
+        ratio = self.category_contributions(X) / self.category_scale
+        return 50 + 50 * np.clip(ratio, -1, 1)
+
+    def top_features(self, X, n=5):
+        """Per student, the ``n`` (feature, contribution) pairs with the largest effect."""
+        phi = self.explain(X)
+        order = np.argsort(-np.abs(phi), axis=1)[:, :n]
+        return [[(self.feature_names[j], float(row[j])) for j in idx] for row, idx in zip(phi, order)]
+
+    # ---- persistence -----------------------------------------------------------
+    def save(self, path=EXPLAINER_PATH):
+        with open(path, "wb") as f:
+            pickle.dump(self.state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _sklearn_scorer(model_name=MODEL_NAME, scorer_path=SCORER_PATH):
+    """A DropoutScorer holding the fitted sklearn estimator (tree covers need it)."""
+    if os.path.exists(scorer_path):
+        return DropoutScorer.load(scorer_path)
+    from pycaret.classification import load_model
+    return DropoutScorer.from_pipeline(load_model(model_name, verbose=False))
+
+
+def export_explainer(pipeline=None, path=EXPLAINER_PATH, model_name=MODEL_NAME, data_path=DATA_PATH):
+    """Precompute and save the explainer for the saved model (or ``pipeline``)."""
+    scorer = DropoutScorer.from_pipeline(pipeline) if pipeline is not None else _sklearn_scorer(model_name)
+    explainer = Explainer.build(scorer, background_students(data_path), _pipeline_hash(model_name))
+    explainer.save(path)
+    return explainer
+
+
+def load_explainer(path=EXPLAINER_PATH, model_name=MODEL_NAME, scorer=None):
+    """The saved explainer, rebuilt first if it belongs to a different model.
+
+    ``scorer`` is any DropoutScorer for the same model (the mapped artifact
+    is fine) and only used to encode inputs; the pickled scorer is loaded
+    if none is given.
+    """
+    state = None
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        if state.get("format_version") != FORMAT_VERSION:
+            state = None
+        elif state["pipeline_sha256"] not in (None, _pipeline_hash(model_name)):
+            warnings.warn(f"{path} was built for a different {model_name}.pkl; rebuilding it")
+            state = None
+    if state is None:
+        explainer = export_explainer(path=path, model_name=model_name)
+        state = explainer.state
+    if scorer is None or not hasattr(scorer, "transform"):
+        scorer = _sklearn_scorer(model_name)
+    return Explainer(state, scorer)
+
+
+# ---- verification ------------------------------------------------------------
+
+def _model_decision(scorer, X, units):
+    """The decision the attributions should add up to, from the sklearn estimator."""
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        if units == "decision":
+            decision = scorer.estimator.decision_function(scorer.transform(X))
+            return decision if list(scorer.classes_).index(1) == 1 else -decision
+        proba = scorer.dropout_probability(X)
+        if units == "probability":
+            return proba
+    proba = np.clip(proba, 1e-15, 1 - 1e-15)
+    return np.log(proba / (1 - proba))
+
+
+def check(path=EXPLAINER_PATH, model_name=MODEL_NAME, data_path=DATA_PATH, tolerance=1e-6):
+    """Largest |sum of contributions + expected value - model decision| on the dataset."""
+    from data_io import load_students
+    explainer = load_explainer(path, model_name)
+    data = load_students(data_path)
+    data["scholarship_status"] = data["scholarship_status"].astype(object).fillna("None")
+    X = data.drop(columns=[TARGET])
+    reference = _sklearn_scorer(model_name)
+    total = explainer.explain(X).sum(axis=1) + explainer.expected_value
+    gap = float(np.max(np.abs(total - _model_decision(reference, X, explainer.units))))
+    if gap > tolerance:
+        raise AssertionError(f"Attributions miss the model decision by {gap:.3g} (> {tolerance:g})")
+    return gap, len(X), explainer.units
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model-based feature attributions.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("export", help=f"precompute {EXPLAINER_PATH} for the saved model")
+    sub.add_parser("check", help="check attributions add up to the model decision")
+    show_parser = sub.add_parser("show", help="explain one student from the dataset")
+    show_parser.add_argument("--row", type=int, default=0, help="dataset row (default: 0)")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("STUDENT DROPOUT PREDICTION - FEATURE ATTRIBUTIONS")
+    print("=" * 70)
+    if args.command == "export":
+        explainer = export_explainer()
+        trees = explainer.state.get("trees", 0)
+        print(f"\n Saved {EXPLAINER_PATH} ({os.path.getsize(EXPLAINER_PATH) / 1024:.1f} KB)")
+        print(f" Units: {explainer.units}, expected value {explainer.expected_value:+.4f}"
+              + (f", {trees} trees" if trees else ""))
+        print(f" Background: {explainer.state['background_rows']:,} students")
+    elif args.command == "check":
+        gap, rows, units = check()
+        print(f"\n Additivity: {rows:,} students, max gap {gap:.2e} ({units})")
+    else:
+        from data_io import load_students
+        data = load_students(DATA_PATH)
+        data["scholarship_status"] = data["scholarship_status"].astype(object).fillna("None")
+        student = data.drop(columns=[TARGET]).iloc[[args.row]]
+        explainer = load_explainer()
+        print(f"\n Student {args.row}: decision {explainer.expected_value:+.4f} (average) "
+              f"{explainer.explain(student).sum():+.4f} = "
+              f"{explainer.expected_value + explainer.explain(student).sum():+.4f} {explainer.units}")
+        print("\n Categories (50 = typical student):")
+        for category, score, value in zip(CATEGORIES, explainer.category_scores(student)[0],
+                                          explainer.category_contributions(student)[0]):
+            print(f"   {category:<12}{score:>6.1f}   ({value:+.4f})")
+        print("\n Largest contributions:")
+        for feature, value in explainer.top_features(student, 8)[0]:
+            print(f"   {feature:<32}{value:+.4f}")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
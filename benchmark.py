@@ -0,0 +1,346 @@
+"""
+STUDENT DROPOUT PREDICTION - BENCHMARK SUITE
+=============================================
+Reproducible timings for training and inference, saved as JSON.
+
+Suites:
+    train   - wall-clock seconds of each train.py stage (load, setup, compare,
+              tune, finalize, save), run in a scratch directory with the
+              training cache disabled so repo artifacts are never touched
+    load    - model load time (PyCaret pipeline, pickled scorer, mapped artifact)
+    predict - single-row latency (p50/p99) of predict_model and both scorers,
+              plus one what-if grid (2,556 variants) through the artifact
+    batch   - bulk scoring throughput at 1k / 100k / 1M synthetic rows
+    explain - feature attributions: one-off precompute per model, single-row
+              latency and batch throughput at the same sizes as ``batch``
+
+Usage:
+    python benchmark.py run --output before.json
+    python benchmark.py run --suite load predict batch --output after.json
+    python benchmark.py compare before.json after.json --threshold 0.10
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from inference import ARTIFACT_PATH, MODEL_NAME, SCORER_PATH, TARGET, load_scorer
+from model_artifact import load_artifact
+from synthetic_data import StudentGenerator
+
+DATA_PATH = "student_dropout_dataset.csv"
+SUITES = ["train", "load", "predict", "batch", "explain"]
+DEFAULT_BATCH_ROWS = [1_000, 100_000, 1_000_000]
+CHUNKSIZE = 100_000
+SEED = 42
+REPO_DIR = Path(__file__).resolve().parent
+
+
+def _result(value, unit, better, **details):
+    return {"value": float(value), "unit": unit, "better": better, **details}
+
+
+def _latency(samples):
+    samples_ms = np.asarray(samples) * 1000
+    return {"p50_ms": float(np.percentile(samples_ms, 50)),
+            "p99_ms": float(np.percentile(samples_ms, 99)),
+            "samples": len(samples_ms)}
+
+
+def load_students(path=DATA_PATH):
+    data = pd.read_csv(path)
+    data["scholarship_status"] = data["scholarship_status"].fillna("None")
+    return data.drop(columns=[TARGET])
+
+
+def sample_chunks(rows, chunksize=CHUNKSIZE, seed=SEED):
+    """Yield ``rows`` synthetic students (features only), ``chunksize`` at a time."""
+    generator = StudentGenerator.from_files()
+    rng = np.random.default_rng(seed)
+    for start in range(0, rows, chunksize):
+        yield generator.sample(min(chunksize, rows - start), rng).drop(columns=[TARGET])
+
+
+# ---- suites -------------------------------------------------------------------
+
+def bench_train(extra_args=()):
+    """Run train.py end to end in a scratch directory and collect its stage timings."""
+    with tempfile.TemporaryDirectory() as scratch:
+        os.symlink(REPO_DIR / DATA_PATH, Path(scratch) / DATA_PATH)
+        timings = Path(scratch) / "timings.json"
+        command = [sys.executable, str(REPO_DIR / "train.py"), "--no-cache",
+                   "--timings", str(timings), *extra_args]
+        subprocess.run(command, cwd=scratch, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        report = json.loads(timings.read_text())
+
+    results = {f"train.{stage}": _result(seconds, "s", "lower")
+               for stage, seconds in report["stages"].items()}
+    results["train.total"] = _result(sum(report["stages"].values()), "s", "lower",
+                                     recall=report["recall"])
+    return results
+
+
+def bench_load(repeat):
+    from pycaret.classification import load_model
+
+    results = {}
+    for name, loader in [("load.pycaret_model", lambda: load_model(MODEL_NAME, verbose=False)),
+                         ("load.scorer", lambda: load_scorer(SCORER_PATH)),
+                         ("load.artifact", lambda: load_artifact(ARTIFACT_PATH))]:
+        loader()  # warm imports so only the load itself is timed
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            loader()
+            times.append(time.perf_counter() - start)
+        results[name] = _result(np.median(times), "s", "lower", runs=repeat)
+    return results
+
+
+def bench_predict(students, n_calls):
+    from pycaret.classification import load_model, predict_model
+
+    model = load_model(MODEL_NAME, verbose=False)
+    scorer = load_scorer(SCORER_PATH)
+    artifact = load_artifact(ARTIFACT_PATH)
+    rows = [students.iloc[[i]] for i in np.random.default_rng(SEED).integers(0, len(students), n_calls)]
+
+    results = {}
+    for name, predict in [
+        ("predict.predict_model_single_row", lambda row: predict_model(model, data=row, verbose=False)),
+        ("predict.scorer_single_row", scorer.dropout_probability),
+        ("predict.artifact_single_row", artifact.dropout_probability),
+    ]:
+        predict(rows[0])  # first call pays one-off setup costs
+        times = []
+        for row in rows:
+            start = time.perf_counter()
+            predict(row)
+            times.append(time.perf_counter() - start)
+        stats = _latency(times)
+        results[name] = _result(stats["p50_ms"], "ms", "lower", **stats)
+
+    # The app's what-if heat map: current_cgpa x attendance_percentage in one call
+    from what_if import sweep
+    times = []
+    for row in rows[:max(1, n_calls // 10)]:
+        student = row.iloc[0].to_dict()
+        start = time.perf_counter()
+        axes, probability = sweep(artifact, student, ["current_cgpa", "attendance_percentage"])
+        times.append(time.perf_counter() - start)
+    stats = _latency(times)
+    results["predict.artifact_what_if_grid"] = _result(stats["p50_ms"], "ms", "lower",
+                                                       variants=probability.size, **stats)
+    return results
+
+
+def bench_batch(sizes, repeat):
+    from pycaret.classification import load_model
+
+    from score_batch import score_chunks
+
+    model = load_model(MODEL_NAME, verbose=False)
+    scorer = load_scorer(SCORER_PATH)
+    artifact = load_artifact(ARTIFACT_PATH)
+
+    def predict_model_path(chunks):
+        for _ in score_chunks(model, chunks, predictions_only=True):
+            pass
+
+    def scorer_path(chunks, scorer=scorer):
+        for chunk in chunks:
+            scorer.dropout_probability(chunk)
+
+    results = {}
+    for name, run in [("batch.predict_model", predict_model_path), ("batch.scorer", scorer_path),
+                      ("batch.artifact", lambda chunks: scorer_path(chunks, artifact))]:
+        for rows in sizes:
+            # Keep total work per size around 1M rows so large sizes run once
+            runs = max(1, min(repeat, 1_000_000 // rows))
+            throughput = []
+            for _ in range(runs):
+                chunks = list(sample_chunks(rows))
+                start = time.perf_counter()
+                run(chunks)
+                throughput.append(rows / (time.perf_counter() - start))
+            results[f"{name}_{rows}"] = _result(np.median(throughput), "rows/s", "higher",
+                                                rows=rows, runs=runs)
+    return results
+
+
+def bench_explain(students, sizes, repeat, n_calls):
+    from attributions import Explainer, _sklearn_scorer, background_students
+
+    scorer = _sklearn_scorer()
+    background = background_students()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        explainer = Explainer.build(scorer, background)
+        times.append(time.perf_counter() - start)
+    results = {"explain.precompute": _result(np.median(times), "s", "lower", runs=repeat,
+                                             background_rows=len(background))}
+
+    # Same encoder the app uses in front of the explainer
+    explainer.scorer = load_artifact(ARTIFACT_PATH)
+    rows = [students.iloc[[i]] for i in np.random.default_rng(SEED).integers(0, len(students), n_calls)]
+    explainer.category_scores(rows[0])
+    times = []
+    for row in rows:
+        start = time.perf_counter()
+        explainer.category_scores(row)
+        times.append(time.perf_counter() - start)
+    stats = _latency(times)
+    results["explain.single_row"] = _result(stats["p50_ms"], "ms", "lower", **stats)
+
+    for n in sizes:
+        runs = max(1, min(repeat, 1_000_000 // n))
+        throughput = []
+        for _ in range(runs):
+            chunks = list(sample_chunks(n))
+            start = time.perf_counter()
+            for chunk in chunks:
+                explainer.category_contributions(chunk)
+            throughput.append(n / (time.perf_counter() - start))
+        results[f"explain.batch_{n}"] = _result(np.median(throughput), "rows/s", "higher",
+                                                rows=n, runs=runs)
+    return results
+
+
+# ---- run / compare ------------------------------------------------------------
+
+def environment():
+    def version(module):
+        try:
+            return __import__(module).__version__
+        except Exception:
+            return None
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "versions": {m: version(m) for m in ["pycaret", "sklearn", "pandas", "numpy"]},
+    }
+
+
+def run(suites, output, batch_rows=DEFAULT_BATCH_ROWS, repeat=3, n_calls=200, train_args=()):
+    results = {}
+    students = load_students() if {"predict", "explain"} & set(suites) else None
+    for suite in SUITES:
+        if suite not in suites:
+            continue
+        print(f"\n Running {suite} benchmarks...")
+        if suite == "train":
+            suite_results = bench_train(train_args)
+        elif suite == "load":
+            suite_results = bench_load(repeat)
+        elif suite == "predict":
+            suite_results = bench_predict(students, n_calls)
+        elif suite == "batch":
+            suite_results = bench_batch(batch_rows, repeat)
+        else:
+            suite_results = bench_explain(students, batch_rows, repeat, n_calls)
+        for name, result in suite_results.items():
+            print(f"   {name:<42}{result['value']:>14,.3f} {result['unit']}")
+        results.update(suite_results)
+
+    report = {"environment": environment(), "results": results}
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def compare(base_path, new_path, threshold):
+    """Print a side-by-side table and return the names that regressed."""
+    with open(base_path) as f:
+        base = json.load(f)["results"]
+    with open(new_path) as f:
+        new = json.load(f)["results"]
+
+    regressions = []
+    print(f"\n {'Benchmark':<42}{'Base':>12}{'New':>12}{'Change':>9}")
+    print(" " + "-" * 78)
+    for name in sorted(set(base) | set(new)):
+        if name not in base or name not in new:
+            print(f" {name:<42}{'only in ' + ('new' if name in new else 'base'):>33}")
+            continue
+        old_value, new_value = base[name]["value"], new[name]["value"]
+        change = (new_value - old_value) / old_value if old_value else 0.0
+        worse = -change if base[name]["better"] == "higher" else change
+        flag = ""
+        if worse > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif worse < -threshold:
+            flag = "  improved"
+        print(f" {name:<42}{old_value:>12,.3f}{new_value:>12,.3f}{change:>+9.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark training and inference.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run benchmarks and save results as JSON")
+    run_parser.add_argument("--suite", nargs="+", choices=SUITES, default=SUITES,
+                            help="suites to run (default: all)")
+    run_parser.add_argument("--output", default="benchmark_results.json",
+                            help="where to write the results (default: benchmark_results.json)")
+    run_parser.add_argument("--batch-rows", nargs="+", type=int, default=DEFAULT_BATCH_ROWS,
+                            help="batch sizes for the batch/explain suites (default: 1000 100000 1000000)")
+    run_parser.add_argument("--repeat", type=int, default=3,
+                            help="runs per load/batch measurement; the median is kept (default: 3)")
+    run_parser.add_argument("--calls", type=int, default=200,
+                            help="single-row predictions timed per path (default: 200)")
+    run_parser.add_argument("--train-args", default="",
+                            help="extra train.py arguments, e.g. \"--parallel --n-trials 27\"")
+
+    compare_parser = commands.add_parser("compare", help="flag regressions between two result files")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="relative slowdown that counts as a regression (default: 0.10)")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("STUDENT DROPOUT PREDICTION - BENCHMARKS")
+    print("=" * 70)
+
+    if args.command == "run":
+        run(args.suite, args.output, args.batch_rows, args.repeat, args.calls,
+            args.train_args.split())
+        print("\n" + "=" * 70)
+        print(f" Results saved as: {args.output}")
+        print("=" * 70)
+    else:
+        regressions = compare(args.base, args.new, args.threshold)
+        print("\n" + "=" * 70)
+        if regressions:
+            print(f" {len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        else:
+            print(f" No regressions beyond {args.threshold:.0%}")
+        print("=" * 70)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
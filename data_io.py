@@ -0,0 +1,358 @@
+"""
+STUDENT DROPOUT PREDICTION - DATA LOADING
+=========================================
+Typed, columnar loading of student datasets from CSV, Parquet or Arrow.
+
+Every load enforces the dtypes declared by schema.py:
+
+- categorical features -> pandas ``category`` with the declared categories
+  (open lists, e.g. state_of_origin, keep whatever the data holds)
+- integer and binary features -> the smallest integer width that fits the
+  documented range (int8 / int16 / int32)
+- float features -> float32
+
+Numbers are parsed at full width first and only narrowed when every value
+in the column survives the cast unchanged. A column with an out-of-range,
+fractional or missing value stays float64 (text that isn't a number stays
+as read), so schema.validate() sees the real values instead of ones that
+wrapped around (attendance 356 -> 100) and can drop just those rows.
+The same goes for categories: a value outside a closed list (department
+'Physics') leaves that column as read, so validate() flags the row and
+drop_invalid() removes it; pass ``strict=True`` to raise instead.
+Call apply_schema() again after dropping them to get the declared dtypes
+(drop_invalid() does).
+
+``scholarship_status`` has a real category called "None", so CSVs are read
+with only empty cells treated as missing.
+
+Parquet and Arrow (Feather v2 / IPC) files support column projection and
+predicate pushdown: filters are applied while reading, so loading one
+department or one year never materialises the rest. CSV honours the same
+arguments by reading in chunks and filtering each one.
+
+Filters use the pyarrow DNF form, a list of ``(column, op, value)`` tuples
+that must all hold, with op one of = == != < <= > >= in "not in".
+
+Usage:
+    python data_io.py convert student_dropout_dataset.csv students.parquet
+    python data_io.py report student_dropout_dataset.csv students.parquet
+    python data_io.py report students.parquet --columns age current_cgpa --where department=Engineering
+"""
+
+import argparse
+import operator
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from schema import declared_schema, validate
+
+DEFAULT_CHUNKSIZE = 100_000
+PARQUET_ROW_GROUP = 100_000
+
+_OPERATORS = {"=": operator.eq, "==": operator.eq, "!=": operator.ne,
+              "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+
+def _narrow(values, dtype):
+    """``values`` cast to a numeric ``dtype`` only if no value changes in the cast."""
+    numbers = pd.to_numeric(values, errors="coerce")
+    if numbers.isna().sum() > values.isna().sum():
+        return values  # text that isn't a number - left for validate() to report
+    numbers = numbers.astype("float64")
+    if np.dtype(dtype).kind == "f":
+        return numbers.astype(dtype)
+    info = np.iinfo(dtype)
+    if numbers.isna().any() or not numbers.between(info.min, info.max).all() \
+            or (numbers != np.floor(numbers)).any():
+        return numbers
+    return numbers.astype(dtype)
+
+
+def narrow_numeric(data, schema=None):
+    """Narrow the declared numeric columns of ``data`` wherever every value fits."""
+    schema = schema or declared_schema()
+    narrowed = {column: _narrow(data[column], dtype) for column, dtype in schema.items()
+                if column in data.columns and not _is_categorical(dtype) and data[column].dtype != dtype}
+    return data.assign(**narrowed) if narrowed else data
+
+
+def _is_categorical(dtype):
+    return isinstance(dtype, pd.CategoricalDtype) or dtype == "category"
+
+
+def apply_schema(data, schema=None, strict=False):
+    """Cast the columns of ``data`` that the schema declares.
+
+    A column holding a value outside its closed category list is left as
+    read rather than silently turning the value into NaN, so validate()
+    reports the row; with ``strict`` it raises ValueError instead. Numeric
+    columns are narrowed only where every value fits (see narrow_numeric);
+    validate the result and call this again after dropping the invalid rows.
+    """
+    schema = schema or declared_schema()
+    casts = {}
+    for column, dtype in schema.items():
+        if column not in data.columns or data[column].dtype == dtype or not _is_categorical(dtype):
+            continue
+        if isinstance(dtype, pd.CategoricalDtype):
+            values = data[column]
+            # Categories left unused after drop_invalid() removed their rows don't count
+            present = (values.cat.remove_unused_categories().cat.categories
+                       if isinstance(values.dtype, pd.CategoricalDtype) else values.dropna().unique())
+            unknown = sorted(set(map(str, present)) - set(dtype.categories))
+            if unknown:
+                if strict:
+                    raise ValueError(f"{column}: values not in the declared categories: {unknown}")
+                continue
+        casts[column] = dtype
+    return narrow_numeric(data.astype(casts), schema)
+
+
+def drop_invalid(data, schema=None):
+    """(rows that pass schema.validate(), cast to the declared dtypes; the report)."""
+    report = validate(data)
+    if report.n_invalid:
+        data = data[~report.invalid].reset_index(drop=True)
+    return apply_schema(data, schema), report
+
+
+def file_format(path):
+    """'csv', 'parquet' or 'arrow', from the file extension."""
+    suffixes = [s.lower() for s in Path(path).suffixes]
+    if ".parquet" in suffixes or ".pq" in suffixes:
+        return "parquet"
+    if any(s in (".arrow", ".feather", ".ipc") for s in suffixes):
+        return "arrow"
+    if ".csv" in suffixes:
+        return "csv"
+    raise ValueError(f"Unsupported file type: {path} (expected .csv, .parquet or .arrow/.feather)")
+
+
+def _filter_mask(data, filters):
+    mask = np.ones(len(data), dtype=bool)
+    for column, op, value in filters:
+        values = data[column]
+        if op == "in":
+            mask &= values.isin(value).to_numpy()
+        elif op == "not in":
+            mask &= ~values.isin(value).to_numpy()
+        else:
+            mask &= _OPERATORS[op](values, value).to_numpy()
+    return mask
+
+
+def _csv_options(schema, columns=None):
+    # Categories are parsed as-is and re-mapped to the declared lists by
+    # apply_schema, which is where unknown values are caught. Numbers are
+    # parsed at full width and narrowed afterwards: a narrow parse dtype
+    # wraps out-of-range values and rejects the whole file on a blank cell
+    dtypes = {c: "category" for c, d in schema.items()
+              if _is_categorical(d) and (columns is None or c in columns)}
+    return dict(usecols=columns, dtype=dtypes, keep_default_na=False, na_values=[""])
+
+
+def _read_csv(path, columns, filters, schema, chunksize):
+    read_columns = None
+    if columns is not None:
+        read_columns = list(dict.fromkeys(list(columns) + [f[0] for f in filters or []]))
+    options = _csv_options(schema, read_columns)
+    if not filters:
+        return pd.read_csv(path, **options)
+
+    kept = [chunk[_filter_mask(chunk, filters)]
+            for chunk in pd.read_csv(path, chunksize=chunksize, **options)]
+    # Chunks infer different category lists; concat falls back to strings and
+    # apply_schema turns them back into categories
+    return pd.concat(kept, ignore_index=True)
+
+
+def _read_arrow(path, fmt, columns, filters):
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    dataset = ds.dataset(path, format="parquet" if fmt == "parquet" else "ipc")
+    expression = pq.filters_to_expression(filters) if filters else None
+    # Row groups whose min/max statistics can't match the filter are skipped
+    table = dataset.to_table(columns=columns, filter=expression)
+    return table.to_pandas()
+
+
+def load_students(path, columns=None, filters=None, schema=None, chunksize=DEFAULT_CHUNKSIZE,
+                  strict=False):
+    """Load a student dataset with the declared dtypes.
+
+    Args:
+        path: .csv / .csv.gz, .parquet, or .arrow / .feather file
+        columns: columns to load (default: all)
+        filters: [(column, op, value), ...] rows must satisfy, e.g.
+            [("department", "=", "Engineering"), ("year_of_study", "in", [1, 2])]
+        schema: {column: dtype} to enforce (default: declared_schema())
+        strict: raise on values outside a closed category list instead of
+            leaving them for schema.validate() / drop_invalid()
+    """
+    fmt = file_format(path)
+    schema = schema or declared_schema()
+    filters = [tuple(f) for f in filters or []]
+    if fmt == "csv":
+        data = _read_csv(path, columns, filters, schema, chunksize)
+    else:
+        data = _read_arrow(path, fmt, columns, filters)
+    if columns is not None:
+        data = data[list(columns)]
+    return apply_schema(data.reset_index(drop=True), schema, strict)
+
+
+def iter_students(path, chunksize=DEFAULT_CHUNKSIZE, columns=None, schema=None):
+    """Yield a dataset in chunks of at most ``chunksize`` rows.
+
+    Only one chunk is in memory at a time. CSV chunks are parsed with the
+    declared categories; Parquet and Arrow batches keep their stored types.
+    Numeric columns are narrowed per chunk where every value fits, so a
+    chunk's dtypes may differ from the next one's. Values are not checked
+    against the schema, so pass each chunk through schema.validate() before
+    using it.
+    """
+    fmt = file_format(path)
+    schema = schema or declared_schema()
+    if fmt == "csv":
+        for chunk in pd.read_csv(path, chunksize=chunksize, **_csv_options(schema, columns)):
+            yield narrow_numeric(chunk, schema)
+        return
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(path, format="parquet" if fmt == "parquet" else "ipc")
+    for batch in dataset.to_batches(columns=columns, batch_size=chunksize):
+        yield narrow_numeric(batch.to_pandas(), schema)
+
+
+def save_students(data, path, schema=None):
+    """Write ``data`` as CSV, Parquet or Arrow with the declared dtypes."""
+    fmt = file_format(path)
+    if fmt == "csv":
+        data.to_csv(path, index=False)
+        return
+    # Typed files must hold the declared categories
+    data = apply_schema(data, schema, strict=True)
+    if fmt == "parquet":
+        data.to_parquet(path, index=False, row_group_size=PARQUET_ROW_GROUP)
+    else:
+        data.to_feather(path)
+
+
+def convert(source, destination, chunksize=DEFAULT_CHUNKSIZE):
+    """Convert between CSV, Parquet and Arrow; CSV -> Parquet streams in chunks."""
+    if file_format(source) == "csv" and file_format(destination) == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = declared_schema()
+        writer = None
+        options = _csv_options(schema)
+        try:
+            for chunk in pd.read_csv(source, chunksize=chunksize, **options):
+                table = pa.Table.from_pandas(apply_schema(chunk, schema, strict=True),
+                                             preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(destination, table.schema)
+                # Dictionaries (category lists) may differ per row group; the
+                # column types must not
+                writer.write_table(table.cast(writer.schema), row_group_size=PARQUET_ROW_GROUP)
+        finally:
+            if writer is not None:
+                writer.close()
+        return
+    save_students(load_students(source, strict=True), destination)
+
+
+def parse_where(expressions):
+    """["department=Engineering", "year_of_study=1,2"] -> pyarrow DNF filters."""
+    filters = []
+    for expression in expressions or []:
+        column, _, text = expression.partition("=")
+        if not text:
+            raise ValueError(f"Expected column=value[,value...], got {expression!r}")
+        values = []
+        for raw in text.split(","):
+            try:
+                values.append(int(raw))
+            except ValueError:
+                try:
+                    values.append(float(raw))
+                except ValueError:
+                    values.append(raw)
+        filters.append((column, "in", values) if len(values) > 1 else (column, "=", values[0]))
+    return filters
+
+
+def _measure(loader, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data = loader()
+        times.append(time.perf_counter() - start)
+    return data, float(np.median(times))
+
+
+def report(paths, columns=None, filters=None, repeat=3):
+    """Load time and in-memory size of each file, against a default pd.read_csv."""
+    rows = []
+    csv_paths = [p for p in paths if file_format(p) == "csv"]
+    if csv_paths:
+        data, seconds = _measure(lambda: pd.read_csv(csv_paths[0]), repeat)
+        rows.append((f"{csv_paths[0]} (pd.read_csv defaults)", len(data), data.shape[1],
+                     data.memory_usage(deep=True).sum(), seconds))
+    for path in paths:
+        data, seconds = _measure(lambda: load_students(path, columns, filters), repeat)
+        rows.append((f"{path} (typed)", len(data), data.shape[1],
+                     data.memory_usage(deep=True).sum(), seconds))
+
+    baseline_mb = rows[0][3] / 1024**2
+    baseline_s = rows[0][4]
+    print(f"\n {'Source':<52}{'Rows':>8}{'Cols':>6}{'Memory':>10}{'Load':>9}")
+    print(" " + "-" * 84)
+    for name, n_rows, n_cols, memory, seconds in rows:
+        mb = memory / 1024**2
+        print(f" {name:<52}{n_rows:>8,}{n_cols:>6}{mb:>8.2f}MB{seconds * 1000:>7.0f}ms"
+              f"   ({mb / baseline_mb:.0%} memory, {seconds / baseline_s:.2f}x time)")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Typed loading and conversion of student datasets.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = commands.add_parser("convert", help="convert between CSV, Parquet and Arrow")
+    convert_parser.add_argument("source")
+    convert_parser.add_argument("destination")
+    convert_parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+                                help=f"rows per chunk when streaming CSV (default: {DEFAULT_CHUNKSIZE})")
+
+    report_parser = commands.add_parser("report", help="compare memory and load time against CSV")
+    report_parser.add_argument("paths", nargs="+")
+    report_parser.add_argument("--columns", nargs="+", help="load only these columns")
+    report_parser.add_argument("--where", nargs="+", metavar="COL=V[,V]",
+                               help="row filters, e.g. department=Engineering year_of_study=1,2")
+    report_parser.add_argument("--repeat", type=int, default=3,
+                               help="loads per file; the median time is kept (default: 3)")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("STUDENT DROPOUT PREDICTION - DATA LOADING")
+    print("=" * 70)
+
+    if args.command == "convert":
+        start = time.perf_counter()
+        convert(args.source, args.destination, args.chunksize)
+        size_mb = Path(args.destination).stat().st_size / 1024**2
+        print(f"\n Converted {args.source} -> {args.destination} "
+              f"({size_mb:.2f} MB) in {time.perf_counter() - start:.1f}s")
+    else:
+        report(args.paths, args.columns, parse_where(args.where), args.repeat)
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+"""
+STUDENT DROPOUT PREDICTION - DRIFT MONITOR
+==========================================
+Are the students being scored still like the ones the model was trained on?
+
+The reference profile is a histogram per feature from the training data
+(student_dropout_dataset.csv): decile bins for wide numeric features, one
+bin per value for small integer ranges and flags, one bin per category for
+categorical features, plus a final bucket for missing or unseen values. It
+is saved as student_dropout_drift_reference.json by train.py.
+
+A DriftMonitor bins every scored batch against those edges and only keeps
+counts: running totals plus a ring of fixed-size slots for the sliding
+window, so its memory does not grow with traffic. Statistics are computed
+from the counts on demand:
+
+- PSI (population stability index): < 0.1 stable, 0.1-0.25 moderate shift,
+  > 0.25 major shift
+- KS: largest gap between the reference and live cumulative distributions
+  over the bins (numeric features); for categorical features, where order
+  means nothing, the total variation distance
+
+The monitor can follow the prediction log written by app.py and serve.py,
+reading only the lines added since the last refresh.
+
+Configuration comes from the environment:
+    DRIFT_WINDOW_ROWS    rows per sliding-window slot (default: 500)
+    DRIFT_WINDOW_SLOTS   slots in the sliding window (default: 10)
+
+Usage:
+    python drift_monitor.py export                       # rebuild the reference profile
+    python drift_monitor.py report                       # drift of the logged traffic
+    python drift_monitor.py report cohort.csv --format prometheus
+"""
+
+import argparse
+import json
+import os
+import threading
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from schema import FEATURES, TARGET
+
+REFERENCE_PATH = "student_dropout_drift_reference.json"
+DATA_PATH = "student_dropout_dataset.csv"
+FORMAT_VERSION = 1
+WINDOW_ROWS = int(os.environ.get("DRIFT_WINDOW_ROWS", 500))
+WINDOW_SLOTS = int(os.environ.get("DRIFT_WINDOW_SLOTS", 10))
+PSI_BINS = 10
+MAX_DISCRETE_VALUES = 20     # numeric features with at most this many values get one bin each
+MODERATE_PSI = 0.1
+MAJOR_PSI = 0.25
+READ_BATCH = 1_000           # log records binned per update while following
+
+
+def psi(expected, actual):
+    """Population stability index of two count (or frequency) vectors."""
+    expected = np.asarray(expected, dtype=float)
+    actual = np.asarray(actual, dtype=float)
+    expected = np.clip(expected / expected.sum(), 1e-4, None)
+    actual = np.clip(actual / max(actual.sum(), 1), 1e-4, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def ks_statistic(expected, actual, ordered=True):
+    """Largest CDF gap over ordered bins, or total variation distance if unordered."""
+    expected = np.asarray(expected, dtype=float) / max(np.sum(expected), 1)
+    actual = np.asarray(actual, dtype=float) / max(np.sum(actual), 1)
+    if ordered:
+        return float(np.max(np.abs(np.cumsum(expected) - np.cumsum(actual))))
+    return float(0.5 * np.abs(expected - actual).sum())
+
+
+# ---- reference profile -----------------------------------------------------------
+
+def feature_bins(values, categorical=False):
+    """Binning spec for one feature from its reference values."""
+    values = pd.Series(values)
+    if categorical:
+        return {"kind": "categorical", "categories": sorted(values.dropna().astype(str).unique())}
+    numbers = pd.to_numeric(values, errors="coerce").dropna().to_numpy(dtype=float)
+    distinct = np.unique(numbers)
+    if len(distinct) <= MAX_DISCRETE_VALUES:
+        edges = (distinct[:-1] + distinct[1:]) / 2   # one bin per value
+    else:
+        edges = np.unique(np.quantile(numbers, np.linspace(0, 1, PSI_BINS + 1))[1:-1])
+    return {"kind": "numeric", "edges": [float(e) for e in edges]}
+
+
+def bin_codes(values, spec):
+    """Bin index of every value; missing and unseen values go to the last bucket."""
+    values = pd.Series(values)
+    if spec["kind"] == "categorical":
+        categories = pd.Index(spec["categories"])
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Look each category up once and broadcast through the codes (-1 = missing)
+            lookup = np.append(categories.get_indexer(values.cat.categories.astype(str)), -1)
+            codes = lookup[values.cat.codes.to_numpy()]
+        else:
+            codes = categories.get_indexer(values.to_numpy(dtype=object))
+        codes = codes.astype(np.int64)
+        codes[codes < 0] = len(categories)
+        return codes
+    numbers = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+    edges = np.asarray(spec["edges"])
+    codes = np.searchsorted(edges, numbers, side="right")
+    codes[np.isnan(numbers)] = len(edges) + 1
+    return codes
+
+
+def n_bins(spec):
+    """Number of buckets, including the missing/unseen one."""
+    if spec["kind"] == "categorical":
+        return len(spec["categories"]) + 1
+    return len(spec["edges"]) + 2
+
+
+def bin_labels(spec):
+    if spec["kind"] == "categorical":
+        return spec["categories"] + ["(other)"]
+    edges = spec["edges"]
+    if not edges:
+        return ["all", "(missing)"]
+    return ([f"< {edges[0]:g}"]
+            + [f"{low:g} - {high:g}" for low, high in zip(edges[:-1], edges[1:])]
+            + [f">= {edges[-1]:g}", "(missing)"])
+
+
+def build_reference(data):
+    """Reference profile ({feature: bins + counts}) from a training DataFrame."""
+    features = {}
+    for feature, spec in FEATURES.items():
+        if feature not in data.columns:
+            continue
+        bins = feature_bins(data[feature], spec["type"] == "categorical")
+        bins["counts"] = np.bincount(bin_codes(data[feature], bins), minlength=n_bins(bins)).tolist()
+        features[feature] = bins
+    return {"format_version": FORMAT_VERSION, "rows": len(data), "features": features}
+
+
+def _training_data(data_path=DATA_PATH):
+    data = pd.read_csv(data_path, keep_default_na=False, na_values=[""])
+    data["scholarship_status"] = data["scholarship_status"].fillna("None")
+    return data.drop(columns=[TARGET], errors="ignore")
+
+
+def export_reference(data=None, path=REFERENCE_PATH, data_path=DATA_PATH):
+    """Build the reference profile from training data and save it as JSON."""
+    from prediction_cache import file_hash
+
+    reference = build_reference(_training_data(data_path) if data is None else data)
+    reference["dataset_sha256"] = file_hash(data_path) if data is None else None
+    with open(path, "w") as f:
+        json.dump(reference, f, separators=(",", ":"))
+    return reference
+
+
+def load_reference(path=REFERENCE_PATH, data_path=DATA_PATH):
+    """The saved reference profile, rebuilt if missing or from an older format."""
+    try:
+        with open(path) as f:
+            reference = json.load(f)
+        if reference.get("format_version") == FORMAT_VERSION:
+            return reference
+    except FileNotFoundError:
+        pass
+    return export_reference(path=path, data_path=data_path)
+
+
+# ---- streaming monitor ------------------------------------------------------------
+
+class DriftMonitor:
+    """Streaming per-feature histograms of scored traffic against a reference."""
+
+    def __init__(self, reference, window_rows=WINDOW_ROWS, window_slots=WINDOW_SLOTS):
+        self.reference = reference
+        self.features = reference["features"]
+        self.window_rows = window_rows
+        self.window_slots = window_slots
+        self.rows = 0
+        self.total = self._zeros()
+        self._slot = self._zeros()
+        self._slot_rows = 0
+        self._slots = deque(maxlen=window_slots)  # (rows, counts) of completed slots
+        self._lock = threading.Lock()
+        self._log_position = None  # (inode, byte offset) while following a log
+
+    def _zeros(self):
+        return {f: np.zeros(n_bins(spec), dtype=np.int64) for f, spec in self.features.items()}
+
+    def update(self, batch):
+        """Add a scored batch (DataFrame, list of dicts or one dict) to the counts."""
+        if isinstance(batch, dict):
+            batch = pd.DataFrame([batch])
+        elif not isinstance(batch, pd.DataFrame):
+            batch = pd.DataFrame(list(batch))
+        if batch.empty:
+            return
+        codes = {f: bin_codes(batch[f], spec) if f in batch.columns
+                 else np.full(len(batch), n_bins(spec) - 1)
+                 for f, spec in self.features.items()}
+        with self._lock:
+            for feature, spec in self.features.items():
+                self.total[feature] += np.bincount(codes[feature], minlength=n_bins(spec))
+            self.rows += len(batch)
+
+            start, first = 0, self.window_rows - self._slot_rows
+            full_slots = (len(batch) - first) // self.window_rows
+            if full_slots > self.window_slots:
+                # Slots that would be pushed out of the window again are never built
+                start = first + (full_slots - self.window_slots) * self.window_rows
+                self._slots.clear()
+                self._slot, self._slot_rows = self._zeros(), 0
+            while start < len(batch):
+                # Split at slot boundaries so every slot holds exactly window_rows rows
+                stop = min(len(batch), start + self.window_rows - self._slot_rows)
+                for feature, spec in self.features.items():
+                    self._slot[feature] += np.bincount(codes[feature][start:stop],
+                                                       minlength=n_bins(spec))
+                self._slot_rows += stop - start
+                if self._slot_rows >= self.window_rows:
+                    self._slots.append((self._slot_rows, self._slot))
+                    self._slot, self._slot_rows = self._zeros(), 0
+                start = stop
+
+    def window(self):
+        """(rows, counts) over the completed slots plus the one being filled."""
+        with self._lock:
+            rows = self._slot_rows + sum(r for r, _ in self._slots)
+            counts = {f: c.copy() for f, c in self._slot.items()}
+            for _, slot in self._slots:
+                for feature in counts:
+                    counts[feature] += slot[feature]
+        return rows, counts
+
+    def statistics(self, scope="window"):
+        """PSI and KS per feature for "window" or "total" traffic, largest PSI first."""
+        if scope == "window":
+            rows, counts = self.window()
+        else:
+            with self._lock:
+                rows, counts = self.rows, {f: c.copy() for f, c in self.total.items()}
+        table = []
+        for feature, spec in self.features.items():
+            live = counts[feature]
+            ordered = spec["kind"] == "numeric"
+            table.append({
+                "feature": feature,
+                "kind": spec["kind"],
+                "psi": psi(spec["counts"], live) if rows else np.nan,
+                "ks": ks_statistic(spec["counts"], live, ordered) if rows else np.nan,
+                "missing_or_unseen": live[-1] / rows if rows else np.nan,
+            })
+        table = pd.DataFrame(table).sort_values("psi", ascending=False, ignore_index=True)
+        table["status"] = np.select([table["psi"] > MAJOR_PSI, table["psi"] > MODERATE_PSI],
+                                    ["major shift", "moderate shift"], "stable")
+        table.attrs["rows"] = rows
+        return table
+
+    def distribution(self, feature, scope="window"):
+        """Reference and live shares per bin of one feature."""
+        spec = self.features[feature]
+        if scope == "window":
+            live = self.window()[1][feature]
+        else:
+            with self._lock:
+                live = self.total[feature].copy()
+        reference = np.asarray(spec["counts"], dtype=float)
+        return pd.DataFrame({"bin": bin_labels(spec),
+                             "reference": reference / reference.sum(),
+                             "live": live / max(live.sum(), 1)})
+
+    def follow(self, path):
+        """Bin the prediction-log lines written since the last call; returns the count.
+
+        Only the current log file is followed. After a rotation it restarts at
+        the top of the new file, so lines written between the last call and
+        the rotation are skipped.
+        """
+        path = Path(path)
+        if not path.exists():
+            return 0
+        status = path.stat()
+        inode, offset = self._log_position or (status.st_ino, 0)
+        if inode != status.st_ino or offset > status.st_size:
+            inode, offset = status.st_ino, 0
+        added, batch = 0, []
+        with open(path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # still being written
+                offset += len(line)
+                if line.strip():
+                    batch.append(json.loads(line)["inputs"])
+                if len(batch) >= READ_BATCH:
+                    self.update(batch)
+                    added, batch = added + len(batch), []
+        if batch:
+            self.update(batch)
+            added += len(batch)
+        self._log_position = (inode, offset)
+        return added
+
+    def snapshot(self, scope="window"):
+        """JSON-ready statistics."""
+        table = self.statistics(scope)
+        return {
+            "scope": scope,
+            "rows": int(table.attrs["rows"]),
+            "total_rows": self.rows,
+            "window_capacity": self.window_rows * self.window_slots,
+            "features": {row.feature: {"psi": round(row.psi, 6), "ks": round(row.ks, 6),
+                                       "missing_or_unseen": round(row.missing_or_unseen, 6),
+                                       "status": row.status}
+                         for row in table.dropna(subset=["psi"]).itertuples()},
+        }
+
+    def prometheus(self):
+        """Window and total statistics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP student_dropout_drift_rows Rows binned by the drift monitor.",
+            "# TYPE student_dropout_drift_rows gauge",
+        ]
+        tables = {scope: self.statistics(scope) for scope in ("window", "total")}
+        for scope, table in tables.items():
+            lines.append(f'student_dropout_drift_rows{{scope="{scope}"}} {table.attrs["rows"]}')
+        for name, text in [("psi", "Population stability index against the training data."),
+                           ("ks", "KS statistic (total variation for categorical features).")]:
+            lines += [f"# HELP student_dropout_drift_{name} {text}",
+                      f"# TYPE student_dropout_drift_{name} gauge"]
+            for scope, table in tables.items():
+                for row in table.dropna(subset=[name]).itertuples():
+                    lines.append(f'student_dropout_drift_{name}{{feature="{row.feature}",'
+                                 f'scope="{scope}"}} {getattr(row, name):.6f}')
+        return "\n".join(lines) + "\n"
+
+
+def _print_table(table):
+    print(f"\n {'Feature':<30}{'PSI':>8}{'KS':>8}{'Missing':>9}  Status")
+    print(" " + "-" * 68)
+    for row in table.itertuples():
+        print(f" {row.feature:<30}{row.psi:>8.3f}{row.ks:>8.3f}"
+              f"{row.missing_or_unseen:>9.1%}  {row.status}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feature drift of scored traffic.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("export", help=f"rebuild {REFERENCE_PATH} from {DATA_PATH}")
+    report = sub.add_parser("report", help="drift of a prediction log or a student file")
+    report.add_argument("source", nargs="?", default=None,
+                        help="prediction log (.jsonl) or student file (default: the prediction log)")
+    report.add_argument("--scope", choices=["window", "total"], default="total",
+                        help="last DRIFT_WINDOW_ROWS x DRIFT_WINDOW_SLOTS rows, or all (default: total)")
+    report.add_argument("--format", choices=["table", "json", "prometheus"], default="table")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        reference = export_reference()
+        print(f" Saved {REFERENCE_PATH}: {len(reference['features'])} features "
+              f"from {reference['rows']:,} students")
+        return
+
+    from prediction_log import DEFAULT_LOG_PATH
+
+    source = args.source or DEFAULT_LOG_PATH
+    monitor = DriftMonitor(load_reference())
+    if source.endswith(".jsonl"):
+        monitor.follow(source)
+    else:
+        from data_io import DEFAULT_CHUNKSIZE, file_format
+        if file_format(source) == "csv":
+            for chunk in pd.read_csv(source, chunksize=DEFAULT_CHUNKSIZE,
+                                     keep_default_na=False, na_values=[""]):
+                monitor.update(chunk)
+        else:
+            monitor.update(pd.read_parquet(source) if file_format(source) == "parquet"
+                           else pd.read_feather(source))
+
+    if args.format == "json":
+        print(json.dumps(monitor.snapshot(args.scope), indent=2))
+    elif args.format == "prometheus":
+        print(monitor.prometheus(), end="")
+    else:
+        print("=" * 70)
+        print("STUDENT DROPOUT PREDICTION - DRIFT REPORT")
+        print("=" * 70)
+        table = monitor.statistics(args.scope)
+        print(f"\n {source}: {table.attrs['rows']:,} rows ({args.scope})")
+        if table.attrs["rows"]:
+            _print_table(table)
+            shifted = table[table["psi"] > MAJOR_PSI]
+            print(f"\n {len(shifted)} features with PSI > {MAJOR_PSI}")
+        print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
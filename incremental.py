@@ -0,0 +1,425 @@
+"""
+STUDENT DROPOUT PREDICTION - INCREMENTAL RETRAINING
+====================================================
+Update the saved model with a new semester of labelled students instead of
+re-running train.py over the full history.
+
+The model family, hyperparameters and fitted preprocessing (imputation,
+encoding, scaling) are kept. Only the estimator learns from the new rows:
+
+- AdaBoost          more boosting rounds, fitted on the new rows with the
+                    sample weights the current ensemble implies for them
+- Gradient boosting / random forest / extra trees
+                    warm start: extra trees fitted on the new rows
+- LightGBM          boosting continued from the current booster
+- SGD, naive Bayes  partial_fit
+- Logistic regression
+                    warm start from the current coefficients
+
+Before updating, the current model is checked on the new rows. A full
+rebuild is recommended instead when:
+  - any feature's PSI against the training data is above --max-psi
+    (the new semester looks different enough that the old preprocessing
+    and model family may no longer fit)
+  - recall on the new rows is below --min-recall
+  - the estimator has no incremental update
+
+The update is validated on a stratified holdout of the new rows and only
+saved if its holdout recall and AUC are no worse than the current model's
+(within --tolerance). Saving rewrites student_dropout_model.pkl and re-exports the
+lightweight scorers. Risk thresholds are re-optimized on out-of-fold scores of the
+update (each fold of the new rows scored by the model updated on the others), and
+the drift reference is rebuilt from the new rows. If a model registry exists (see
+model_registry.py) everything is published as a new version and --alias (default
+prod) moves to it.
+
+Usage:
+    python incremental.py new_semester.csv
+    python incremental.py new_semester.csv --holdout 0.3 --rounds 50 --dry-run
+    python incremental.py new_semester.csv --rebuild   # append to history + train.py if checks fail
+"""
+
+import argparse
+import copy
+import json
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import f1_score, precision_score, recall_score, roc_auc_score
+from sklearn.model_selection import train_test_split
+
+from data_io import drop_invalid, load_students
+from drift_monitor import MAJOR_PSI, DriftMonitor, build_reference
+from model_registry import DEFAULT_ALIAS, ModelRegistry
+from schema import TARGET
+
+DATA_PATH = "student_dropout_dataset.csv"
+MODEL_NAME = "student_dropout_model"
+MIN_RECALL = 0.85            # project objective: catch 85%+ of dropouts
+MAX_PSI = MAJOR_PSI          # conventional "major shift" threshold
+TOLERANCE = 0.01
+FILL_VALUES = {"scholarship_status": "None"}
+
+
+# ---- checks ------------------------------------------------------------------
+
+def drift_report(reference, current):
+    """PSI per feature, largest first."""
+    monitor = DriftMonitor(build_reference(reference))
+    monitor.update(current)
+    return monitor.statistics("total").set_index("feature")["psi"]
+
+
+def evaluate(pipeline, X, y):
+    probability = pipeline.predict_proba(X)[:, list(pipeline.classes_).index(1)]
+    predicted = (probability >= 0.5).astype(int)
+    return {
+        "recall": recall_score(y, predicted, zero_division=0),
+        "precision": precision_score(y, predicted, zero_division=0),
+        "f1": f1_score(y, predicted, zero_division=0),
+        "auc": roc_auc_score(y, probability) if len(np.unique(y)) > 1 else float("nan"),
+    }
+
+
+# ---- estimator updates ---------------------------------------------------------
+
+def _adaboost_weights(model, X, y):
+    """Sample weights the fitted ensemble would have given (X, y) after its last round."""
+    classes = model.classes_
+    n_classes = len(classes)
+    log_weight = np.zeros(len(X))
+    if model.algorithm == "SAMME":
+        for tree, alpha in zip(model.estimators_, model.estimator_weights_):
+            log_weight += alpha * (tree.predict(X) != y)
+    else:
+        coding = np.where(classes == y[:, None], 1.0, -1.0 / (n_classes - 1))
+        factor = -model.learning_rate * (n_classes - 1) / n_classes
+        for tree in model.estimators_:
+            proba = np.clip(tree.predict_proba(X), np.finfo(float).eps, None)
+            log_weight += factor * (coding * np.log(proba)).sum(axis=1)
+    weight = np.exp(log_weight - log_weight.max())
+    return weight / weight.sum()
+
+
+def extend_adaboost(model, X, y, rounds, random_state=0):
+    """Add up to ``rounds`` boosting rounds fitted on (X, y), in place.
+
+    Follows AdaBoostClassifier's SAMME / SAMME.R updates, starting from the
+    weights the existing rounds imply for the new rows.
+    """
+    X, y = np.asarray(X, dtype=float), np.asarray(y)
+    classes = model.classes_
+    n_classes = len(classes)
+    sample_weight = _adaboost_weights(model, X, y)
+    rng = np.random.RandomState(random_state)
+    # fit() sizes these arrays by n_estimators even if boosting stopped early
+    fitted = len(model.estimators_)
+    weights = list(model.estimator_weights_[:fitted])
+    errors = list(model.estimator_errors_[:fitted])
+    added = 0
+    for _ in range(rounds):
+        tree = clone(model.estimators_[0]).set_params(random_state=rng.randint(np.iinfo(np.int32).max))
+        tree.fit(X, y, sample_weight=sample_weight)
+        incorrect = tree.predict(X) != y
+        error = float(np.average(incorrect, weights=sample_weight))
+        if model.algorithm == "SAMME":
+            if error <= 0 or error >= 1 - 1 / n_classes:
+                break  # perfect or no better than chance: stop like fit() does
+            alpha = model.learning_rate * (np.log((1 - error) / error) + np.log(n_classes - 1))
+            sample_weight = sample_weight * np.exp(alpha * incorrect)
+        else:
+            alpha = 1.0
+            proba = np.clip(tree.predict_proba(X), np.finfo(float).eps, None)
+            coding = np.where(classes == y[:, None], 1.0, -1.0 / (n_classes - 1))
+            sample_weight = sample_weight * np.exp(
+                -model.learning_rate * (n_classes - 1) / n_classes * (coding * np.log(proba)).sum(axis=1))
+        sample_weight /= sample_weight.sum()
+        model.estimators_.append(tree)
+        weights.append(alpha)
+        errors.append(error)
+        added += 1
+    model.estimator_weights_ = np.asarray(weights)
+    model.estimator_errors_ = np.asarray(errors)
+    model.n_estimators = len(model.estimators_)
+    return added
+
+
+def update_estimator(estimator, X, y, rounds):
+    """Return (updated copy of estimator, description) trained on the new rows only.
+
+    Raises ValueError for estimators without an incremental update.
+    """
+    from sklearn.ensemble import (AdaBoostClassifier, ExtraTreesClassifier,
+                                  GradientBoostingClassifier, RandomForestClassifier)
+    from sklearn.linear_model import LogisticRegression, SGDClassifier
+    from sklearn.naive_bayes import GaussianNB
+
+    model = copy.deepcopy(estimator)
+    name = type(model).__name__
+    if isinstance(model, AdaBoostClassifier):
+        before = len(model.estimators_)
+        added = extend_adaboost(model, X, y, rounds, random_state=before)
+        return model, f"{name}: +{added} boosting rounds ({before} -> {before + added})"
+    if isinstance(model, (GradientBoostingClassifier, RandomForestClassifier, ExtraTreesClassifier)):
+        before = model.n_estimators
+        model.set_params(warm_start=True, n_estimators=before + rounds)
+        model.fit(X, y)
+        return model, f"{name}: warm start +{rounds} trees ({before} -> {model.n_estimators})"
+    if type(model).__name__ == "LGBMClassifier":
+        before = model.booster_.num_trees()
+        model.set_params(n_estimators=rounds)
+        model.fit(X, y, init_model=estimator.booster_)
+        return model, f"{name}: boosting continued ({before} -> {model.booster_.num_trees()} trees)"
+    if isinstance(model, (SGDClassifier, GaussianNB)):
+        model.partial_fit(X, y)
+        return model, f"{name}: partial_fit on {len(X)} rows"
+    if isinstance(model, LogisticRegression):
+        model.set_params(warm_start=True)
+        model.fit(X, y)
+        return model, f"{name}: warm start from current coefficients"
+    raise ValueError(f"{name} has no incremental update")
+
+
+def transform_new_rows(pipeline, X, y):
+    """Fixed preprocessing for the update rows, with SMOTE refitted on them.
+
+    Every step keeps its fitted state except the class-balancing step, which
+    only exists at fit time and is refitted so the new rows are balanced the
+    same way the training data was.
+    """
+    for name, step in pipeline.steps[:-1]:
+        if name == "balance":
+            X, y = clone(step).fit(X, y).transform(X, y)
+        else:
+            X = step.transform(X)
+    return X, y
+
+
+def with_estimator(pipeline, estimator):
+    updated = copy.copy(pipeline)
+    updated.steps = pipeline.steps[:-1] + [(pipeline.steps[-1][0], estimator)]
+    return updated
+
+
+def out_of_fold_update(pipeline, X, y, rounds, n_folds=5, seed=42):
+    """(probability, y, department) of the update, cross-validated over the new rows.
+
+    Each fold is scored by the current model updated on the other folds only,
+    so the scores are out-of-sample for the update the way train.py's are for
+    a fresh fit.
+    """
+    from sklearn.model_selection import StratifiedKFold
+
+    estimator = pipeline.steps[-1][1]
+    probability = np.zeros(len(X))
+    for train_idx, test_idx in StratifiedKFold(n_folds, shuffle=True, random_state=seed).split(X, y):
+        X_fit, y_fit = transform_new_rows(pipeline, X.iloc[train_idx], y[train_idx])
+        model, _ = update_estimator(estimator, X_fit, np.asarray(y_fit), rounds)
+        fold_pipeline = with_estimator(pipeline, model)
+        probability[test_idx] = fold_pipeline.predict_proba(X.iloc[test_idx])[
+            :, list(fold_pipeline.classes_).index(1)]
+    return probability, y, X["department"].to_numpy(dtype=object)
+
+
+# ---- driver --------------------------------------------------------------------
+
+def incremental_update(new_path, holdout=0.2, rounds=None, min_recall=MIN_RECALL, max_psi=MAX_PSI,
+                       tolerance=TOLERANCE, history_path=DATA_PATH, model_name=MODEL_NAME):
+    """Check, update and validate; nothing is saved here.
+
+    Returns (report dict, updated pipeline or None, the new rows that pass
+    the feature schema).
+    """
+    from pycaret.classification import load_model
+
+    report = {"new_data": new_path, "rebuild_reasons": []}
+    pipeline = load_model(model_name, verbose=False)
+    new, new_report = drop_invalid(load_students(new_path).fillna(FILL_VALUES))
+    history, _ = drop_invalid(load_students(history_path).fillna(FILL_VALUES))
+    if new_report.missing_columns:
+        raise ValueError(f"{new_path} is missing feature columns: {new_report.missing_columns}")
+    if new_report.n_invalid:
+        print(f" Dropped {new_report.n_invalid} new rows that fail the feature schema:")
+        for line in new_report.messages(limit=10):
+            print(f"   {line}")
+    X_new, y_new = new.drop(columns=[TARGET]), new[TARGET].to_numpy()
+    print(f" New rows: {len(new):,} ({y_new.mean():.1%} dropouts), history: {len(history):,}")
+
+    # Drift and performance checks on all the new rows
+    print("\n[2/5] Checking drift and current performance...")
+    psi = drift_report(history, new)
+    report["psi"] = psi.round(4).to_dict()
+    drifted = psi[psi > max_psi]
+    print(f" Largest PSI: " + ", ".join(f"{c} {v:.3f}" for c, v in psi.head(3).items()))
+    if len(drifted):
+        report["rebuild_reasons"].append(
+            f"drift: PSI > {max_psi} for {', '.join(drifted.index)}")
+    current_on_new = evaluate(pipeline, X_new, y_new)
+    report["current_on_new"] = current_on_new
+    print(f" Current model on new rows: recall {current_on_new['recall']:.4f}, "
+          f"AUC {current_on_new['auc']:.4f}")
+    if current_on_new["recall"] < min_recall:
+        report["rebuild_reasons"].append(
+            f"performance: recall {current_on_new['recall']:.4f} < {min_recall}")
+
+    # Update on the training part of the new rows only
+    print("\n[3/5] Updating the estimator on the new rows...")
+    X_update, X_hold, y_update, y_hold = train_test_split(
+        X_new, y_new, test_size=holdout, stratify=y_new, random_state=42)
+    estimator = pipeline.steps[-1][1]
+    rounds = rounds or max(10, getattr(estimator, "n_estimators", 100) // 10)
+    report["rounds"] = rounds
+    start = time.perf_counter()
+    X_fit, y_fit = transform_new_rows(pipeline, X_update, y_update)
+    try:
+        updated_estimator, description = update_estimator(estimator, X_fit, np.asarray(y_fit), rounds)
+    except ValueError as exc:
+        report["rebuild_reasons"].append(str(exc))
+        print(f" {exc}")
+        return report, None, new
+    report["update_seconds"] = time.perf_counter() - start
+    report["update"] = description
+    print(f" {description} in {report['update_seconds']:.1f}s")
+    updated = with_estimator(pipeline, updated_estimator)
+
+    # Holdout validation
+    print(f"\n[4/5] Validating on a {holdout:.0%} holdout ({len(y_hold)} rows)...")
+    before, after = evaluate(pipeline, X_hold, y_hold), evaluate(updated, X_hold, y_hold)
+    report["holdout"] = {"current": before, "updated": after}
+    print(f" {'Metric':<12}{'Current':>10}{'Updated':>10}")
+    for metric in before:
+        print(f" {metric:<12}{before[metric]:>10.4f}{after[metric]:>10.4f}")
+    # Recall is what matters, but AUC keeps "flag everyone" updates from passing
+    for metric in ("recall", "auc"):
+        if after[metric] < before[metric] - tolerance:
+            report["rebuild_reasons"].append(
+                f"validation: holdout {metric} fell {before[metric]:.4f} -> {after[metric]:.4f}")
+    report["accepted"] = not any(r.startswith("validation") for r in report["rebuild_reasons"])
+    return report, updated, new
+
+
+def save_updated(pipeline, new, rounds, model_name=MODEL_NAME):
+    """Save the updated model and re-export everything derived from it.
+
+    The out-of-fold scores for the thresholds come from repeating the update
+    (``rounds``) on folds of the valid new rows ``new``, starting from the
+    model as it was before this save. Returns the new thresholds.
+    """
+    import joblib
+    from pycaret.classification import load_model
+
+    from attributions import EXPLAINER_PATH, export_explainer
+    from drift_monitor import REFERENCE_PATH, export_reference
+    from inference import SCORER_PATH, export_scorer
+    from model_artifact import ARTIFACT_PATH, export_artifact
+    from thresholds import OOF_PATH, THRESHOLDS_PATH, export_thresholds, save_out_of_fold
+
+    base_pipeline = load_model(model_name, verbose=False)
+    # What save_model() writes for a full pipeline, without needing setup()
+    joblib.dump(pipeline, f"{model_name}.pkl")
+    export_scorer(pipeline, SCORER_PATH)
+    try:
+        export_artifact(pipeline, ARTIFACT_PATH, model_name)
+    except ValueError as exc:
+        print(f" Skipped memory-mapped artifact: {exc}")
+    try:
+        export_explainer(pipeline, EXPLAINER_PATH, model_name)
+    except ValueError as exc:
+        print(f" Skipped feature attributions: {exc}")
+
+    X_new, y_new = new.drop(columns=[TARGET]), new[TARGET].to_numpy()
+    export_reference(X_new, REFERENCE_PATH)
+    oof_probability, oof_y, oof_department = out_of_fold_update(base_pipeline, X_new, y_new, rounds)
+    save_out_of_fold(oof_probability, oof_y, oof_department, OOF_PATH)
+    # Written after the .pkl so model_sha256 matches the updated model
+    return export_thresholds(oof_probability, oof_y, oof_department, path=THRESHOLDS_PATH,
+                             model_name=model_name)
+
+
+def append_history(new, history_path=DATA_PATH):
+    """Append the new semester's valid rows to the training dataset, in its column order.
+
+    ``new`` is the frame incremental_update() returns, so rows failing the
+    feature schema never reach the file train.py loads.
+    """
+    history_columns = pd.read_csv(history_path, nrows=0).columns
+    new = new[history_columns]
+    new.to_csv(history_path, mode="a", header=False, index=False)
+    return len(new)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Update the saved model with a new semester of labels.")
+    parser.add_argument("new_data", help="labelled CSV/Parquet/Arrow of new students (with will_dropout)")
+    parser.add_argument("--holdout", type=float, default=0.2,
+                        help="fraction of new rows held out for validation (default: 0.2)")
+    parser.add_argument("--rounds", type=int, default=None,
+                        help="trees/rounds to add (default: 10%% of the current ensemble, at least 10)")
+    parser.add_argument("--min-recall", type=float, default=MIN_RECALL,
+                        help=f"rebuild if recall on the new rows is lower (default: {MIN_RECALL})")
+    parser.add_argument("--max-psi", type=float, default=MAX_PSI,
+                        help=f"rebuild if any feature drifts more (default: {MAX_PSI})")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help=f"allowed drop in holdout recall and AUC (default: {TOLERANCE})")
+    parser.add_argument("--dry-run", action="store_true", help="report only, don't save the model")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="if a full rebuild is needed, append the rows to the dataset and run train.py")
+    parser.add_argument("--report", metavar="PATH", help="also write the report as JSON")
+    parser.add_argument("--alias", default=DEFAULT_ALIAS,
+                        help=f"registry alias for the updated version, if a registry exists (default: {DEFAULT_ALIAS})")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("STUDENT DROPOUT PREDICTION - INCREMENTAL UPDATE")
+    print("=" * 70)
+    print("\n[1/5] Loading model and data...")
+    report, updated, new = incremental_update(args.new_data, args.holdout, args.rounds,
+                                         args.min_recall, args.max_psi, args.tolerance)
+
+    print("\n[5/5] Decision...")
+    reasons = report["rebuild_reasons"]
+    if reasons:
+        report["decision"] = "rebuild"
+        print(" Full rebuild needed:")
+        for reason in reasons:
+            print(f"   - {reason}")
+    else:
+        report["decision"] = "updated" if not args.dry_run else "update (dry run)"
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2, default=float)
+
+    if reasons:
+        if args.rebuild and not args.dry_run:
+            rows = append_history(new)
+            print(f" Appended {rows:,} rows to {DATA_PATH}; running train.py...")
+            sys.exit(subprocess.run([sys.executable, "train.py"]).returncode)
+        print(" Model unchanged. Re-run with --rebuild, or add the rows to the dataset and run train.py.")
+        print("=" * 70)
+        sys.exit(2)
+
+    if args.dry_run:
+        print(" Update passed validation (dry run - nothing saved)")
+    else:
+        thresholds = save_updated(updated, new, report["rounds"])
+        print(f" Update accepted - saved {MODEL_NAME}.pkl and re-exported the scorers")
+        print(f" Risk cutoffs re-optimized on out-of-fold scores of the update: "
+              f"HIGH >= {thresholds['overall']['high']:.3f}, "
+              f"MODERATE >= {thresholds['overall']['moderate']:.3f}; drift reference rebuilt "
+              f"from {len(new):,} new rows")
+        registry = ModelRegistry()
+        if registry.exists():
+            version = registry.publish(metrics=report["holdout"]["updated"], data_path=args.new_data,
+                                       aliases=[args.alias], source="incremental.py",
+                                       notes=report["update"])
+            print(f" Published to the model registry as {version} ({args.alias})")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+"""
+STUDENT DROPOUT PREDICTION - LIGHTWEIGHT INFERENCE
+===================================================
+Standalone scorer exported from the saved PyCaret pipeline.
+Needs only NumPy and scikit-learn at prediction time.
+
+Usage:
+    python inference.py export     # student_dropout_model.pkl -> student_dropout_scorer.pkl
+    python inference.py check      # parity against predict_model on the dataset
+"""
+
+import argparse
+import os
+import pickle
+import warnings
+
+import numpy as np
+
+from thresholds import load_thresholds
+
+MODEL_NAME = "student_dropout_model"
+SCORER_PATH = "student_dropout_scorer.pkl"
+ARTIFACT_PATH = "student_dropout_scorer.bin"
+TARGET = "will_dropout"
+
+# Risk tiers shown in app.py - cost-optimized cutoffs saved by thresholds.py,
+# or 0.7 / 0.4 if none have been saved
+RISK_THRESHOLDS = load_thresholds()
+HIGH_RISK_THRESHOLD = RISK_THRESHOLDS["high"]
+MODERATE_RISK_THRESHOLD = RISK_THRESHOLDS["moderate"]
+
+# Steps that only run while fitting (SMOTE) and are skipped at predict time
+TRAIN_ONLY_STEPS = {"balance"}
+
+
+class DropoutScorer:
+    """Re-implementation of the fitted preprocessing plus the tuned estimator.
+
+    The PyCaret pipeline is imputation -> ordinal/one-hot encoding -> z-score
+    normalization -> estimator. All of the fitted state is held here as plain
+    NumPy arrays, so scoring is a handful of vectorized array operations
+    followed by ``estimator.predict_proba``.
+    """
+
+    def __init__(self, feature_names, numeric_features, numeric_fill,
+                 categorical_features, categorical_fill, encoders,
+                 output_columns, scale_mean, scale_std, estimator):
+        self.feature_names = list(feature_names)
+        self.numeric_features = list(numeric_features)
+        self.numeric_fill = np.asarray(numeric_fill, dtype=float)
+        self.categorical_features = list(categorical_features)
+        self.categorical_fill = np.asarray(categorical_fill, dtype=object)
+        self.encoders = encoders
+        self.output_columns = list(output_columns)
+        self.scale_mean = np.asarray(scale_mean, dtype=float)
+        self.scale_std = np.asarray(scale_std, dtype=float)
+        self.estimator = estimator
+
+        position = {name: i for i, name in enumerate(self.feature_names)}
+        output_position = {name: i for i, name in enumerate(self.output_columns)}
+        self._numeric_idx = np.array([position[f] for f in self.numeric_features], dtype=int)
+        self._numeric_out = np.array([output_position[f] for f in self.numeric_features], dtype=int)
+        self._categorical_idx = np.array([position[f] for f in self.categorical_features], dtype=int)
+
+    @property
+    def classes_(self):
+        # Read from the estimator, which train_streaming.py fits after the scorer exists
+        return np.asarray(self.estimator.classes_)
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        """Extract the fitted state from a PyCaret classification pipeline."""
+        steps = dict(pipeline.steps)
+        for name in steps:
+            if name not in TRAIN_ONLY_STEPS and name not in {
+                    "numerical_imputer", "categorical_imputer", "ordinal_encoding",
+                    "onehot_encoding", "normalize", "actual_estimator"}:
+                raise ValueError(f"Unsupported pipeline step for export: {name}")
+
+        estimator = steps["actual_estimator"]
+        output_columns = list(estimator.feature_names_in_)
+        output_position = {name: i for i, name in enumerate(output_columns)}
+
+        numeric = steps["numerical_imputer"]
+        categorical = steps["categorical_imputer"]
+        numeric_features = list(numeric.include)
+        categorical_features = list(categorical.include)
+        feature_names = [f for f in pipeline.feature_names_in_
+                         if f in numeric_features or f in categorical_features]
+
+        encoders = {}
+        if "ordinal_encoding" in steps:
+            ordinal = steps["ordinal_encoding"].transformer
+            for entry in ordinal.mapping:
+                mapping = {k: v for k, v in entry["mapping"].items() if isinstance(k, str)}
+                encoders[entry["col"]] = _encoder(
+                    "ordinal", mapping.keys(), mapping.values(),
+                    position=output_position[entry["col"]])
+
+        if "onehot_encoding" in steps:
+            onehot = steps["onehot_encoding"].transformer
+            dummies = {entry["col"]: entry["mapping"] for entry in onehot.mapping}
+            for entry in onehot.ordinal_encoder.mapping:
+                col = entry["col"]
+                categories, positions = [], []
+                for category, code in entry["mapping"].items():
+                    if not isinstance(category, str):
+                        continue
+                    row = dummies[col].loc[code]
+                    categories.append(category)
+                    positions.append(output_position[row.idxmax()])
+                encoders[col] = _encoder("onehot", categories, positions)
+
+        missing = set(categorical_features) - set(encoders)
+        if missing:
+            raise ValueError(f"No encoder found for categorical features: {sorted(missing)}")
+
+        if "normalize" in steps:
+            scaler = steps["normalize"].transformer
+            if list(scaler.feature_names_in_) != output_columns:
+                raise ValueError("Scaler columns do not match estimator columns")
+            scale_mean, scale_std = scaler.mean_, scaler.scale_
+        else:
+            scale_mean = np.zeros(len(output_columns))
+            scale_std = np.ones(len(output_columns))
+
+        return cls(
+            feature_names=feature_names,
+            numeric_features=numeric_features,
+            numeric_fill=numeric.transformer.statistics_,
+            categorical_features=categorical_features,
+            categorical_fill=categorical.transformer.statistics_,
+            encoders=encoders,
+            output_columns=output_columns,
+            scale_mean=scale_mean,
+            scale_std=scale_std,
+            estimator=estimator,
+        )
+
+    def save(self, path=SCORER_PATH):
+        """Pickle the fitted state only, so the file holds nothing but
+        built-ins, NumPy arrays and the sklearn estimator."""
+        state = {
+            "feature_names": self.feature_names,
+            "numeric_features": self.numeric_features,
+            "numeric_fill": self.numeric_fill,
+            "categorical_features": self.categorical_features,
+            "categorical_fill": self.categorical_fill,
+            "encoders": self.encoders,
+            "output_columns": self.output_columns,
+            "scale_mean": self.scale_mean,
+            "scale_std": self.scale_std,
+            "estimator": self.estimator,
+        }
+        with open(path, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path=SCORER_PATH):
+        with open(path, "rb") as f:
+            return cls(**pickle.load(f))
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+    def as_matrix(self, X):
+        return as_matrix(X, self.feature_names)
+
+    def transform(self, X):
+        """Return the normalized design matrix the estimator was trained on."""
+        M = self.as_matrix(X)
+        Z = np.zeros((M.shape[0], len(self.output_columns)), dtype=float)
+
+        numeric = M[:, self._numeric_idx].astype(float)
+        missing = np.isnan(numeric)
+        if missing.any():
+            numeric = np.where(missing, self.numeric_fill, numeric)
+        Z[:, self._numeric_out] = numeric
+
+        rows = np.arange(M.shape[0])
+        for j, feature, fill in zip(self._categorical_idx, self.categorical_features,
+                                    self.categorical_fill):
+            column = M[:, j]
+            missing = np.equal(column, None) | (column != column)
+            if missing.any():
+                column = np.where(missing, fill, column)
+            kind, categories, values = self.encoders[feature]
+            values_idx = np.searchsorted(categories, column.astype(str))
+            values_idx = np.minimum(values_idx, len(categories) - 1)
+            known = categories[values_idx] == column.astype(str)
+            if kind == "ordinal":
+                position, codes = values
+                Z[:, position] = np.where(known, codes[values_idx], -1)
+            else:
+                # Unknown categories leave every dummy at zero, like handle_unknown='value'
+                Z[rows[known], values[values_idx[known]]] = 1.0
+
+        return (Z - self.scale_mean) / self.scale_std
+
+    def predict_proba(self, X):
+        Z = self.transform(X)
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", message="X does not have valid feature names")
+            return self.estimator.predict_proba(Z)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def dropout_probability(self, X):
+        """Probability of the positive (will_dropout=1) class."""
+        return self.predict_proba(X)[:, list(self.classes_).index(1)]
+
+
+def risk_thresholds(department=None, thresholds=None):
+    """(high, moderate) cutoffs, per department where one was optimized.
+
+    ``thresholds`` is a load_thresholds() result; the saved cutoffs of the
+    current model are used if it is None.
+    """
+    thresholds = thresholds or RISK_THRESHOLDS
+    return thresholds["by_department"].get(department, (thresholds["high"], thresholds["moderate"]))
+
+
+def risk_level(probability, department=None, thresholds=None):
+    """Map a dropout probability to the app's HIGH/MODERATE/LOW tiers."""
+    high, moderate = risk_thresholds(department, thresholds)
+    if probability >= high:
+        return "HIGH RISK"
+    if probability >= moderate:
+        return "MODERATE RISK"
+    return "LOW RISK"
+
+
+def risk_levels(probabilities, departments=None, thresholds=None):
+    """Vectorized risk_level() over an array of probabilities."""
+    thresholds = thresholds or RISK_THRESHOLDS
+    probabilities = np.asarray(probabilities, dtype=float)
+    high = np.full(len(probabilities), thresholds["high"])
+    moderate = np.full(len(probabilities), thresholds["moderate"])
+    if departments is not None and thresholds["by_department"]:
+        departments = np.asarray(departments, dtype=object)
+        for department, (d_high, d_moderate) in thresholds["by_department"].items():
+            mask = departments == department
+            high[mask], moderate[mask] = d_high, d_moderate
+    return np.select([probabilities >= high, probabilities >= moderate],
+                     ["HIGH RISK", "MODERATE RISK"], default="LOW RISK")
+
+
+def as_matrix(X, feature_names):
+    """Coerce records, a DataFrame or a 2D array into an object matrix.
+
+    Records may be a single dict or a list of dicts keyed by feature name.
+    Arrays must already be in ``feature_names`` order.
+    """
+    if isinstance(X, dict):
+        X = [X]
+    if isinstance(X, (list, tuple)) and X and isinstance(X[0], dict):
+        return np.array([[record.get(f) for f in feature_names] for record in X], dtype=object)
+    if hasattr(X, "columns"):
+        return X[feature_names].to_numpy(dtype=object)
+    X = np.asarray(X, dtype=object)
+    if X.ndim == 1:
+        X = X.reshape(1, -1)
+    if X.shape[1] != len(feature_names):
+        raise ValueError(f"Expected {len(feature_names)} features, got {X.shape[1]}")
+    return X
+
+
+def _encoder(kind, categories, values, position=None):
+    """Sorted lookup table so categories can be matched with np.searchsorted."""
+    categories = np.asarray(list(categories), dtype=str)
+    values = np.asarray(list(values))
+    order = np.argsort(categories)
+    if kind == "ordinal":
+        return kind, categories[order], (position, values[order].astype(float))
+    return kind, categories[order], values[order].astype(int)
+
+
+def export_scorer(pipeline, path=SCORER_PATH):
+    """Convert a finalized PyCaret pipeline into a standalone scorer file."""
+    scorer = DropoutScorer.from_pipeline(pipeline)
+    scorer.save(path)
+    return scorer
+
+
+def load_scorer(path=SCORER_PATH):
+    return DropoutScorer.load(path)
+
+
+class PipelineScorer:
+    """The DropoutScorer interface on top of a full PyCaret pipeline.
+
+    Used as a fallback when no exported scorer file exists.
+    """
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self.feature_names = [f for f in pipeline.feature_names_in_ if f != TARGET]
+        self.classes_ = np.asarray(pipeline.classes_)
+
+    def predict_proba(self, X):
+        import pandas as pd
+        if not hasattr(X, "columns"):
+            X = pd.DataFrame(as_matrix(X, self.feature_names),
+                             columns=self.feature_names).infer_objects()
+        return self.pipeline.predict_proba(X[self.feature_names])
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def dropout_probability(self, X):
+        return self.predict_proba(X)[:, list(self.classes_).index(1)]
+
+
+def _artifact_usable(artifact_path, model_name):
+    if not os.path.exists(artifact_path):
+        return False
+    from model_artifact import is_current
+    if is_current(artifact_path, model_name):
+        return True
+    warnings.warn(f"{artifact_path} was exported from a different {model_name}.pkl; ignoring it")
+    return False
+
+
+def scoring_model_path(scorer_path=SCORER_PATH, model_name=MODEL_NAME, artifact_path=ARTIFACT_PATH):
+    """The file load_scoring_model() will read."""
+    if _artifact_usable(artifact_path, model_name):
+        return artifact_path
+    return scorer_path if os.path.exists(scorer_path) else f"{model_name}.pkl"
+
+
+def load_scoring_model(scorer_path=SCORER_PATH, model_name=MODEL_NAME, artifact_path=ARTIFACT_PATH):
+    """Load the fastest available scorer for the saved model.
+
+    In order: the memory-mapped artifact (shared between processes), the
+    pickled scorer, then the PyCaret pipeline. PyCaret is only imported on
+    the last path.
+    """
+    if _artifact_usable(artifact_path, model_name):
+        from model_artifact import load_artifact
+        return load_artifact(artifact_path)
+    if os.path.exists(scorer_path):
+        return load_scorer(scorer_path)
+    from pycaret.classification import load_model
+    return PipelineScorer(load_model(model_name, verbose=False))
+
+
+def check_parity(model_name=MODEL_NAME, scorer_path=SCORER_PATH,
+                 data_path="student_dropout_dataset.csv", tolerance=1e-9):
+    """Compare the exported scorer against the PyCaret pipeline.
+
+    Returns the largest absolute probability difference seen; raises
+    AssertionError if it exceeds ``tolerance`` or any label disagrees with
+    predict_model.
+    """
+    import pandas as pd
+    from pycaret.classification import load_model, predict_model
+
+    pipeline = load_model(model_name, verbose=False)
+    scorer = load_scorer(scorer_path)
+
+    data = pd.read_csv(data_path)
+    data["scholarship_status"] = data["scholarship_status"].fillna("None")
+    features = data.drop(columns=[TARGET], errors="ignore")
+
+    expected = pipeline.predict_proba(features)
+    reference = predict_model(pipeline, data=features, verbose=False)
+
+    worst = 0.0
+    for name, X in [("records", features.to_dict("records")),
+                    ("ndarray", features[scorer.feature_names].to_numpy(dtype=object)),
+                    ("DataFrame", features)]:
+        actual = scorer.predict_proba(X)
+        diff = float(np.max(np.abs(actual - expected)))
+        worst = max(worst, diff)
+        assert diff <= tolerance, f"{name}: max probability difference {diff:.2e} > {tolerance:.0e}"
+        labels = scorer.classes_[np.argmax(actual, axis=1)]
+        assert (labels == reference["prediction_label"].to_numpy()).all(), f"{name}: labels differ"
+        scores = np.round(actual.max(axis=1), 4)
+        assert np.allclose(scores, reference["prediction_score"].to_numpy()), f"{name}: scores differ"
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or verify the lightweight scorer.")
+    parser.add_argument("command", choices=["export", "check"])
+    parser.add_argument("--model", default=MODEL_NAME,
+                        help=f"saved model name without .pkl (default: {MODEL_NAME})")
+    parser.add_argument("--scorer", default=SCORER_PATH,
+                        help=f"scorer file (default: {SCORER_PATH})")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        from pycaret.classification import load_model
+        scorer = export_scorer(load_model(args.model, verbose=False), args.scorer)
+        print(f" Exported {type(scorer.estimator).__name__} scorer to {args.scorer}")
+        print(f" {len(scorer.feature_names)} input features -> {len(scorer.output_columns)} model columns")
+    else:
+        worst = check_parity(args.model, args.scorer)
+        print(f" Parity OK - max probability difference {worst:.2e}")
+
+
+if __name__ == "__main__":
+    main()
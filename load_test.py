@@ -0,0 +1,141 @@
+"""
+STUDENT DROPOUT PREDICTION - LOAD GENERATOR
+============================================
+Fire concurrent single-student requests at serve.py and report
+client-side latency percentiles and throughput.
+
+Usage:
+    python serve.py &
+    python load_test.py --concurrency 32 --requests 5000
+    python load_test.py --spawn          # start a local serve.py for the run
+"""
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+DATA_PATH = "student_dropout_dataset.csv"
+TARGET = "will_dropout"
+
+
+def load_students(path=DATA_PATH):
+    data = pd.read_csv(path)
+    data["scholarship_status"] = data["scholarship_status"].fillna("None")
+    return [json.dumps(record).encode()
+            for record in data.drop(columns=[TARGET], errors="ignore").to_dict("records")]
+
+
+async def http_request(reader, writer, host, method, path, body=b""):
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+        + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def client(host, port, bodies, counter, total, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            i = counter[0]
+            if i >= total:
+                break
+            counter[0] += 1
+            start = time.perf_counter()
+            status, _ = await http_request(reader, writer, host, "POST", "/predict",
+                                           bodies[i % len(bodies)])
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors[0] += 1
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, bodies, total, concurrency):
+    latencies, counter, errors = [], [0], [0]
+    start = time.perf_counter()
+    await asyncio.gather(*[client(host, port, bodies, counter, total, latencies, errors)
+                           for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    _, body = await http_request(reader, writer, host, "GET", "/metrics")
+    writer.close()
+    return np.array(latencies) * 1000, elapsed, errors[0], json.loads(body)
+
+
+async def wait_for_server(host, port, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise TimeoutError(f"serve.py did not start on {host}:{port}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the HTTP scoring service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--spawn", action="store_true",
+                        help="start serve.py in a subprocess for the duration of the run")
+    parser.add_argument("--max-batch-size", type=int, default=64,
+                        help="passed to serve.py with --spawn")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0,
+                        help="passed to serve.py with --spawn")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn:
+        server = subprocess.Popen([sys.executable, "serve.py", "--host", args.host,
+                                   "--port", str(args.port),
+                                   "--max-batch-size", str(args.max_batch_size),
+                                   "--max-wait-ms", str(args.max_wait_ms)])
+    try:
+        asyncio.run(wait_for_server(args.host, args.port))
+        bodies = load_students(args.data)
+        latencies, elapsed, errors, server_metrics = asyncio.run(
+            run_load(args.host, args.port, bodies, args.requests, args.concurrency))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print("=" * 70)
+    print("STUDENT DROPOUT PREDICTION - LOAD TEST")
+    print("=" * 70)
+    print(f"\n Requests: {len(latencies):,} ({errors} errors) with concurrency {args.concurrency}")
+    print(f" Throughput: {len(latencies) / elapsed:,.1f} req/s")
+    print(f" Client latency p50: {np.percentile(latencies, 50):.2f} ms")
+    print(f" Client latency p99: {np.percentile(latencies, 99):.2f} ms")
+    print(f"\n Server: {server_metrics['batches']:,} batches, "
+          f"{server_metrics['mean_batch_rows']:.1f} rows/batch on average")
+    print(f" Server latency p50: {server_metrics['latency_ms']['p50']:.2f} ms, "
+          f"p99: {server_metrics['latency_ms']['p99']:.2f} ms")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,413 @@
+"""
+STUDENT DROPOUT PREDICTION - MEMORY-MAPPED MODEL ARTIFACT
+==========================================================
+Flat-array alternative to the pickled scorer.
+
+The fitted preprocessing (imputation values, encoder lookups, scaler
+statistics) and the estimator (tree node arrays, boosting weights or linear
+coefficients) are written as aligned raw buffers behind a small JSON header:
+
+    b"SDPFLAT1" | header length (uint64) | JSON header | padding | arrays
+
+Loading maps the file read-only and wraps each buffer in a NumPy view, so
+nothing is unpickled or copied. Every process that scores with the same file
+shares its pages through the OS page cache instead of holding a private copy.
+
+The header records two sha256 checksums: one of the array payload (checked on
+every load) and one of the student_dropout_model.pkl it was exported from.
+load_scoring_model() skips an artifact whose pipeline checksum no longer
+matches the saved model.
+
+Supported estimators: AdaBoost (SAMME or SAMME.R) over decision trees, random forests /
+extra trees, single decision trees and logistic regression.
+
+Usage:
+    python model_artifact.py export        # student_dropout_model.pkl -> student_dropout_scorer.bin
+    python model_artifact.py verify        # checksums + parity against the PyCaret pipeline
+    python model_artifact.py share --workers 8
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from inference import ARTIFACT_PATH, MODEL_NAME, DropoutScorer
+
+MAGIC = b"SDPFLAT1"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+# Rows traversed together; bounds the (rows x trees) node-index matrix
+TREE_BLOCK_ROWS = 4096
+
+
+def _pipeline_hash(model_name=MODEL_NAME):
+    from train_cache import file_hash
+    path = f"{model_name}.pkl"
+    return file_hash(path) if os.path.exists(path) else None
+
+
+# ---- estimators ------------------------------------------------------------
+
+def _flatten_trees(trees, arrays, n_classes):
+    """Concatenate the node arrays of ``trees`` into one set of flat buffers.
+
+    Leaves point at themselves, so every tree can be walked a fixed number of
+    steps (the deepest tree's depth) with no per-tree bookkeeping.
+    """
+    left, right, feature, threshold, value, roots = [], [], [], [], [], []
+    offset, max_depth = 0, 0
+    for tree in trees:
+        t = tree.tree_
+        ids = np.arange(t.node_count)
+        leaf = t.children_left == -1
+        left.append(np.where(leaf, ids, t.children_left) + offset)
+        right.append(np.where(leaf, ids, t.children_right) + offset)
+        feature.append(np.where(leaf, 0, t.feature))
+        threshold.append(np.where(leaf, np.inf, t.threshold))
+        counts = t.value.reshape(t.node_count, -1)[:, :n_classes]
+        value.append(counts / counts.sum(axis=1, keepdims=True))
+        roots.append(offset)
+        offset += t.node_count
+        max_depth = max(max_depth, t.max_depth)
+
+    arrays["tree.left"] = np.concatenate(left).astype(np.int32)
+    arrays["tree.right"] = np.concatenate(right).astype(np.int32)
+    arrays["tree.feature"] = np.concatenate(feature).astype(np.int32)
+    arrays["tree.threshold"] = np.concatenate(threshold).astype(np.float64)
+    arrays["tree.value"] = np.concatenate(value).astype(np.float64)
+    arrays["tree.roots"] = np.asarray(roots, dtype=np.int32)
+    return max_depth
+
+
+def _flatten_estimator(estimator, arrays):
+    """Describe ``estimator`` as header metadata plus entries in ``arrays``."""
+    from sklearn.ensemble import AdaBoostClassifier, ExtraTreesClassifier, RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.tree import DecisionTreeClassifier
+
+    classes = np.asarray(estimator.classes_)
+    meta = {"classes": classes.tolist()}
+    if isinstance(estimator, AdaBoostClassifier):
+        trees = estimator.estimators_
+        n_classes = len(classes)
+        meta["kind"] = "adaboost"
+        meta["max_depth"] = _flatten_trees(trees, arrays, n_classes)
+        meta["weight_sum"] = float(np.sum(estimator.estimator_weights_))
+        # What each leaf adds to the decision function, per class
+        proba = arrays["tree.value"]
+        if estimator.algorithm == "SAMME":
+            # The tree's weight for the class it predicts, -w / (K - 1) for the others
+            weights = np.repeat(estimator.estimator_weights_[:len(trees)],
+                                [tree.tree_.node_count for tree in trees])[:, None]
+            predicted = np.arange(n_classes) == np.argmax(proba, axis=1)[:, None]
+            score = np.where(predicted, weights, -weights / (n_classes - 1))
+        else:
+            # SAMME.R: centred log-probabilities of the leaf
+            log_proba = np.log(np.clip(proba, np.finfo(proba.dtype).eps, None))
+            score = (n_classes - 1) * (log_proba - (1.0 / n_classes) * log_proba.sum(axis=1)[:, None])
+        arrays["adaboost.node_score"] = score.astype(np.float64)
+    elif isinstance(estimator, (RandomForestClassifier, ExtraTreesClassifier, DecisionTreeClassifier)):
+        trees = getattr(estimator, "estimators_", [estimator])
+        meta["kind"] = "forest"
+        meta["max_depth"] = _flatten_trees(trees, arrays, len(classes))
+    elif isinstance(estimator, LogisticRegression):
+        meta["kind"] = "linear"
+        meta["multinomial"] = bool(len(classes) > 2 and estimator.multi_class != "ovr"
+                                   and estimator.solver != "liblinear")
+        arrays["linear.coef"] = np.asarray(estimator.coef_, dtype=np.float64)
+        arrays["linear.intercept"] = np.asarray(estimator.intercept_, dtype=np.float64)
+    else:
+        raise ValueError(f"{type(estimator).__name__} can't be stored as a flat artifact")
+    return meta
+
+
+def _softmax(x):
+    x = x - x.max(axis=1, keepdims=True)
+    np.exp(x, out=x)
+    return x / x.sum(axis=1, keepdims=True)
+
+
+class FlatEstimator:
+    """predict_proba over the flat buffers, matching the sklearn estimator."""
+
+    def __init__(self, meta, arrays):
+        self.meta = meta
+        self.kind = meta["kind"]
+        self.classes_ = np.asarray(meta["classes"])
+        self.arrays = arrays
+        if self.kind in ("adaboost", "forest"):
+            self._left = arrays["tree.left"]
+            self._right = arrays["tree.right"]
+            self._feature = arrays["tree.feature"]
+            self._threshold = arrays["tree.threshold"]
+            self._value = arrays["tree.value"]
+            self._roots = arrays["tree.roots"]
+
+    def _leaves(self, X):
+        """Leaf node index of every (row, tree) pair."""
+        # sklearn trees compare float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self._roots, (len(X), len(self._roots))).copy()
+        for _ in range(self.meta["max_depth"]):
+            go_left = X[rows, self._feature[nodes]] <= self._threshold[nodes]
+            nodes = np.where(go_left, self._left[nodes], self._right[nodes])
+        return nodes
+
+    def predict_proba(self, X):
+        if self.kind == "linear":
+            decision = X @ self.arrays["linear.coef"].T + self.arrays["linear.intercept"]
+            if decision.shape[1] == 1:
+                positive = 1 / (1 + np.exp(-decision[:, 0]))
+                return np.column_stack([1 - positive, positive])
+            if self.meta["multinomial"]:
+                return _softmax(decision)
+            proba = 1 / (1 + np.exp(-decision))
+            return proba / proba.sum(axis=1, keepdims=True)
+
+        blocks = [self._proba_block(X[start:start + TREE_BLOCK_ROWS])
+                  for start in range(0, len(X), TREE_BLOCK_ROWS)]
+        return np.vstack(blocks) if blocks else np.empty((0, len(self.classes_)))
+
+    def _proba_block(self, X):
+        leaves = self._leaves(X)
+        n_classes = len(self.classes_)
+        if self.kind == "forest":
+            return self._value[leaves].mean(axis=1)
+
+        # AdaBoostClassifier.decision_function, then its softmax
+        votes = self.arrays["adaboost.node_score"][leaves].sum(axis=1) / self.meta["weight_sum"]
+        if n_classes == 2:
+            decision = votes[:, 1] - votes[:, 0]
+            return _softmax(np.column_stack([-decision, decision]) / 2)
+        return _softmax(votes / (n_classes - 1))
+
+
+# ---- file format -----------------------------------------------------------
+
+def _pad(n):
+    return (-n) % ALIGNMENT
+
+
+def write_artifact(scorer, path=ARTIFACT_PATH, pipeline_sha256=None):
+    """Write ``scorer`` (a DropoutScorer) as a flat artifact and return its header."""
+    arrays = {
+        "numeric_fill": scorer.numeric_fill,
+        "scale_mean": scorer.scale_mean,
+        "scale_std": scorer.scale_std,
+    }
+    encoders = {}
+    for feature, (kind, categories, values) in scorer.encoders.items():
+        encoders[feature] = {"kind": kind, "categories": categories.tolist()}
+        if kind == "ordinal":
+            encoders[feature]["position"] = int(values[0])
+            arrays[f"encoder.{feature}"] = values[1]
+        else:
+            arrays[f"encoder.{feature}"] = values
+    estimator = _flatten_estimator(scorer.estimator, arrays)
+
+    layout, payload, offset = {}, [], 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        payload.append(array.tobytes())
+        payload.append(b"\0" * _pad(array.nbytes))
+        offset += array.nbytes + _pad(array.nbytes)
+    payload = b"".join(payload)
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "created": time.time(),
+        "payload_sha256": hashlib.sha256(payload).hexdigest(),
+        "pipeline_sha256": pipeline_sha256,
+        "scorer": {
+            "feature_names": scorer.feature_names,
+            "numeric_features": scorer.numeric_features,
+            "categorical_features": scorer.categorical_features,
+            "categorical_fill": [str(v) for v in scorer.categorical_fill],
+            "output_columns": scorer.output_columns,
+            "encoders": encoders,
+        },
+        "estimator": estimator,
+        "arrays": layout,
+    }
+    encoded = json.dumps(header).encode()
+    prefix = MAGIC + len(encoded).to_bytes(8, "little") + encoded
+    tmp_path = f"{path}.partial"
+    with open(tmp_path, "wb") as f:
+        f.write(prefix + b"\0" * _pad(len(prefix)))
+        f.write(payload)
+    os.replace(tmp_path, path)
+    return header
+
+
+def read_header(path=ARTIFACT_PATH):
+    """(header, payload start offset) without mapping the arrays."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a flat model artifact")
+        length = int.from_bytes(f.read(8), "little")
+        header = json.loads(f.read(length))
+    if header["format_version"] != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported format version {header['format_version']}")
+    prefix = len(MAGIC) + 8 + length
+    return header, prefix + _pad(prefix)
+
+
+def load_artifact(path=ARTIFACT_PATH, verify=True):
+    """Map ``path`` read-only and return a DropoutScorer whose arrays are views into it.
+
+    ``verify`` hashes the mapped payload against the header checksum.
+    """
+    header, start = read_header(path)
+    buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    if verify and hashlib.sha256(buffer[start:]).hexdigest() != header["payload_sha256"]:
+        raise ValueError(f"{path}: payload checksum mismatch (corrupt or truncated file)")
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        view = np.frombuffer(buffer, dtype=dtype, count=count, offset=start + spec["offset"])
+        arrays[name] = view.reshape(spec["shape"])
+
+    meta = header["scorer"]
+    encoders = {}
+    for feature, spec in meta["encoders"].items():
+        categories = np.asarray(spec["categories"], dtype=str)
+        values = arrays[f"encoder.{feature}"]
+        encoders[feature] = (spec["kind"], categories,
+                             (spec["position"], values) if spec["kind"] == "ordinal" else values)
+
+    scorer = DropoutScorer(
+        feature_names=meta["feature_names"],
+        numeric_features=meta["numeric_features"],
+        numeric_fill=arrays["numeric_fill"],
+        categorical_features=meta["categorical_features"],
+        categorical_fill=meta["categorical_fill"],
+        encoders=encoders,
+        output_columns=meta["output_columns"],
+        scale_mean=arrays["scale_mean"],
+        scale_std=arrays["scale_std"],
+        estimator=FlatEstimator(header["estimator"], arrays),
+    )
+    scorer.header = header
+    return scorer
+
+
+def is_current(path=ARTIFACT_PATH, model_name=MODEL_NAME):
+    """False if the artifact was exported from a different saved pipeline."""
+    expected = read_header(path)[0]["pipeline_sha256"]
+    actual = _pipeline_hash(model_name)
+    return expected is None or actual is None or expected == actual
+
+
+def export_artifact(pipeline, path=ARTIFACT_PATH, model_name=MODEL_NAME):
+    """Export a finalized PyCaret pipeline, saved as ``model_name``.pkl, as a flat artifact."""
+    scorer = DropoutScorer.from_pipeline(pipeline)
+    return write_artifact(scorer, path, _pipeline_hash(model_name))
+
+
+# ---- verification ------------------------------------------------------------
+
+def verify(path=ARTIFACT_PATH, model_name=MODEL_NAME, data_path="student_dropout_dataset.csv",
+           tolerance=1e-9):
+    """Check both checksums and probability parity with the saved PyCaret pipeline."""
+    import pandas as pd
+    from pycaret.classification import load_model
+
+    scorer = load_artifact(path, verify=True)
+    print(f" Payload checksum OK ({scorer.header['payload_sha256'][:12]})")
+    if not is_current(path, model_name):
+        raise AssertionError(f"{path} was exported from a different {model_name}.pkl - re-export it")
+    print(f" Pipeline checksum OK - matches {model_name}.pkl")
+
+    data = pd.read_csv(data_path, keep_default_na=False)
+    features = data.drop(columns=["will_dropout"], errors="ignore")
+    expected = load_model(model_name, verbose=False).predict_proba(features)
+    worst = float(np.max(np.abs(scorer.predict_proba(features) - expected)))
+    assert worst <= tolerance, f"max probability difference {worst:.2e} > {tolerance:.0e}"
+    print(f" Parity OK - max probability difference {worst:.2e} over {len(features):,} rows")
+    return worst
+
+
+def _memory_kb():
+    """(Rss, Pss) of this process in kB; Pss splits shared pages between their users."""
+    stats = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:"):
+                stats[parts[0][:-1]] = int(parts[1])
+    return stats["Rss"], stats["Pss"]
+
+
+def _share_worker(args):
+    loader, path, barrier = args
+    before = _memory_kb()
+    start = time.perf_counter()
+    scorer = load_artifact(path) if loader == "artifact" else DropoutScorer.load(path)
+    load_seconds = time.perf_counter() - start
+    scorer.dropout_probability(_sample_rows(scorer))  # touch every page of the model
+    barrier.wait()  # measure while all workers hold the model
+    after = _memory_kb()
+    barrier.wait()
+    return load_seconds, after[0] - before[0], after[1] - before[1]
+
+
+def _sample_rows(scorer, rows=256):
+    import pandas as pd
+    data = pd.read_csv("student_dropout_dataset.csv", keep_default_na=False, nrows=rows)
+    return data[scorer.feature_names]
+
+
+def share(workers, artifact_path=ARTIFACT_PATH, pickle_path="student_dropout_scorer.pkl"):
+    """Load the model in ``workers`` processes at once; report load time and memory per worker."""
+    import multiprocessing
+
+    context = multiprocessing.get_context("spawn")
+    print(f"\n {'Format':<40}{'Load (ms)':>11}{'RSS (MB)':>11}{'PSS (MB)':>11}   per worker")
+    print(" " + "-" * 84)
+    for loader, path in [("pickle", pickle_path), ("artifact", artifact_path)]:
+        with context.Manager() as manager:
+            barrier = manager.Barrier(workers)
+            with context.Pool(workers) as pool:
+                results = pool.map(_share_worker, [(loader, path, barrier)] * workers)
+        load_ms, rss, pss = (np.median([r[i] for r in results]) for i in range(3))
+        print(f" {loader + ' (' + path + ')':<40}{load_ms * 1000:>11.2f}{rss / 1024:>11.2f}{pss / 1024:>11.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export, verify or measure the flat model artifact.")
+    parser.add_argument("command", choices=["export", "verify", "share"])
+    parser.add_argument("--model", default=MODEL_NAME,
+                        help=f"saved model name without .pkl (default: {MODEL_NAME})")
+    parser.add_argument("--artifact", default=ARTIFACT_PATH,
+                        help=f"artifact file (default: {ARTIFACT_PATH})")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="processes loading the model at once for 'share' (default: 4)")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("STUDENT DROPOUT PREDICTION - MODEL ARTIFACT")
+    print("=" * 70)
+
+    if args.command == "export":
+        from pycaret.classification import load_model
+        header = export_artifact(load_model(args.model, verbose=False), args.artifact, args.model)
+        size_kb = os.path.getsize(args.artifact) / 1024
+        print(f" Exported {header['estimator']['kind']} artifact to {args.artifact} ({size_kb:.0f} KB)")
+        print(f" {len(header['arrays'])} arrays, pipeline sha256 {header['pipeline_sha256'][:12]}")
+    elif args.command == "verify":
+        verify(args.artifact, args.model)
+    else:
+        share(args.workers, args.artifact)
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
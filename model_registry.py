@@ -0,0 +1,512 @@
+"""
+STUDENT DROPOUT PREDICTION - MODEL REGISTRY
+===========================================
+Versioned models on local disk, resolved by alias, swapped without restarts.
+
+Layout (``MODEL_REGISTRY_DIR``, default model_registry/):
+
+    versions/v0001/meta.json        metrics, dataset sha256, file checksums
+    versions/v0001/scorer.pkl       + scorer.bin, model.pkl, explainer.pkl,
+                                      thresholds.json, drift_reference.json
+    aliases.json                    {"aliases": {"prod": "v0003", ...},
+                                     "canary_share": 0.1, "history": [...]}
+
+A version directory is written under a temporary name and renamed into
+place, and aliases.json is replaced atomically, so readers never see a
+half-published model.
+
+Aliases are free-form. ``prod`` serves everyone by default (``MODEL_ALIAS``
+picks another); ``prod:<Department>`` (e.g. ``prod:Engineering``) overrides
+it for one department, and ``prod:<column>=<value>`` (e.g.
+``prod:year_of_study=1``, published by train_segments.py) for one segment
+of any other column. While ``canary``
+exists, ``canary_share`` of the students go to it instead. The split hashes
+each student's inputs, so a given student always gets the same model.
+
+ModelRouter is what app.py, the cohort dashboard and serve.py score through.
+It stats aliases.json on every lookup. When the file changes, the next
+request resolves the new versions, which are loaded lazily into a bounded
+LRU (``MODEL_CACHE_SIZE`` models, default 3). Requests already running keep
+the model they started with, so none are dropped. Without a registry the
+router serves the student_dropout_* files in the working directory as
+before, and reloads them when they change; the same files are served while
+the registry has no version for the alias yet.
+
+Usage:
+    python model_registry.py list
+    python model_registry.py publish --alias canary --notes "2025 intake"
+    python model_registry.py alias prod v0004            # hot-swaps running apps
+    python model_registry.py alias prod:Engineering v0005
+    python model_registry.py canary-share 0.1
+    python model_registry.py rollback prod
+    python model_registry.py unalias canary
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from inference import (ARTIFACT_PATH, MODEL_NAME, SCORER_PATH, load_scorer, load_scoring_model,
+                       risk_level, risk_levels, risk_thresholds, scoring_model_path)
+from prediction_cache import file_hash, input_key
+from thresholds import THRESHOLDS_PATH, load_thresholds
+
+REGISTRY_DIR = os.environ.get("MODEL_REGISTRY_DIR", "model_registry")
+DEFAULT_ALIAS = "prod"
+MODEL_ALIAS = os.environ.get("MODEL_ALIAS", DEFAULT_ALIAS)
+MAX_LOADED_MODELS = int(os.environ.get("MODEL_CACHE_SIZE", "3"))
+CANARY_ALIAS = "canary"
+HISTORY_LENGTH = 100
+
+# File name inside a version -> the file train.py writes
+ARTIFACTS = {
+    "model.pkl": f"{MODEL_NAME}.pkl",
+    "scorer.pkl": SCORER_PATH,
+    "scorer.bin": ARTIFACT_PATH,
+    "explainer.pkl": "student_dropout_explainer.pkl",
+    "thresholds.json": THRESHOLDS_PATH,
+    "drift_reference.json": "student_dropout_drift_reference.json",
+}
+
+
+def segment_alias(alias, column, value):
+    """Alias of the model for one segment: ``prod:Engineering`` for departments,
+    ``prod:year_of_study=1`` for any other column."""
+    return f"{alias}:{value}" if column == "department" else f"{alias}:{column}={value}"
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _write_json(path, value):
+    temporary = Path(f"{path}.{os.getpid()}.tmp")
+    temporary.write_text(json.dumps(value, indent=2))
+    os.replace(temporary, path)
+
+
+class ModelRegistry:
+    """Versions and aliases under one directory."""
+
+    def __init__(self, root=REGISTRY_DIR):
+        self.root = Path(root)
+        self.versions_dir = self.root / "versions"
+        self.aliases_path = self.root / "aliases.json"
+
+    def exists(self):
+        return self.aliases_path.exists()
+
+    # ---- versions ----
+    def versions(self):
+        """meta.json of every version, oldest first."""
+        if not self.versions_dir.exists():
+            return []
+        return [self.meta(path.name) for path in sorted(self.versions_dir.glob("v*"))
+                if (path / "meta.json").exists()]
+
+    def meta(self, version):
+        path = self.versions_dir / version / "meta.json"
+        if not path.exists():
+            raise ValueError(f"No model version {version!r} in {self.root}")
+        return json.loads(path.read_text())
+
+    def path(self, version, name):
+        return self.versions_dir / version / name
+
+    def publish(self, files=None, metrics=None, data_path=None, aliases=(), source=None, notes=None):
+        """Copy a trained model's files into a new version; returns its id.
+
+        ``files`` maps names in ARTIFACTS to paths (default: the files
+        train.py writes, where they exist). A scorer is required.
+        """
+        files = files or {name: path for name, path in ARTIFACTS.items() if os.path.exists(path)}
+        if "scorer.pkl" not in files and "scorer.bin" not in files:
+            raise ValueError("A version needs scorer.pkl or scorer.bin")
+        self.versions_dir.mkdir(parents=True, exist_ok=True)
+        staging = self.root / f".staging-{os.getpid()}-{time.monotonic_ns()}"
+        staging.mkdir()
+        meta = {
+            "created": _now(),
+            "source": source,
+            "notes": notes,
+            "metrics": metrics or {},
+            "data_path": data_path,
+            "data_sha256": file_hash(data_path) if data_path and os.path.exists(data_path) else None,
+            "files": {},
+        }
+        for name, source_path in files.items():
+            shutil.copy2(source_path, staging / name)
+            meta["files"][name] = file_hash(staging / name)
+
+        # Claim the next id by renaming into place; a concurrent publisher
+        # that took the same id makes the rename fail and we try the next one
+        taken = [int(path.name[1:]) for path in self.versions_dir.glob("v*") if path.name[1:].isdigit()]
+        number = max(taken, default=0) + 1
+        while True:
+            version = f"v{number:04d}"
+            meta["version"] = version
+            (staging / "meta.json").write_text(json.dumps(meta, indent=2))
+            try:
+                os.rename(staging, self.versions_dir / version)
+                break
+            except OSError:
+                number += 1
+        for alias in aliases:
+            self.set_alias(alias, version)
+        return version
+
+    def prune(self, keep=10):
+        """Delete the oldest versions beyond ``keep`` that no alias points at."""
+        aliased = set(self.aliases().values())
+        removable = [m["version"] for m in self.versions() if m["version"] not in aliased]
+        removed = removable[:max(len(removable) - keep, 0)]
+        for version in removed:
+            shutil.rmtree(self.versions_dir / version)
+        return removed
+
+    # ---- aliases ----
+    def _aliases_state(self):
+        if not self.aliases_path.exists():
+            return {"aliases": {}, "canary_share": 0.0, "history": []}
+        return json.loads(self.aliases_path.read_text())
+
+    def aliases(self):
+        return self._aliases_state()["aliases"]
+
+    def resolve(self, alias):
+        return self.aliases().get(alias)
+
+    def set_alias(self, alias, version):
+        """Point ``alias`` at ``version``; running apps switch on their next request."""
+        self.meta(version)  # must exist
+        state = self._aliases_state()
+        previous = state["aliases"].get(alias)
+        state["aliases"][alias] = version
+        state["history"] = (state["history"] + [
+            {"alias": alias, "version": version, "previous": previous, "at": _now()}
+        ])[-HISTORY_LENGTH:]
+        _write_json(self.aliases_path, state)
+        return previous
+
+    def remove_alias(self, alias):
+        state = self._aliases_state()
+        if state["aliases"].pop(alias, None) is None:
+            raise ValueError(f"No alias {alias!r}")
+        state["history"] = (state["history"] + [
+            {"alias": alias, "version": None, "at": _now()}])[-HISTORY_LENGTH:]
+        _write_json(self.aliases_path, state)
+
+    def rollback(self, alias):
+        """Point ``alias`` back at the version it had before its last move."""
+        for entry in reversed(self._aliases_state()["history"]):
+            if entry["alias"] == alias and entry.get("previous"):
+                self.set_alias(alias, entry["previous"])
+                return entry["previous"]
+        raise ValueError(f"No earlier version recorded for alias {alias!r}")
+
+    def set_canary_share(self, share):
+        if not 0 <= share <= 1:
+            raise ValueError("The canary share must be between 0 and 1")
+        state = self._aliases_state()
+        state["canary_share"] = float(share)
+        _write_json(self.aliases_path, state)
+
+
+class LoadedModel:
+    """One model version in memory: scorer, risk cutoffs and (lazily) explainer."""
+
+    def __init__(self, version, scorer, thresholds, model_hash, explainer_path=None, model_name=None):
+        self.version = version
+        self.scorer = scorer
+        self.thresholds = thresholds
+        self.model_hash = model_hash
+        self.explainer_path = explainer_path
+        self.model_name = model_name
+        self._explainer = None
+        self._explainer_lock = threading.Lock()
+
+    @classmethod
+    def from_registry(cls, registry, version):
+        meta = registry.meta(version)
+        files = meta["files"]
+        if "scorer.bin" in files:
+            from model_artifact import load_artifact
+            scorer = load_artifact(str(registry.path(version, "scorer.bin")))
+        else:
+            scorer = load_scorer(str(registry.path(version, "scorer.pkl")))
+        return cls(
+            version=version,
+            scorer=scorer,
+            thresholds=load_thresholds(registry.path(version, "thresholds.json")),
+            model_hash=files["scorer.bin"] if "scorer.bin" in files else files["scorer.pkl"],
+            explainer_path=registry.path(version, "explainer.pkl") if "explainer.pkl" in files else None,
+            model_name=str(registry.path(version, "model")),
+        )
+
+    @classmethod
+    def from_files(cls):
+        """The student_dropout_* files in the working directory (no registry)."""
+        path = scoring_model_path()
+        return cls(version="files", scorer=load_scoring_model(), thresholds=load_thresholds(),
+                   model_hash=file_hash(path), explainer_path=ARTIFACTS["explainer.pkl"],
+                   model_name=MODEL_NAME)
+
+    def dropout_probability(self, X):
+        return self.scorer.dropout_probability(X)
+
+    def risk_thresholds(self, department=None):
+        return risk_thresholds(department, self.thresholds)
+
+    def risk_level(self, probability, department=None):
+        return risk_level(probability, department, self.thresholds)
+
+    def risk_levels(self, probabilities, departments=None):
+        return risk_levels(probabilities, departments, self.thresholds)
+
+    def explainer(self):
+        """Attribution explainer for this version, or None if it has none."""
+        if self.explainer_path is None:
+            return None
+        with self._explainer_lock:
+            if self._explainer is None:
+                from attributions import load_explainer
+                self._explainer = load_explainer(str(self.explainer_path), self.model_name, scorer=self.scorer)
+        return self._explainer
+
+
+class ModelRouter:
+    """Resolve students to model versions by alias, with hot swap and an LRU of loaded models."""
+
+    def __init__(self, registry=None, alias=MODEL_ALIAS, max_loaded=MAX_LOADED_MODELS):
+        self.registry = registry or ModelRegistry()
+        self.alias = alias
+        self.max_loaded = max_loaded
+        self.loads = 0
+        self.evictions = 0
+        self.swaps = 0
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+        self._signature = None
+        self._state = None
+        self._refresh()
+
+    @property
+    def watch_path(self):
+        """The file whose changes mean a different model may serve a student."""
+        return str(self.registry.aliases_path) if self.registry.exists() else scoring_model_path()
+
+    def _refresh(self):
+        """Re-read aliases.json (or re-check the model file) only when its size or mtime changed."""
+        path = self.watch_path
+        stat = os.stat(path)
+        signature = (path, stat.st_size, stat.st_mtime_ns)
+        if path == str(self.registry.aliases_path):
+            # The alias may fall back to the file-based model, so a retrain
+            # that rewrites it must be noticed too
+            try:
+                model_stat = os.stat(scoring_model_path())
+                signature += (model_stat.st_size, model_stat.st_mtime_ns)
+            except FileNotFoundError:
+                signature += (None, None)
+        if signature == self._signature:
+            return self._state
+        with self._lock:
+            if path == str(self.registry.aliases_path):
+                state = self.registry._aliases_state()
+                state = {"aliases": state["aliases"], "canary_share": state.get("canary_share", 0.0)}
+                state["segments"] = sorted({name.split(":", 1)[1].split("=", 1)[0] for name in state["aliases"]
+                                            if ":" in name and "=" in name.split(":", 1)[1]})
+                if self.alias not in state["aliases"] and os.path.exists(scoring_model_path()):
+                    state["aliases"][self.alias] = f"files:{file_hash(scoring_model_path())}"
+            else:
+                # No registry: one model, re-loaded when its file changes
+                state = {"aliases": {self.alias: f"files:{file_hash(path)}"}, "canary_share": 0.0,
+                         "segments": []}
+            if self._state is not None and state != self._state:
+                self.swaps += 1
+            self._signature, self._state = signature, state
+        return state
+
+    def fingerprint(self):
+        """Short hash of the current alias state, for keying caches of scored results."""
+        state = json.dumps(self._refresh(), sort_keys=True).encode()
+        return hashlib.sha256(state).hexdigest()[:16]
+
+    def _load(self, version):
+        with self._lock:
+            model = self._models.get(version)
+            if model is not None:
+                self._models.move_to_end(version)
+                return model
+            if version.startswith("files:"):
+                model = LoadedModel.from_files()
+            else:
+                model = LoadedModel.from_registry(self.registry, version)
+            self.loads += 1
+            self._models[version] = model
+            while len(self._models) > self.max_loaded:
+                self._models.popitem(last=False)  # running requests keep their reference
+                self.evictions += 1
+            return model
+
+    def _version(self, state, record=None, canary=False):
+        aliases = state["aliases"]
+        alias = CANARY_ALIAS if canary and CANARY_ALIAS in aliases else self.alias
+        record = record or {}
+        names = [f"{alias}:{record.get('department')}"]
+        names += [segment_alias(alias, column, record.get(column)) for column in state["segments"]]
+        for name in names + [alias]:
+            if name in aliases:
+                return aliases[name]
+        raise RuntimeError(f"No model version for alias {alias!r} in {self.registry.aliases_path}")
+
+    def _in_canary(self, state, record):
+        share = state["canary_share"]
+        if not share or CANARY_ALIAS not in state["aliases"]:
+            return False
+        return int(input_key(record)[:8], 16) / 0xFFFFFFFF < share
+
+    def model_for(self, record=None):
+        """The model that scores ``record`` (a student dict), or the default alias's model."""
+        state = self._refresh()
+        if record is None:
+            return self._load(self._version(state))
+        return self._load(self._version(state, record, self._in_canary(state, record)))
+
+    def partition(self, X, canary=True):
+        """[(LoadedModel, row positions)] for a list of student dicts or a DataFrame.
+
+        DataFrames are split by department and segment columns only, each
+        distinct combination resolved once; the canary split applies to
+        individual students (records).
+        """
+        state = self._refresh()
+        if hasattr(X, "columns"):
+            columns = [c for c in ["department"] + state["segments"] if c in X.columns]
+            if columns:
+                values = X[columns].astype(object).reset_index(drop=True)
+                combinations = values.drop_duplicates()
+                combinations = combinations.assign(version=[self._version(state, dict(zip(columns, row)))
+                                                            for row in combinations.itertuples(index=False)])
+                keys = values.merge(combinations, on=columns, how="left")["version"].to_numpy()
+            else:
+                keys = np.full(len(X), self._version(state), dtype=object)
+        else:
+            keys = [self._version(state, r, canary and self._in_canary(state, r)) for r in X]
+        keys = np.asarray(keys, dtype=object)
+        return [(self._load(version), np.flatnonzero(keys == version)) for version in dict.fromkeys(keys)]
+
+    def score(self, records):
+        """(probabilities, LoadedModel per record) for a list of student dicts."""
+        probabilities = np.zeros(len(records))
+        models = [None] * len(records)
+        for model, rows in self.partition(records):
+            probabilities[rows] = model.dropout_probability([records[i] for i in rows])
+            for i in rows:
+                models[i] = model
+        return probabilities, models
+
+    def dropout_probability(self, X):
+        if hasattr(X, "columns"):
+            probabilities = np.zeros(len(X))
+            for model, rows in self.partition(X):
+                probabilities[rows] = model.dropout_probability(X.iloc[rows])
+            return probabilities
+        return self.score([X] if isinstance(X, dict) else X)[0]
+
+    def stats(self):
+        state = self._refresh()
+        with self._lock:
+            return {
+                "registry": str(self.registry.root) if self.registry.exists() else None,
+                "alias": self.alias,
+                "aliases": dict(state["aliases"]),
+                "canary_share": state["canary_share"],
+                "loaded": list(self._models),
+                "max_loaded": self.max_loaded,
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "swaps": self.swaps,
+            }
+
+
+def _print_versions(registry):
+    aliases = {}
+    for alias, version in registry.aliases().items():
+        aliases.setdefault(version, []).append(alias)
+    versions = registry.versions()
+    if not versions:
+        print(f"\n No versions in {registry.root} yet - run 'python train.py' or "
+              f"'python model_registry.py publish'")
+        return
+    print(f"\n {'Version':<9}{'Created':<27}{'Source':<20}{'Recall':>8}{'AUC':>8}  Aliases")
+    print(" " + "-" * 86)
+    for meta in versions:
+        metrics = meta.get("metrics", {})
+        recall = f"{metrics['recall']:.4f}" if "recall" in metrics else "-"
+        auc = f"{metrics['auc']:.4f}" if "auc" in metrics else "-"
+        print(f" {meta['version']:<9}{meta['created']:<27}{str(meta.get('source') or '-'):<20}"
+              f"{recall:>8}{auc:>8}  {', '.join(aliases.get(meta['version'], []))}")
+    share = registry._aliases_state().get("canary_share", 0.0)
+    if share and CANARY_ALIAS in registry.aliases():
+        print(f"\n {share:.0%} of students are routed to '{CANARY_ALIAS}'")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Versioned model registry with aliases.")
+    parser.add_argument("--root", default=REGISTRY_DIR, help=f"registry directory (default: {REGISTRY_DIR})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="versions, metrics and aliases")
+    publish = sub.add_parser("publish", help="publish the student_dropout_* files in this directory")
+    publish.add_argument("--alias", action="append", default=[], help="alias to point at the new version")
+    publish.add_argument("--notes")
+    alias = sub.add_parser("alias", help="point an alias at a version")
+    alias.add_argument("alias", help="e.g. prod, canary or prod:Engineering")
+    alias.add_argument("version")
+    unalias = sub.add_parser("unalias", help="remove an alias")
+    unalias.add_argument("alias")
+    rollback = sub.add_parser("rollback", help="move an alias back to its previous version")
+    rollback.add_argument("alias")
+    share = sub.add_parser("canary-share", help=f"share of students routed to '{CANARY_ALIAS}'")
+    share.add_argument("share", type=float)
+    prune = sub.add_parser("prune", help="delete old versions no alias points at")
+    prune.add_argument("--keep", type=int, default=10)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("STUDENT DROPOUT PREDICTION - MODEL REGISTRY")
+    print("=" * 70)
+    registry = ModelRegistry(args.root)
+    if args.command == "publish":
+        version = registry.publish(data_path="student_dropout_dataset.csv", aliases=args.alias,
+                                   source="model_registry.py", notes=args.notes)
+        print(f"\n Published {version}" + (f" as {', '.join(args.alias)}" if args.alias else ""))
+    elif args.command == "alias":
+        previous = registry.set_alias(args.alias, args.version)
+        print(f"\n {args.alias}: {previous or '-'} -> {args.version}")
+    elif args.command == "unalias":
+        registry.remove_alias(args.alias)
+        print(f"\n Removed alias {args.alias}")
+    elif args.command == "rollback":
+        print(f"\n {args.alias} -> {registry.rollback(args.alias)}")
+    elif args.command == "canary-share":
+        registry.set_canary_share(args.share)
+        print(f"\n Canary share set to {args.share:.0%}")
+    elif args.command == "prune":
+        removed = registry.prune(args.keep)
+        print(f"\n Removed {len(removed)} versions" + (f": {', '.join(removed)}" if removed else ""))
+    _print_versions(registry)
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
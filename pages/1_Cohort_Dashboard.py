@@ -0,0 +1,235 @@
+"""
+STUDENT DROPOUT PREDICTION - COHORT DASHBOARD
+==============================================
+Upload a cohort CSV, score it in batch and explore the at-risk students.
+
+Scoring and aggregates are cached per uploaded file hash, so widget
+interactions (sorting, paging, filters) never re-score the cohort, and only
+the visible page of the table is sent to the browser. Per-category model
+attributions are computed in the same batched pass.
+
+Each chunk is checked against the feature schema first; rows that fail are
+set aside, listed with the reason and offered for download instead of
+being scored.
+
+Students are scored by the model version their department resolves to in
+the model registry (see model_registry.py); moving an alias re-scores the
+cohort on the next rerun.
+"""
+
+import hashlib
+import io
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from model_registry import ModelRouter
+from risk_factors import CATEGORIES, assess
+from schema import validate
+
+CHUNKSIZE = 10_000
+RISK_ORDER = ["HIGH RISK", "MODERATE RISK", "LOW RISK"]
+TABLE_COLUMNS = [
+    "student_id", "department", "year_of_study", "current_cgpa",
+    "attendance_percentage", "fee_payment_status", "dropout_probability",
+    "risk_level", "risk_factor_count",
+]
+
+st.set_page_config(page_title="Cohort Dashboard", page_icon="📊", layout="wide")
+
+st.markdown("## 📊 Cohort Risk Dashboard")
+st.caption("Upload a cohort CSV shaped like student_dropout_dataset.csv to score every student at once.")
+
+
+@st.cache_resource
+def model_router():
+    return ModelRouter()
+
+
+def load_cohort_explainer(model):
+    try:
+        return model.explainer()
+    except (ValueError, FileNotFoundError):
+        return None
+
+
+@st.cache_resource(max_entries=4)
+def score_cohort(file_hash, _raw):
+    """(scored cohort, rejected rows) for one uploaded file, cached on its hash."""
+    router = model_router()
+    scored, rejected = [], []
+    for chunk in pd.read_csv(io.BytesIO(_raw), chunksize=CHUNKSIZE,
+                             keep_default_na=False, na_values=[""]):
+        if "scholarship_status" in chunk.columns:
+            chunk["scholarship_status"] = chunk["scholarship_status"].fillna("None")
+        report = validate(chunk)
+        if report.missing_columns:
+            raise ValueError(f"missing columns: {', '.join(report.missing_columns)}")
+        if report.n_invalid:
+            rejected.append(chunk[report.invalid])
+            chunk = chunk[~report.invalid].copy()
+            if chunk.empty:
+                continue
+        probability = np.zeros(len(chunk))
+        levels = np.empty(len(chunk), dtype=object)
+        contributions = np.full((len(chunk), len(CATEGORIES)), np.nan)
+        for model, rows in router.partition(chunk):
+            part = chunk.iloc[rows]
+            probability[rows] = model.dropout_probability(part)
+            levels[rows] = model.risk_levels(probability[rows], part["department"])
+            explainer = load_cohort_explainer(model)
+            if explainer is not None:
+                contributions[rows] = explainer.category_contributions(part)
+        chunk["dropout_probability"] = probability
+        chunk["risk_level"] = levels
+        factors = assess(chunk)
+        chunk["risk_factor_count"] = factors["risk_factor_count"]
+        if not np.isnan(contributions).all():
+            for j, category in enumerate(CATEGORIES):
+                chunk[f"{category.lower()}_contribution"] = contributions[:, j]
+        scored.append(chunk)
+    if not scored:
+        raise ValueError("no rows pass the feature schema checks")
+    cohort = pd.concat(scored, ignore_index=True)
+    cohort["risk_level"] = pd.Categorical(cohort["risk_level"], categories=RISK_ORDER)
+    if "student_id" not in cohort.columns:
+        cohort.insert(0, "student_id", np.arange(1, len(cohort) + 1))
+    return cohort, pd.concat(rejected) if rejected else None
+
+
+@st.cache_data(max_entries=16)
+def cohort_summary(file_hash, _cohort):
+    """Small aggregates for the charts: tier counts, histogram, per-department table."""
+    probability = _cohort["dropout_probability"].to_numpy()
+    counts, edges = np.histogram(probability, bins=20, range=(0, 1))
+    tiers = _cohort["risk_level"].value_counts().reindex(RISK_ORDER, fill_value=0)
+    departments = (
+        _cohort.groupby("department", observed=True)
+        .agg(students=("dropout_probability", "size"),
+             mean_probability=("dropout_probability", "mean"),
+             high=("risk_level", lambda s: (s == "HIGH RISK").sum()),
+             moderate=("risk_level", lambda s: (s == "MODERATE RISK").sum()),
+             low=("risk_level", lambda s: (s == "LOW RISK").sum()))
+        .sort_values("mean_probability", ascending=False)
+    )
+    contribution_columns = [f"{c.lower()}_contribution" for c in CATEGORIES]
+    drivers = None
+    if all(c in _cohort.columns for c in contribution_columns):
+        drivers = (_cohort.groupby("risk_level", observed=False)[contribution_columns].mean()
+                   .set_axis(CATEGORIES, axis=1))
+    return {
+        "students": len(_cohort),
+        "tiers": tiers.to_dict(),
+        "histogram": (counts, edges),
+        "departments": departments,
+        "drivers": drivers,
+    }
+
+
+@st.cache_data(max_entries=64)
+def sorted_positions(file_hash, _cohort, sort_by, ascending, tiers, department):
+    """Row positions of the filtered table in display order."""
+    mask = _cohort["risk_level"].isin(tiers).to_numpy()
+    if department != "All":
+        mask &= (_cohort["department"] == department).to_numpy()
+    positions = np.flatnonzero(mask)
+    values = _cohort[sort_by].to_numpy()[positions]
+    order = np.argsort(values, kind="stable")
+    return positions[order if ascending else order[::-1]]
+
+
+uploaded = st.file_uploader("Cohort CSV", type="csv")
+if uploaded is None:
+    st.info("👆 **Upload a cohort CSV** to see the risk distribution and at-risk students")
+    st.stop()
+
+raw = uploaded.getvalue()
+# Keyed on the file and on which model versions serve it, so moving an alias re-scores
+file_hash = f"{hashlib.sha256(raw).hexdigest()}-{model_router().fingerprint()}"
+try:
+    with st.spinner("Scoring cohort..."):
+        cohort, rejected = score_cohort(file_hash, raw)
+except Exception as exc:
+    st.error(f" Could not score this file: {exc}")
+    st.stop()
+
+if rejected is not None:
+    st.warning(f"⚠️ {len(rejected):,} rows failed the feature schema checks and were not scored.")
+    with st.expander("Rejected rows"):
+        for line in validate(rejected).messages():
+            st.markdown(f"- {line}")
+        st.caption("Row numbers count data rows from 0, excluding the header.")
+        st.download_button("Download rejected rows", rejected.to_csv(index=False),
+                           file_name="rejected_rows.csv", mime="text/csv")
+
+summary = cohort_summary(file_hash, cohort)
+
+# Headline counts - same saved cutoffs (thresholds.py) as the single-student
+# page, quoted for the default model version
+default_model = model_router().model_for()
+HIGH_RISK_THRESHOLD, MODERATE_RISK_THRESHOLD = default_model.risk_thresholds()
+own_cutoffs = (f" ({', '.join(default_model.thresholds['by_department'])} use their own cutoffs)"
+               if default_model.thresholds["by_department"] else "")
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Students", f"{summary['students']:,}")
+col2.metric("🔴 High Risk", f"{summary['tiers']['HIGH RISK']:,}",
+            help=f"Dropout probability ≥ {HIGH_RISK_THRESHOLD:.1%}{own_cutoffs}")
+col3.metric("🟠 Moderate Risk", f"{summary['tiers']['MODERATE RISK']:,}",
+            help=f"{MODERATE_RISK_THRESHOLD:.1%} – {HIGH_RISK_THRESHOLD:.1%}{own_cutoffs}")
+col4.metric("🟢 Low Risk", f"{summary['tiers']['LOW RISK']:,}",
+            help=f"Below {MODERATE_RISK_THRESHOLD:.1%}{own_cutoffs}")
+
+# Risk distribution from the precomputed histogram, not the raw rows
+import plotly.graph_objects as go
+
+counts, edges = summary["histogram"]
+centers = (edges[:-1] + edges[1:]) / 2
+colors = ["#F44336" if c >= HIGH_RISK_THRESHOLD else "#FF9800" if c >= MODERATE_RISK_THRESHOLD
+          else "#4CAF50" for c in centers]
+fig = go.Figure(go.Bar(x=centers * 100, y=counts, marker_color=colors, width=4.5))
+fig.update_layout(title="Risk Distribution", xaxis_title="Dropout probability (%)",
+                  yaxis_title="Students", height=350)
+st.plotly_chart(fig, use_container_width=True)
+
+if summary["drivers"] is not None:
+    st.markdown("### 🔍 What Drives Risk")
+    explainer = load_cohort_explainer(default_model)
+    units = explainer.units if explainer is not None else "model units"
+    fig = go.Figure([go.Bar(name=tier, x=CATEGORIES, y=summary["drivers"].loc[tier],
+                            marker_color=color)
+                     for tier, color in zip(RISK_ORDER, ["#F44336", "#FF9800", "#4CAF50"])])
+    fig.update_layout(barmode="group", height=350,
+                      yaxis_title=f"Mean contribution ({units})",
+                      title="Average model attribution per category, by risk level")
+    st.plotly_chart(fig, use_container_width=True)
+
+st.markdown("### 🏫 By Department")
+st.dataframe(
+    summary["departments"].style.format({"mean_probability": "{:.1%}"}),
+    use_container_width=True,
+)
+
+# Server-side sorted and paginated table
+st.markdown("### 🚨 At-Risk Students")
+col1, col2, col3, col4 = st.columns(4)
+tiers = col1.multiselect("Risk levels", RISK_ORDER, default=["HIGH RISK", "MODERATE RISK"])
+department = col2.selectbox("Department", ["All"] + sorted(cohort["department"].dropna().unique()))
+sortable = [c for c in TABLE_COLUMNS if c in cohort.columns and c != "risk_level"]
+sort_by = col3.selectbox("Sort by", sortable, index=sortable.index("dropout_probability"))
+ascending = col4.radio("Order", ["Descending", "Ascending"], horizontal=True) == "Ascending"
+
+positions = sorted_positions(file_hash, cohort, sort_by, ascending, tuple(tiers), department)
+page_size = st.select_slider("Rows per page", options=[25, 50, 100, 250], value=50)
+pages = max(1, -(-len(positions) // page_size))
+page = st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, value=1)
+
+start = (page - 1) * page_size
+visible = cohort.iloc[positions[start:start + page_size]]
+st.dataframe(
+    visible[[c for c in TABLE_COLUMNS if c in cohort.columns]]
+    .style.format({"dropout_probability": "{:.1%}"}),
+    use_container_width=True, hide_index=True,
+)
+st.caption(f"Showing {start + 1 if len(positions) else 0:,}–{min(start + page_size, len(positions)):,} "
+           f"of {len(positions):,} matching students")
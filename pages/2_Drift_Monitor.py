@@ -0,0 +1,94 @@
+"""
+STUDENT DROPOUT PREDICTION - DRIFT MONITOR PAGE
+================================================
+Are the students being scored still like the training data?
+
+The page follows the prediction log written by the app and by serve.py.
+Each refresh bins only the lines added since the last one into a
+constant-memory DriftMonitor (see drift_monitor.py), then shows PSI and KS
+per feature over the sliding window or everything seen so far.
+"""
+
+import streamlit as st
+
+from drift_monitor import MAJOR_PSI, MODERATE_PSI, DriftMonitor, load_reference
+from prediction_log import DEFAULT_LOG_PATH
+
+st.set_page_config(page_title="Drift Monitor", page_icon="📡", layout="wide")
+
+st.markdown("## 📡 Input Drift Monitor")
+st.caption("Compares the students being scored with the training data (student_dropout_dataset.csv).")
+
+
+@st.cache_resource
+def log_monitor():
+    return DriftMonitor(load_reference())
+
+
+if not DEFAULT_LOG_PATH:
+    st.info("Prediction logging is disabled (PREDICTION_LOG_PATH is empty), so there is no traffic to monitor.")
+    st.stop()
+
+monitor = log_monitor()
+col1, col2 = st.columns([3, 1])
+scope_label = col1.radio(
+    "Traffic",
+    [f"Sliding window (last {monitor.window_rows * monitor.window_slots:,} rows)", "Everything logged"],
+    horizontal=True,
+)
+scope = "window" if scope_label.startswith("Sliding") else "total"
+col2.button("🔄 Refresh")
+added = monitor.follow(DEFAULT_LOG_PATH)
+
+table = monitor.statistics(scope)
+rows = table.attrs["rows"]
+if not rows:
+    st.info(f"👆 No predictions in `{DEFAULT_LOG_PATH}` yet - assess a student or call serve.py first.")
+    st.stop()
+
+major = int((table["psi"] > MAJOR_PSI).sum())
+moderate = int(((table["psi"] > MODERATE_PSI) & (table["psi"] <= MAJOR_PSI)).sum())
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Rows", f"{rows:,}", delta=f"+{added:,} new" if added else None)
+col2.metric("🔴 Major Shift", major, help=f"PSI > {MAJOR_PSI}")
+col3.metric("🟠 Moderate Shift", moderate, help=f"PSI {MODERATE_PSI} – {MAJOR_PSI}")
+col4.metric("Largest PSI", f"{table['psi'].iloc[0]:.3f}", help=table["feature"].iloc[0])
+if rows < 500:
+    st.warning(f"⚠️ Only {rows:,} rows so far - PSI is noisy on small samples.")
+
+import plotly.graph_objects as go
+
+colors = ["#F44336" if p > MAJOR_PSI else "#FF9800" if p > MODERATE_PSI else "#4CAF50"
+          for p in table["psi"]]
+fig = go.Figure(go.Bar(x=table["feature"], y=table["psi"], marker_color=colors))
+fig.add_hline(y=MAJOR_PSI, line_dash="dash", line_color="#F44336")
+fig.add_hline(y=MODERATE_PSI, line_dash="dash", line_color="#FF9800")
+fig.update_layout(title="Population Stability Index per feature", yaxis_title="PSI",
+                  height=400, xaxis_tickangle=-45)
+st.plotly_chart(fig, use_container_width=True)
+
+st.markdown("### 🔍 Feature Detail")
+feature = st.selectbox("Feature", list(table["feature"]))
+shares = monitor.distribution(feature, scope)
+fig = go.Figure([go.Bar(name="Training data", x=shares["bin"], y=shares["reference"] * 100,
+                        marker_color="#1B5E20"),
+                 go.Bar(name="Scored students", x=shares["bin"], y=shares["live"] * 100,
+                        marker_color="#FF9800")])
+fig.update_layout(barmode="group", yaxis_title="Share (%)", height=350)
+st.plotly_chart(fig, use_container_width=True)
+
+st.dataframe(
+    table.style.format({"psi": "{:.3f}", "ks": "{:.3f}", "missing_or_unseen": "{:.1%}"}),
+    use_container_width=True, hide_index=True,
+)
+st.caption("KS is the largest gap between the cumulative distributions over the bins; "
+           "for categorical features it is the total variation distance.")
+
+# Export for dashboards and alerting
+import json
+
+col1, col2 = st.columns(2)
+col1.download_button("Download metrics (Prometheus)", monitor.prometheus(),
+                     file_name="drift_metrics.prom", mime="text/plain")
+col2.download_button("Download metrics (JSON)", json.dumps(monitor.snapshot(scope), indent=2),
+                     file_name="drift_metrics.json", mime="application/json")
@@ -0,0 +1,176 @@
+"""
+STUDENT DROPOUT PREDICTION - PARALLEL MODEL COMPARISON
+=======================================================
+Drop-in alternative to compare_models(sort='Recall') for train.py.
+
+Every (candidate, fold) pair is an independent task on a multiprocessing pool,
+handed out n_jobs at a time. Folds arrive already preprocessed and
+SMOTE-resampled (train_cache.prepare_folds), so each task only fits the
+estimator.
+A candidate is pruned as soon as its best possible mean recall (remaining
+folds scored as a perfect 1.0) can no longer beat the current leader, and the
+whole comparison stops at an optional wall-clock budget; the pool is then
+terminated, so fold fits still running don't outlive the comparison.
+"""
+
+import multiprocessing
+import os
+import queue
+import time
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.metrics import recall_score
+
+# Same rounding compare_models applies before sorting its results grid
+ROUND = 4
+
+_worker_state = {}
+
+
+def _init_worker(folds):
+    _worker_state.update(folds=folds)
+
+
+def _fit_fold(candidate_id, estimator, fold, fraction=1.0):
+    """Fit the estimator on one preprocessed fold and return its recall.
+
+    ``fraction`` < 1 trains on a fixed random subset of the fold's rows (the
+    same subset for every candidate), for cheap early rounds of a search.
+    """
+    start = time.perf_counter()
+    data = _worker_state["folds"][fold]
+    X_train, y_train = data["X_train"], data["y_train"]
+    if fraction < 1.0:
+        rows = np.random.default_rng(fold).permutation(len(y_train))[:max(2, int(len(y_train) * fraction))]
+        X_train, y_train = X_train[rows], y_train[rows]
+    model = clone(estimator).fit(X_train, y_train)
+    recall = recall_score(data["y_test"], model.predict(data["X_test"]))
+    return candidate_id, fold, recall, time.perf_counter() - start
+
+
+def turbo_candidates(models_table):
+    """The estimators compare_models() tries by default (turbo, non-ensemble).
+
+    ``models_table`` is ``pycaret.classification.models(internal=True)``.
+    """
+    candidates = {}
+    for model_id, row in models_table.iterrows():
+        if row["Turbo"] and not row["Special"]:
+            estimator = row["Class"](**row["Args"])
+            # One core per fold task - the pool provides the parallelism
+            if "n_jobs" in estimator.get_params():
+                estimator.set_params(n_jobs=1)
+            if type(estimator).__name__ == "LGBMClassifier":
+                estimator.set_params(verbose=-1)
+            candidates[model_id] = (row["Name"], estimator)
+    return candidates
+
+
+def compare_models_parallel(candidates, folds, budget_seconds=None, n_jobs=None):
+    """Cross-validate every candidate in parallel and return (best_id, report).
+
+    ``folds`` is the list returned by train_cache.prepare_folds / fold_data.
+
+    ``report`` holds one dict per candidate with its name, folds completed,
+    mean recall, summed fit seconds and status (done / pruned / timed out),
+    sorted the way compare_models(sort='Recall') would rank them.
+    """
+    n_folds = len(folds)
+    n_jobs = n_jobs or os.cpu_count() or 1
+    deadline = time.monotonic() + budget_seconds if budget_seconds else None
+
+    order = list(candidates)
+    scores = {cid: [] for cid in order}
+    seconds = {cid: 0.0 for cid in order}
+    status = {cid: "running" for cid in order}
+    leader = -np.inf
+
+    results = queue.Queue()
+    # Candidate-major order so leaders finish early and pruning kicks in
+    tasks = ((cid, fold) for cid in order for fold in range(n_folds))
+    in_flight = 0
+
+    def submit():
+        # At most n_jobs tasks are handed to the pool at a time, so the
+        # remaining folds of a pruned candidate are simply never started
+        nonlocal in_flight
+        while in_flight < n_jobs:
+            cid, fold = next(((c, f) for c, f in tasks if status[c] == "running"), (None, None))
+            if cid is None:
+                return
+            pool.apply_async(_fit_fold, (cid, candidates[cid][1], fold), callback=results.put,
+                             error_callback=lambda exc, cid=cid, fold=fold: results.put((cid, fold, exc, 0.0)))
+            in_flight += 1
+
+    pool = multiprocessing.Pool(n_jobs, initializer=_init_worker, initargs=(folds,))
+    timed_out = False
+    try:
+        submit()
+        while in_flight:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                cid, _, recall, elapsed = results.get(timeout=timeout)
+            except queue.Empty:
+                for cid in order:
+                    if status[cid] == "running":
+                        status[cid] = "timed out"
+                timed_out = True
+                break
+            in_flight -= 1
+
+            if status[cid] == "running":
+                if isinstance(recall, Exception):
+                    status[cid] = "failed"
+                else:
+                    scores[cid].append(recall)
+                    seconds[cid] += elapsed
+                    if len(scores[cid]) == n_folds:
+                        status[cid] = "done"
+                        leader = max(leader, round(float(np.mean(scores[cid])), ROUND))
+
+            # Prune anything whose optimistic bound is already below the leader
+            for cid in order:
+                if status[cid] != "running":
+                    continue
+                bound = (sum(scores[cid]) + (n_folds - len(scores[cid]))) / n_folds
+                if round(bound, ROUND) < leader:
+                    status[cid] = "pruned"
+            submit()
+    finally:
+        if timed_out:
+            # Fold fits still running past the budget would hold up training
+            # and keep using the cores; stop the workers themselves
+            pool.terminate()
+        else:
+            pool.close()
+        pool.join()
+
+    report = []
+    for cid in order:
+        mean = float(np.mean(scores[cid])) if scores[cid] else float("nan")
+        report.append({
+            "id": cid,
+            "name": candidates[cid][0],
+            "folds": len(scores[cid]),
+            "recall": round(mean, ROUND),
+            "seconds": seconds[cid],
+            "status": status[cid],
+        })
+
+    # Stable sort keeps the original candidate order for ties, like the serial grid
+    complete = [r for r in report if r["status"] == "done"]
+    ranked = sorted(complete or [r for r in report if r["folds"]],
+                    key=lambda r: -r["recall"])
+    if not ranked:
+        raise RuntimeError("No candidate finished a single fold within the time budget")
+    report.sort(key=lambda r: (r["status"] != "done", -np.nan_to_num(r["recall"], nan=-1)))
+    return ranked[0]["id"], report
+
+
+def print_report(report):
+    print(f"\n {'Model':<34}{'Folds':>6}{'Recall':>9}{'Fit (s)':>10}  Status")
+    print(" " + "-" * 68)
+    for row in report:
+        recall = "-" if np.isnan(row["recall"]) else f"{row['recall']:.4f}"
+        print(f" {row['name']:<34}{row['folds']:>6}{recall:>9}{row['seconds']:>10.1f}  {row['status']}")
@@ -0,0 +1,132 @@
+"""
+STUDENT DROPOUT PREDICTION - PREDICTION CACHE
+==============================================
+Bounded, process-wide LRU cache of predictions keyed on the 41-feature input.
+Entries expire after a TTL and the whole cache is dropped when the model
+file on disk changes.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAXSIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", 1024))
+DEFAULT_TTL = float(os.environ.get("PREDICTION_CACHE_TTL", 3600))
+
+
+def _canonical(value):
+    """Normalize a feature value so equivalent inputs hash identically."""
+    if hasattr(value, "item"):          # NumPy scalars
+        value = value.item()
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, float):
+        if value != value:
+            return None
+        value = round(value, 6)
+        return int(value) if value.is_integer() else value
+    return value
+
+
+def input_key(record):
+    """Canonical SHA-256 of a single student record (dict of feature -> value)."""
+    payload = json.dumps([[name, _canonical(record[name])] for name in sorted(record)],
+                         separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PredictionCache:
+    """Thread-safe LRU with TTL and model-file invalidation."""
+
+    def __init__(self, model_path, maxsize=DEFAULT_MAXSIZE, ttl=DEFAULT_TTL):
+        self.model_path = model_path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._model_stat = None
+        self._model_hash = None
+        self._check_model()
+
+    @property
+    def model_hash(self):
+        self._check_model()
+        return self._model_hash
+
+    def _check_model(self):
+        """Re-hash the model file only when its size or mtime changed."""
+        stat = os.stat(self.model_path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+        if signature == self._model_stat:
+            return
+        new_hash = file_hash(self.model_path)
+        with self._lock:
+            if self._model_hash is not None and new_hash != self._model_hash:
+                self._entries.clear()
+                self.invalidations += 1
+            self._model_stat = signature
+            self._model_hash = new_hash
+
+    def get(self, record):
+        """Return the cached value for record, or None on a miss."""
+        self._check_model()
+        key = input_key(record)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, record, value):
+        key = input_key(record)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, record, compute):
+        """Return the cached value, calling compute(record) only on a miss."""
+        value = self.get(record)
+        if value is None:
+            value = compute(record)
+            self.put(record, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "model_hash": self._model_hash[:12],
+            }
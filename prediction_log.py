@@ -0,0 +1,172 @@
+"""
+STUDENT DROPOUT PREDICTION - PREDICTION LOG
+============================================
+Append-only JSONL audit trail of every prediction.
+
+Each line holds the 41 inputs, the dropout probability, the risk level, the
+hash of the model file that produced it and the scoring latency. Callers
+only put records on an in-memory queue; a background thread serializes
+them, writes them in batches and rotates the file once it exceeds
+``max_bytes`` (predictions.jsonl -> predictions.jsonl.1 -> ... ), optionally
+gzip-compressing rotated files. If the queue ever fills up, records are
+dropped and counted rather than making a request wait.
+
+Configuration comes from the environment:
+    PREDICTION_LOG_PATH      log file (default: logs/predictions.jsonl, "" disables logging)
+    PREDICTION_LOG_MAX_MB    rotate above this size (default: 50)
+    PREDICTION_LOG_BACKUPS   rotated files kept (default: 5)
+    PREDICTION_LOG_COMPRESS  1 to gzip rotated files (default: 0)
+"""
+
+import atexit
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+DEFAULT_LOG_PATH = os.environ.get("PREDICTION_LOG_PATH", "logs/predictions.jsonl")
+DEFAULT_MAX_MB = float(os.environ.get("PREDICTION_LOG_MAX_MB", 50))
+DEFAULT_BACKUPS = int(os.environ.get("PREDICTION_LOG_BACKUPS", 5))
+DEFAULT_COMPRESS = os.environ.get("PREDICTION_LOG_COMPRESS", "0") == "1"
+QUEUE_SIZE = 10_000
+FLUSH_INTERVAL = 1.0
+
+
+def _json_default(value):
+    if hasattr(value, "item"):          # NumPy scalars
+        return value.item()
+    return str(value)
+
+
+class PredictionLogger:
+    """Non-blocking, thread-safe prediction logger with size-based rotation."""
+
+    def __init__(self, path=DEFAULT_LOG_PATH, max_mb=DEFAULT_MAX_MB, backups=DEFAULT_BACKUPS,
+                 compress=DEFAULT_COMPRESS, flush_interval=FLUSH_INTERVAL, queue_size=QUEUE_SIZE):
+        self.path = Path(path)
+        self.max_bytes = int(max_mb * 1024**2)
+        self.backups = backups
+        self.compress = compress
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._closed = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="prediction-log", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log(self, inputs, probability, risk_level, model_hash, latency_ms, **extra):
+        """Queue one prediction; never blocks the caller."""
+        record = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "model_hash": model_hash,
+            "dropout_probability": round(float(probability), 6),
+            "risk_level": risk_level,
+            "latency_ms": round(float(latency_ms), 3),
+            **extra,
+            "inputs": inputs,
+        }
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout=5.0):
+        """Write everything still queued and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def stats(self):
+        return {"path": str(self.path), "written": self.written, "dropped": self.dropped,
+                "queued": self._queue.qsize(), "rotations": self.rotations}
+
+    # ---- writer thread -------------------------------------------------------
+
+    def _run(self):
+        out = open(self.path, "a", encoding="utf-8")
+        try:
+            while True:
+                batch = self._drain()
+                stop = None in batch
+                lines = [json.dumps(r, separators=(",", ":"), default=_json_default)
+                         for r in batch if r is not None]
+                if lines:
+                    out.write("\n".join(lines) + "\n")
+                    out.flush()
+                    self.written += len(lines)
+                    if out.tell() >= self.max_bytes:
+                        out.close()
+                        self._rotate()
+                        out = open(self.path, "a", encoding="utf-8")
+                if stop:
+                    break
+        finally:
+            out.close()
+
+    def _drain(self):
+        """Block for the first record (up to the flush interval), then take all queued."""
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def _rotate(self):
+        suffix = ".gz" if self.compress else ""
+        oldest = Path(f"{self.path}.{self.backups}{suffix}")
+        oldest.unlink(missing_ok=True)
+        for i in range(self.backups - 1, 0, -1):
+            source = Path(f"{self.path}.{i}{suffix}")
+            if source.exists():
+                source.rename(f"{self.path}.{i + 1}{suffix}")
+        if self.backups < 1:
+            self.path.unlink()
+        elif self.compress:
+            with open(self.path, "rb") as src, gzip.open(f"{self.path}.1.gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            self.path.unlink()
+        else:
+            self.path.rename(f"{self.path}.1")
+        self.rotations += 1
+
+
+def log_files(path=DEFAULT_LOG_PATH):
+    """A log and its rotated backups, oldest first."""
+    path = Path(path)
+    backups = []
+    for candidate in path.parent.glob(path.name + ".*"):
+        number = candidate.name[len(path.name) + 1:].removesuffix(".gz")
+        if number.isdigit():
+            backups.append((int(number), candidate))
+    files = [p for _, p in sorted(backups, reverse=True)]
+    return files + ([path] if path.exists() else [])
+
+
+def read_log(path=DEFAULT_LOG_PATH, include_rotated=True):
+    """Yield logged prediction records in the order they were written."""
+    files = log_files(path) if include_rotated else [Path(path)]
+    for file in files:
+        opener = gzip.open if file.suffix == ".gz" else open
+        with opener(file, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def default_logger():
+    """A PredictionLogger configured from the environment, or None if disabled."""
+    return PredictionLogger() if DEFAULT_LOG_PATH else None
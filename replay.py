@@ -0,0 +1,120 @@
+"""
+STUDENT DROPOUT PREDICTION - PREDICTION LOG REPLAY
+===================================================
+Feed recorded traffic from the prediction log back through the scorer.
+
+Requests are replayed one at a time, in logged order, either as fast as
+possible or on a fixed schedule (--rate requests/second). On a schedule,
+latency is measured from when each request was due, so a scorer that
+falls behind shows up as growing latency rather than a quietly lower
+request rate.
+
+With --check, replayed probabilities are compared with the logged ones for
+records written by the same model file.
+
+Usage:
+    python replay.py                                  # logs/predictions.jsonl, max speed
+    python replay.py logs/predictions.jsonl --rate 200 --limit 5000
+    python replay.py --check
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from inference import load_scoring_model, scoring_model_path
+from prediction_cache import file_hash
+from prediction_log import DEFAULT_LOG_PATH, read_log
+
+
+def replay(model, records, rate=None, check_hash=None, tolerance=1e-6):
+    """Score ``records`` one by one and return latency / throughput statistics."""
+    interval = 1.0 / rate if rate else 0.0
+    service, response = [], []
+    compared = mismatches = 0
+    start = time.perf_counter()
+    for i, record in enumerate(records):
+        due = start + i * interval
+        if rate:
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        begin = time.perf_counter()
+        probability = float(model.dropout_probability(record["inputs"])[0])
+        end = time.perf_counter()
+        service.append(end - begin)
+        response.append(end - (due if rate else begin))
+
+        if check_hash and record.get("model_hash") == check_hash:
+            compared += 1
+            if abs(probability - record["dropout_probability"]) > tolerance:
+                mismatches += 1
+    elapsed = time.perf_counter() - start
+
+    def percentiles(samples):
+        ms = np.asarray(samples) * 1000 if samples else np.zeros(1)
+        return {p: float(np.percentile(ms, p)) for p in (50, 95, 99)} | {"max": float(ms.max())}
+
+    return {
+        "requests": len(service),
+        "seconds": elapsed,
+        "throughput_rps": len(service) / elapsed if elapsed else 0.0,
+        "service_ms": percentiles(service),
+        "response_ms": percentiles(response),
+        "compared": compared,
+        "mismatches": mismatches,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay logged predictions through the scorer.")
+    parser.add_argument("log", nargs="?", default=DEFAULT_LOG_PATH,
+                        help=f"prediction log (default: {DEFAULT_LOG_PATH}); rotated files are included")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="requests per second (default: as fast as possible)")
+    parser.add_argument("--limit", type=int, default=None, help="replay at most this many records")
+    parser.add_argument("--latest-only", action="store_true",
+                        help="skip rotated backups and replay only the current log file")
+    parser.add_argument("--check", action="store_true",
+                        help="compare probabilities with records logged by the current model")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("STUDENT DROPOUT PREDICTION - LOG REPLAY")
+    print("=" * 70)
+
+    records = []
+    for record in read_log(args.log, include_rotated=not args.latest_only):
+        records.append(record)
+        if args.limit and len(records) >= args.limit:
+            break
+    if not records:
+        print(f"\n No records in {args.log} - make some predictions in the app first.")
+        return
+
+    model = load_scoring_model()
+    model_hash = file_hash(scoring_model_path())
+    model.dropout_probability(records[0]["inputs"])  # first call pays one-off setup costs
+    pace = f"{args.rate:g} req/s" if args.rate else "max speed"
+    print(f"\n Replaying {len(records):,} logged predictions at {pace}...")
+
+    stats = replay(model, records, args.rate, model_hash if args.check else None)
+
+    print(f"\n Requests:   {stats['requests']:,} in {stats['seconds']:.2f}s "
+          f"({stats['throughput_rps']:,.1f} req/s)")
+    for name, label in [("service_ms", "Scoring"), ("response_ms", "Response")]:
+        p = stats[name]
+        print(f" {label + ':':<11} p50 {p[50]:.2f} ms   p95 {p[95]:.2f} ms   "
+              f"p99 {p[99]:.2f} ms   max {p['max']:.2f} ms")
+    if args.check:
+        if stats["compared"]:
+            print(f" Check:      {stats['compared']:,} records from this model, "
+                  f"{stats['mismatches']:,} probability mismatches")
+        else:
+            print(" Check:      no records were logged by the current model")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
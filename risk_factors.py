@@ -0,0 +1,143 @@
+"""
+STUDENT DROPOUT PREDICTION - RISK FACTOR ENGINE
+================================================
+Rule-based risk/protective factors and the five radar scores shown in
+app.py, computed column-wise for any number of students at once.
+
+Input is anything indexable by column name: a pandas DataFrame or a dict of
+equal-length lists/arrays using the 41 app.py feature names.
+"""
+
+import numpy as np
+
+CATEGORIES = ['Academic', 'Financial', 'Engagement', 'Personal', 'Support']
+
+LOW_LEVELS = ['Very_Low', 'Low']
+HIGH_LEVELS = ['High', 'Very_High']
+UNCLEAR_LEVELS = ['Very_Unclear', 'Unclear']
+
+
+def _col(data, name):
+    return np.asarray(data[name])
+
+
+# name -> (vectorized condition, message shown in the app)
+RISK_FACTORS = {
+    'low_cgpa': (lambda d: _col(d, 'current_cgpa') < 2.5,
+                 "⚠️ **Low CGPA**: {current_cgpa:.2f} (Below 2.5)"),
+    'poor_attendance': (lambda d: _col(d, 'attendance_percentage') < 70,
+                        "⚠️ **Poor Attendance**: {attendance_percentage}%"),
+    'many_failures': (lambda d: _col(d, 'number_of_failed_courses') >= 5,
+                      "⚠️ **Many Failures**: {number_of_failed_courses} courses"),
+    'owing_fees': (lambda d: _col(d, 'fee_payment_status') == 'Owing',
+                   "⚠️ **Owing Fees**: Financial barrier"),
+    'on_probation': (lambda d: _col(d, 'probation_status').astype(bool),
+                     "⚠️ **On Probation**: Critical academic status"),
+    'gpa_declining': (lambda d: _col(d, 'semester_gpa_trend') == 'Declining',
+                      "⚠️ **GPA Declining**: Negative trend"),
+    'low_motivation': (lambda d: np.isin(_col(d, 'motivation_level'), LOW_LEVELS),
+                       "⚠️ **Low Motivation**: {motivation_level}"),
+    'socially_isolated': (lambda d: _col(d, 'social_integration_score') <= 3,
+                          "⚠️ **Socially Isolated**: Score {social_integration_score}/10"),
+}
+
+PROTECTIVE_FACTORS = {
+    'strong_cgpa': (lambda d: _col(d, 'current_cgpa') >= 3.5,
+                    " **Strong CGPA**: {current_cgpa:.2f}"),
+    'has_mentor': (lambda d: _col(d, 'has_mentor').astype(bool),
+                   " **Has Mentor**: Support system in place"),
+    'full_scholarship': (lambda d: _col(d, 'scholarship_status') == 'Full',
+                         " **Full Scholarship**: Financial security"),
+    'excellent_attendance': (lambda d: _col(d, 'attendance_percentage') >= 85,
+                             " **Excellent Attendance**: {attendance_percentage}%"),
+    'study_groups': (lambda d: _col(d, 'peer_study_groups').astype(bool),
+                     " **Study Groups**: Peer support"),
+    'strong_family_support': (lambda d: np.isin(_col(d, 'family_support'), HIGH_LEVELS),
+                              " **Strong Family Support**: {family_support}"),
+    'well_integrated': (lambda d: _col(d, 'social_integration_score') >= 7,
+                        " **Well Integrated**: Score {social_integration_score}/10"),
+}
+
+# Radar category -> [(vectorized condition, points)]
+CATEGORY_RULES = {
+    'Academic': [
+        (lambda d: _col(d, 'current_cgpa') < 2.5, 40),
+        (lambda d: _col(d, 'number_of_failed_courses') > 4, 30),
+        (lambda d: _col(d, 'attendance_percentage') < 70, 20),
+        (lambda d: _col(d, 'semester_gpa_trend') == 'Declining', 10),
+    ],
+    'Financial': [
+        (lambda d: _col(d, 'fee_payment_status') == 'Owing', 40),
+        (lambda d: np.isin(_col(d, 'financial_stress_level'), HIGH_LEVELS), 30),
+        (lambda d: (_col(d, 'scholarship_status') == 'None')
+                   & (_col(d, 'family_income_level') == 'Low'), 30),
+    ],
+    'Engagement': [
+        (lambda d: _col(d, 'library_visits_per_week') < 2, 25),
+        (lambda d: _col(d, 'online_platform_usage_hours') < 5, 25),
+        (lambda d: _col(d, 'social_integration_score') < 5, 30),
+        (lambda d: ~_col(d, 'participation_in_clubs').astype(bool), 20),
+    ],
+    'Personal': [
+        (lambda d: np.isin(_col(d, 'motivation_level'), LOW_LEVELS), 40),
+        (lambda d: np.isin(_col(d, 'stress_level'), HIGH_LEVELS), 30),
+        (lambda d: np.isin(_col(d, 'family_support'), LOW_LEVELS), 20),
+        (lambda d: np.isin(_col(d, 'career_clarity'), UNCLEAR_LEVELS), 10),
+    ],
+    # Support is a deficit: starts at 100 and each support in place removes points
+    'Support': [
+        (lambda d: _col(d, 'has_mentor').astype(bool), -30),
+        (lambda d: _col(d, 'received_academic_counseling').astype(bool), -20),
+        (lambda d: _col(d, 'peer_study_groups').astype(bool), -20),
+        (lambda d: _col(d, 'tutoring_sessions_attended') > 5, -30),
+    ],
+}
+CATEGORY_BASE = {'Support': 100}
+
+
+def factor_flags(data):
+    """Boolean array per risk and protective factor, one element per student."""
+    flags = {name: rule(data) for name, (rule, _) in RISK_FACTORS.items()}
+    flags.update({name: rule(data) for name, (rule, _) in PROTECTIVE_FACTORS.items()})
+    return flags
+
+
+def category_scores(data):
+    """0-100 score per radar category, one element per student."""
+    scores = {}
+    for category, rules in CATEGORY_RULES.items():
+        total = CATEGORY_BASE.get(category, 0)
+        for rule, points in rules:
+            total = total + np.where(rule(data), points, 0)
+        scores[category] = np.clip(total, 0, 100)
+    return scores
+
+
+def assess(data):
+    """All factor flags, counts and category scores as one pandas DataFrame."""
+    import pandas as pd
+
+    flags = factor_flags(data)
+    result = pd.DataFrame(flags)
+    result['risk_factor_count'] = result[list(RISK_FACTORS)].sum(axis=1)
+    result['protective_factor_count'] = result[list(PROTECTIVE_FACTORS)].sum(axis=1)
+    for category, score in category_scores(data).items():
+        result[f'{category.lower()}_score'] = score
+    if hasattr(data, 'index'):
+        result.index = data.index
+    return result
+
+
+def describe_student(record):
+    """Risk messages, protective messages and radar scores for one student.
+
+    ``record`` is a dict of feature -> scalar, as built by app.py.
+    """
+    columns = {name: [value] for name, value in record.items()}
+    flags = factor_flags(columns)
+    risks = [message.format(**record) for name, (_, message) in RISK_FACTORS.items()
+             if flags[name][0]]
+    protective = [message.format(**record) for name, (_, message) in PROTECTIVE_FACTORS.items()
+                  if flags[name][0]]
+    scores = [int(score[0]) for score in category_scores(columns).values()]
+    return risks, protective, scores
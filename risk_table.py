@@ -0,0 +1,462 @@
+"""
+STUDENT DROPOUT PREDICTION - NIGHTLY RISK TABLE
+================================================
+Score the whole roster once (e.g. nightly) into an indexed SQLite table, so
+advisors can look students up instead of re-entering and re-scoring them.
+
+Each student gets one row in ``students`` (file ``RISK_TABLE_PATH``, default
+student_dropout_risk.db):
+
+    student_id            primary key (``--id-column``, else the 1-based row
+                          number in the roster file)
+    department, year_of_study, state_of_origin, current_cgpa,
+    attendance_percentage, fee_payment_status
+    dropout_probability, risk_level, risk_factor_count
+    top_factors           JSON [[feature, contribution], ...] from the model's
+                          attributions (contribution is null when the model
+                          has no explainer and the rule-based flags are used)
+    model_version         the registry version that scored the row
+    model_key, input_hash what the row was scored with, for --changed-only
+    scored_at
+
+Lookups by ID use the primary key; "top N riskiest" by department, year or
+state each have a (column, dropout_probability DESC) index, so both return
+in a few milliseconds on a million-row roster. Every build is recorded in
+``runs`` with its row counts and the tier totals.
+
+Students are scored through the same ModelRouter as app.py, so department
+overrides in the model registry apply. A build runs in one transaction with
+the database in WAL mode: the app keeps reading yesterday's scores until
+the new ones are committed.
+
+``--changed-only`` re-scores just the students whose inputs changed since
+the last build, plus any whose model or risk cutoffs changed. The other
+rows are only hashed. Students no longer in the roster are removed in
+both modes.
+
+Usage:
+    python risk_table.py build student_dropout_dataset.csv
+    python risk_table.py build roster.parquet --changed-only --id-column student_id
+    python risk_table.py lookup 1042
+    python risk_table.py top -n 20 --department Engineering --year 1
+    python risk_table.py show
+
+Nightly, e.g. from cron:
+    0 2 * * *  cd /srv/dropout && python risk_table.py build roster.parquet --changed-only
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from data_io import DEFAULT_CHUNKSIZE, iter_students
+from model_registry import ModelRouter
+from risk_factors import RISK_FACTORS, assess
+from schema import FEATURE_NAMES, validate
+
+RISK_TABLE_PATH = os.environ.get("RISK_TABLE_PATH", "student_dropout_risk.db")
+ID_COLUMN = "student_id"
+TOP_FACTORS = 3
+FILTERS = ["department", "year_of_study", "state_of_origin"]
+RISK_ORDER = ["HIGH RISK", "MODERATE RISK", "LOW RISK"]
+
+# Stored alongside the score for display; the full inputs stay in the roster
+DETAIL_COLUMNS = ["department", "year_of_study", "state_of_origin", "current_cgpa",
+                  "attendance_percentage", "fee_payment_status"]
+COLUMNS = ([ID_COLUMN] + DETAIL_COLUMNS
+           + ["dropout_probability", "risk_level", "risk_factor_count", "top_factors",
+              "model_version", "model_key", "input_hash", "scored_at"])
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    student_id TEXT PRIMARY KEY,
+    department TEXT,
+    year_of_study INTEGER,
+    state_of_origin TEXT,
+    current_cgpa REAL,
+    attendance_percentage REAL,
+    fee_payment_status TEXT,
+    dropout_probability REAL NOT NULL,
+    risk_level TEXT NOT NULL,
+    risk_factor_count INTEGER,
+    top_factors TEXT,
+    model_version TEXT,
+    model_key TEXT,
+    input_hash INTEGER,
+    scored_at TEXT
+);
+CREATE INDEX IF NOT EXISTS students_probability ON students (dropout_probability DESC);
+CREATE INDEX IF NOT EXISTS students_department ON students (department, dropout_probability DESC);
+CREATE INDEX IF NOT EXISTS students_year ON students (year_of_study, dropout_probability DESC);
+CREATE INDEX IF NOT EXISTS students_state ON students (state_of_origin, dropout_probability DESC);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    started_at TEXT,
+    seconds REAL,
+    source TEXT,
+    mode TEXT,
+    rows_read INTEGER,
+    rows_rejected INTEGER,
+    rows_scored INTEGER,
+    rows_unchanged INTEGER,
+    rows_removed INTEGER,
+    students INTEGER,
+    tiers TEXT,
+    model_versions TEXT
+);
+"""
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def input_hashes(chunk):
+    """64-bit hash of each row's 41 model inputs (as signed ints for SQLite).
+
+    Numbers are widened to float64 and categories hashed by value, so the
+    hash doesn't depend on the category list a chunk happened to infer.
+    """
+    frame = chunk[FEATURE_NAMES].copy()
+    for column in frame.columns:
+        if pd.api.types.is_numeric_dtype(frame[column]) and not hasattr(frame[column], "cat"):
+            frame[column] = frame[column].astype(np.float64)
+        else:
+            frame[column] = frame[column].astype(str)
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy().view(np.int64)
+
+
+def model_key(model):
+    """Changes whenever the model or its risk cutoffs do."""
+    thresholds = json.dumps(model.thresholds, sort_keys=True, default=list)
+    return hashlib.sha256(f"{model.model_hash}:{thresholds}".encode()).hexdigest()[:16]
+
+
+def _explainer(model):
+    try:
+        return model.explainer()
+    except (ValueError, FileNotFoundError):
+        return None
+
+
+def top_factors(model, part, n=TOP_FACTORS):
+    """JSON list of the ``n`` strongest drivers per student."""
+    explainer = _explainer(model)
+    if explainer is not None:
+        return [json.dumps([[feature, round(value, 4)] for feature, value in row])
+                for row in explainer.top_features(part, n)]
+    # No attributions for this estimator: the app's rule-based risk factors
+    flags = np.column_stack([rule(part) for rule, _ in RISK_FACTORS.values()])
+    names = list(RISK_FACTORS)
+    return [json.dumps([[names[j], None] for j in np.flatnonzero(row)[:n]]) for row in flags]
+
+
+def connect(path=RISK_TABLE_PATH):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def score_chunk(router, chunk, factors=TOP_FACTORS):
+    """The stored columns (minus student_id/input_hash/scored_at) for a validated chunk."""
+    probability = np.zeros(len(chunk))
+    levels = np.empty(len(chunk), dtype=object)
+    drivers = np.empty(len(chunk), dtype=object)
+    versions = np.empty(len(chunk), dtype=object)
+    keys = np.empty(len(chunk), dtype=object)
+    for model, rows in router.partition(chunk):
+        part = chunk.iloc[rows]
+        probability[rows] = model.dropout_probability(part)
+        levels[rows] = model.risk_levels(probability[rows], part["department"])
+        drivers[rows] = top_factors(model, part, factors)
+        versions[rows] = model.version
+        keys[rows] = model_key(model)
+    scored = chunk[DETAIL_COLUMNS].astype(object)
+    scored["dropout_probability"] = probability
+    scored["risk_level"] = levels
+    scored["risk_factor_count"] = assess(chunk)["risk_factor_count"].to_numpy()
+    scored["top_factors"] = drivers
+    scored["model_version"] = versions
+    scored["model_key"] = keys
+    return scored
+
+
+def current_keys(router, chunk):
+    """model_key per row for the models that would score it now (no scoring)."""
+    keys = np.empty(len(chunk), dtype=object)
+    for model, rows in router.partition(chunk):
+        keys[rows] = model_key(model)
+    return keys
+
+
+def _rows(frame):
+    """DataFrame -> tuples of plain Python values for executemany."""
+    frame = frame[COLUMNS].astype(object).where(frame[COLUMNS].notna(), None)
+    for column in ("year_of_study", "risk_factor_count", "input_hash"):
+        frame[column] = [None if v is None else int(v) for v in frame[column]]
+    # float32 inputs would otherwise store as e.g. 4.900000095
+    for column in ("current_cgpa", "attendance_percentage"):
+        frame[column] = [None if v is None else round(float(v), 4) for v in frame[column]]
+    frame["dropout_probability"] = [float(v) for v in frame["dropout_probability"]]
+    return frame.itertuples(index=False, name=None)
+
+
+def build(source, path=RISK_TABLE_PATH, changed_only=False, id_column=ID_COLUMN,
+          chunksize=DEFAULT_CHUNKSIZE, router=None, factors=TOP_FACTORS, verbose=True):
+    """Score ``source`` (CSV / Parquet / Arrow roster) into the risk table at ``path``.
+
+    Returns the run report that is also stored in the ``runs`` table.
+    """
+    router = router or ModelRouter()
+    start = time.perf_counter()
+    report = {"started_at": _now(), "source": str(source),
+              "mode": "changed-only" if changed_only else "full",
+              "rows_read": 0, "rows_rejected": 0, "rows_scored": 0, "rows_unchanged": 0,
+              "rows_removed": 0}
+    versions = set()
+    conn = connect(path)
+    try:
+        with conn:
+            existing = pd.read_sql_query("SELECT student_id, input_hash, model_key FROM students",
+                                         conn, index_col="student_id",
+                                         dtype={"input_hash": "Int64", "model_key": object})
+            seen = set()
+            placeholders = ", ".join("?" * len(COLUMNS))
+            upsert = f"INSERT OR REPLACE INTO students ({', '.join(COLUMNS)}) VALUES ({placeholders})"
+            offset = 0
+            for index, chunk in enumerate(iter_students(source, chunksize)):
+                if id_column in chunk.columns:
+                    ids = chunk[id_column].astype(str).to_numpy()
+                else:
+                    ids = np.arange(offset + 1, offset + len(chunk) + 1).astype(str)
+                offset += len(chunk)
+                report["rows_read"] += len(chunk)
+                seen.update(ids)  # rejected rows keep their last good score
+
+                check = validate(chunk)
+                if check.missing_columns:
+                    raise ValueError(f"missing columns: {', '.join(check.missing_columns)}")
+                report["rows_rejected"] += check.n_invalid
+                chunk, ids = chunk[~check.invalid], ids[~check.invalid]
+                if chunk.empty:
+                    continue
+                hashes = input_hashes(chunk)
+
+                if changed_only and len(existing):
+                    previous = existing.reindex(ids)
+                    changed = ((previous["input_hash"] != hashes).fillna(True).to_numpy(dtype=bool)
+                               | (previous["model_key"].to_numpy() != current_keys(router, chunk)))
+                    report["rows_unchanged"] += int((~changed).sum())
+                    chunk, ids, hashes = chunk[changed], ids[changed], hashes[changed]
+                    if chunk.empty:
+                        continue
+
+                scored = score_chunk(router, chunk, factors)
+                scored.insert(0, ID_COLUMN, ids)
+                scored["input_hash"] = hashes
+                scored["scored_at"] = _now()
+                conn.executemany(upsert, _rows(scored))
+                report["rows_scored"] += len(scored)
+                versions.update(scored["model_version"].unique())
+                if verbose:
+                    elapsed = time.perf_counter() - start
+                    print(f" Chunk {index + 1}: {report['rows_read']:,} read, "
+                          f"{report['rows_scored']:,} scored ({report['rows_read'] / elapsed:,.0f} rows/sec)")
+
+            removed = [(student_id,) for student_id in existing.index.difference(list(seen))]
+            conn.executemany("DELETE FROM students WHERE student_id = ?", removed)
+            report["rows_removed"] = len(removed)
+
+            tiers = dict(conn.execute("SELECT risk_level, COUNT(*) FROM students GROUP BY risk_level"))
+            report["students"] = sum(tiers.values())
+            report["tiers"] = {level: tiers.get(level, 0) for level in RISK_ORDER}
+            report["model_versions"] = sorted(versions)
+            report["seconds"] = round(time.perf_counter() - start, 3)
+            conn.execute(
+                "INSERT INTO runs (started_at, seconds, source, mode, rows_read, rows_rejected, "
+                "rows_scored, rows_unchanged, rows_removed, students, tiers, model_versions) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (report["started_at"], report["seconds"], report["source"], report["mode"],
+                 report["rows_read"], report["rows_rejected"], report["rows_scored"],
+                 report["rows_unchanged"], report["rows_removed"], report["students"],
+                 json.dumps(report["tiers"]), json.dumps(report["model_versions"])))
+        conn.execute("PRAGMA optimize")
+    finally:
+        conn.close()
+    return report
+
+
+class RiskTable:
+    """Read-only lookups against a built risk table."""
+
+    def __init__(self, path=RISK_TABLE_PATH):
+        self.path = path
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def _connect(self):
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _record(row):
+        record = dict(row)
+        record["top_factors"] = json.loads(record["top_factors"] or "[]")
+        record.pop("input_hash", None)
+        return record
+
+    def student(self, student_id):
+        """One student's stored score as a dict, or None if the ID isn't in the table."""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM students WHERE student_id = ?",
+                               (str(student_id),)).fetchone()
+        finally:
+            conn.close()
+        return None if row is None else self._record(row)
+
+    def top(self, n=20, department=None, year_of_study=None, state_of_origin=None):
+        """The ``n`` highest-probability students matching the filters given, as a DataFrame."""
+        where, params = [], []
+        for column, value in (("department", department), ("year_of_study", year_of_study),
+                              ("state_of_origin", state_of_origin)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        query = ("SELECT * FROM students"
+                 + (" WHERE " + " AND ".join(where) if where else "")
+                 + " ORDER BY dropout_probability DESC LIMIT ?")
+        conn = self._connect()
+        try:
+            rows = [self._record(row) for row in conn.execute(query, params + [int(n)])]
+        finally:
+            conn.close()
+        return pd.DataFrame(rows, columns=[c for c in COLUMNS if c != "input_hash"])
+
+    def choices(self):
+        """Distinct department / year / state values, for filter widgets."""
+        conn = self._connect()
+        try:
+            return {column: [v for (v,) in conn.execute(
+                        f"SELECT DISTINCT {column} FROM students WHERE {column} IS NOT NULL "
+                        f"ORDER BY {column}")]
+                    for column in FILTERS}
+        finally:
+            conn.close()
+
+    def last_run(self):
+        """The most recent build's report, or None."""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM runs ORDER BY run_id DESC LIMIT 1").fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        run = dict(row)
+        run["tiers"] = json.loads(run["tiers"] or "{}")
+        run["model_versions"] = json.loads(run["model_versions"] or "[]")
+        return run
+
+
+def print_student(record):
+    print(f"\n Student {record['student_id']}: {record['risk_level']} "
+          f"({record['dropout_probability'] * 100:.1f}%)")
+    for column in DETAIL_COLUMNS:
+        print(f"   {column:<24} {record[column]}")
+    print("   Top factors:")
+    for feature, value in record["top_factors"]:
+        print(f"     {feature:<30} " + ("flagged" if value is None else f"{value:+.3f}"))
+    print(f"   Scored {record['scored_at']} by model {record['model_version']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nightly precomputed risk table with indexed lookups.")
+    parser.add_argument("--db", default=RISK_TABLE_PATH, help=f"SQLite file (default: {RISK_TABLE_PATH})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser("build", help="score the roster into the table")
+    build_parser.add_argument("source", help="roster shaped like student_dropout_dataset.csv (.csv/.parquet/.arrow)")
+    build_parser.add_argument("--changed-only", action="store_true",
+                              help="re-score only students whose inputs or model changed")
+    build_parser.add_argument("--id-column", default=ID_COLUMN,
+                              help=f"student ID column (default: {ID_COLUMN}; row numbers if absent)")
+    build_parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+                              help=f"rows per chunk (default: {DEFAULT_CHUNKSIZE:,})")
+    build_parser.add_argument("--factors", type=int, default=TOP_FACTORS,
+                              help=f"top contributing factors stored per student (default: {TOP_FACTORS})")
+
+    lookup_parser = commands.add_parser("lookup", help="show one student")
+    lookup_parser.add_argument("student_id")
+
+    top_parser = commands.add_parser("top", help="list the riskiest students")
+    top_parser.add_argument("-n", type=int, default=20)
+    top_parser.add_argument("--department")
+    top_parser.add_argument("--year", type=int)
+    top_parser.add_argument("--state")
+
+    commands.add_parser("show", help="summarize the last build")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        print("=" * 70)
+        print("STUDENT DROPOUT PREDICTION - NIGHTLY RISK TABLE")
+        print("=" * 70)
+        print(f"\n Roster: {args.source}")
+        print(f" Table: {args.db} ({'changed rows only' if args.changed_only else 'full re-score'})\n")
+        report = build(args.source, args.db, args.changed_only, args.id_column,
+                       args.chunksize, factors=args.factors)
+        print("\n" + "=" * 70)
+        print(f" Read {report['rows_read']:,} rows in {report['seconds']:.1f}s: "
+              f"{report['rows_scored']:,} scored, {report['rows_unchanged']:,} unchanged, "
+              f"{report['rows_rejected']:,} rejected, {report['rows_removed']:,} removed")
+        print(f" Students: {report['students']:,} "
+              + " | ".join(f"{level}: {count:,}" for level, count in report["tiers"].items()))
+        print(f" Model versions: {', '.join(report['model_versions']) or '-'}")
+        print("=" * 70)
+        return
+
+    table = RiskTable(args.db)
+    if not table.exists():
+        raise SystemExit(f"No risk table at {args.db} - run 'python risk_table.py build <roster>' first.")
+    start = time.perf_counter()
+    if args.command == "lookup":
+        record = table.student(args.student_id)
+        elapsed = time.perf_counter() - start
+        if record is None:
+            raise SystemExit(f"Student {args.student_id} is not in {args.db}")
+        print_student(record)
+    elif args.command == "top":
+        top = table.top(args.n, args.department, args.year, args.state)
+        elapsed = time.perf_counter() - start
+        with pd.option_context("display.width", 160, "display.max_columns", 20):
+            print(top[[ID_COLUMN] + DETAIL_COLUMNS[:3] + ["dropout_probability", "risk_level"]]
+                  .to_string(index=False))
+    else:
+        run = table.last_run()
+        elapsed = time.perf_counter() - start
+        if run is None:
+            raise SystemExit(f"{args.db} has no completed build")
+        print(f"\n Last build: {run['started_at']} ({run['mode']}, {run['seconds']:.1f}s) from {run['source']}")
+        print(f" Rows: {run['rows_read']:,} read, {run['rows_scored']:,} scored, "
+              f"{run['rows_unchanged']:,} unchanged, {run['rows_rejected']:,} rejected, "
+              f"{run['rows_removed']:,} removed")
+        print(f" Students: {run['students']:,} "
+              + " | ".join(f"{level}: {count:,}" for level, count in run["tiers"].items()))
+        print(f" Model versions: {', '.join(run['model_versions'])}")
+    print(f"\n ({elapsed * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,447 @@
+"""
+STUDENT DROPOUT PREDICTION - FEATURE SCHEMA
+===========================================
+The one definition of the 41 model inputs: names, types, allowed categories
+and documented ranges. train.py, app.py and the data loaders all import it,
+and ``check`` compares it with columns_description.txt so the documentation
+can't drift away unnoticed.
+
+``validate`` checks a whole batch with column-wise operations and returns a
+per-row error mask instead of stopping at the first bad record:
+
+- missing columns (every row is flagged for that column)
+- categories outside a closed list, and missing categories
+- numbers that are missing, non-numeric, outside the documented range, or
+  fractional where an integer is expected; binary flags other than 0/1
+- is_stem disagreeing with department
+
+``check_record`` applies the same rules to one record with plain lookups,
+for callers (serve.py) that see a few rows at a time.
+
+Usage:
+    python schema.py check                            # schema vs columns_description.txt
+    python schema.py validate student_dropout_dataset.csv
+    python schema.py validate big.parquet --invalid-out rejected.csv
+"""
+
+import argparse
+import math
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+DESCRIPTION_PATH = "columns_description.txt"
+TARGET = "will_dropout"
+STEM_DEPARTMENTS = ['Engineering', 'Medicine', 'Science']
+LEVELS = ['Low', 'Moderate', 'High', 'Very_High']
+FIVE_LEVELS = ['Very_Low', 'Low', 'Moderate', 'High', 'Very_High']
+
+
+def _integer(low, high):
+    return {"type": "integer", "values": None, "range": (low, high), "open": False}
+
+
+def _float(low, high):
+    return {"type": "float", "values": None, "range": (low, high), "open": False}
+
+
+def _binary():
+    return {"type": "binary", "values": None, "range": (0, 1), "open": False}
+
+
+def _categorical(values, open=False):
+    return {"type": "categorical", "values": list(values), "range": None, "open": open}
+
+
+# Every model input, in dataset column order. Categories are listed in their
+# natural order (the order app.py offers them); an open list names the
+# values seen so far and accepts others.
+FEATURES = {
+    'age': _integer(16, 28),
+    'gender': _categorical(['Male', 'Female']),
+    'state_of_origin': _categorical(['Lagos', 'Kano', 'Rivers', 'Oyo', 'Anambra', 'Kaduna',
+                                     'Enugu', 'Ogun', 'Delta', 'Edo', 'Katsina', 'Borno',
+                                     'Cross_River', 'Imo', 'Ekiti'], open=True),
+    'distance_from_home_km': _integer(10, 800),
+    'marital_status': _categorical(['Single', 'Married']),
+    'has_children': _binary(),
+    'admission_score': _integer(180, 350),
+    'secondary_school_type': _categorical(['Public', 'Private']),
+    'secondary_cgpa': _float(2.0, 5.0),
+    'year_of_study': _integer(1, 5),
+    'current_cgpa': _float(1.5, 5.0),
+    'course_load_per_semester': _integer(12, 30),
+    'attendance_percentage': _integer(30, 100),
+    'number_of_failed_courses': _integer(0, 15),
+    'number_of_repeated_courses': _integer(0, 8),
+    'semester_gpa_trend': _categorical(['Declining', 'Stable', 'Improving']),
+    'department': _categorical(['Engineering', 'Medicine', 'Law', 'Science', 'Arts',
+                                'Social_Sciences', 'Education', 'Business_Admin',
+                                'Agriculture', 'Environmental_Studies']),
+    'program_difficulty': _categorical(LEVELS),
+    'scholarship_status': _categorical(['None', 'Partial', 'Full']),
+    'family_income_level': _categorical(['Low', 'Medium', 'High']),
+    'fee_payment_status': _categorical(['Fully_Paid', 'Partially_Paid', 'Owing']),
+    'has_part_time_job': _binary(),
+    'receives_allowance': _binary(),
+    'financial_stress_level': _categorical(LEVELS),
+    'library_visits_per_week': _integer(0, 15),
+    'online_platform_usage_hours': _integer(0, 30),
+    'participation_in_clubs': _binary(),
+    'has_mentor': _binary(),
+    'peer_study_groups': _binary(),
+    'social_integration_score': _integer(1, 10),
+    'accommodation_type': _categorical(['Campus_Hostel', 'Off_Campus', 'Living_with_Family',
+                                        'Private_Hostel']),
+    'health_status': _categorical(['Excellent', 'Good', 'Fair', 'Poor']),
+    'stress_level': _categorical(LEVELS),
+    'received_academic_counseling': _binary(),
+    'tutoring_sessions_attended': _integer(0, 20),
+    'motivation_level': _categorical(FIVE_LEVELS),
+    'career_clarity': _categorical(['Very_Unclear', 'Unclear', 'Somewhat_Clear', 'Clear',
+                                    'Very_Clear']),
+    'family_support': _categorical(FIVE_LEVELS),
+    'previous_warnings': _integer(0, 5),
+    'probation_status': _binary(),
+    'is_stem': _binary(),
+}
+
+FEATURE_NAMES = list(FEATURES)
+CATEGORICAL_FEATURES = [f for f, spec in FEATURES.items() if spec["type"] == "categorical"]
+NUMERIC_FEATURES = [f for f, spec in FEATURES.items() if spec["type"] != "categorical"]
+
+
+# ---- dtypes --------------------------------------------------------------------
+
+def _int_dtype(value_range):
+    if value_range is None:
+        return "int32"
+    low, high = value_range
+    for dtype in ("int8", "int16", "int32"):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return "int64"
+
+
+def declared_schema():
+    """{column: pandas dtype} for every feature plus the target.
+
+    Closed category lists become a CategoricalDtype; open lists map to plain
+    ``"category"`` so the categories come from the data being loaded.
+    Integers get the smallest width that fits the range, floats float32.
+    """
+    schema = {}
+    for column, spec in FEATURES.items():
+        if spec["type"] == "categorical":
+            schema[column] = "category" if spec["open"] else pd.CategoricalDtype(spec["values"])
+        elif spec["type"] == "float":
+            schema[column] = "float32"
+        elif spec["type"] == "binary":
+            schema[column] = "int8"
+        else:
+            schema[column] = _int_dtype(spec["range"])
+    schema[TARGET] = "int8"
+    return schema
+
+
+# ---- validation ----------------------------------------------------------------
+
+def _rule(column):
+    spec = FEATURES[column]
+    if spec["type"] == "categorical":
+        return "missing" if spec["open"] else f"not one of {', '.join(spec['values'])}"
+    if column == "is_stem":
+        return "not 0/1 matching department"
+    if spec["type"] == "binary":
+        return "not 0 or 1"
+    low, high = spec["range"]
+    kind = "a whole number" if spec["type"] == "integer" else "a number"
+    return f"not {kind} in {low:g}-{high:g}"
+
+
+class ValidationReport:
+    """Result of ``validate``: one boolean error column per feature."""
+
+    def __init__(self, errors, missing_columns, examples):
+        self.errors = errors
+        self.missing_columns = list(missing_columns)
+        self.examples = examples  # column -> (row label, first offending value)
+        self.invalid = errors.to_numpy().any(axis=1)
+
+    @property
+    def ok(self):
+        return not self.invalid.any()
+
+    @property
+    def n_invalid(self):
+        return int(self.invalid.sum())
+
+    def counts(self):
+        """Rows failing each feature's check, for features with any failures."""
+        counts = self.errors.sum()
+        return counts[counts > 0].sort_values(ascending=False)
+
+    def messages(self, limit=None):
+        """One line per failing feature, worst first."""
+        lines = []
+        for column, count in self.counts().items():
+            if column in self.missing_columns:
+                lines.append(f"{column}: column missing")
+                continue
+            row, value = self.examples[column]
+            lines.append(f"{column}: {count:,} rows {_rule(column)} "
+                         f"(first: row {row}, value {value!r})")
+        return lines[:limit]
+
+
+def validate(data):
+    """Check a batch of students against FEATURES, column by column.
+
+    ``data`` is a DataFrame, a list of dicts or one dict. Extra columns (the
+    target, scores) are ignored. Returns a ValidationReport whose
+    ``invalid`` attribute is the per-row error mask.
+    """
+    if isinstance(data, dict):
+        data = pd.DataFrame([data])
+    elif not isinstance(data, pd.DataFrame):
+        data = pd.DataFrame(data)
+    n = len(data)
+    errors, missing = {}, []
+    for column, spec in FEATURES.items():
+        if column not in data.columns:
+            missing.append(column)
+            errors[column] = np.ones(n, dtype=bool)
+            continue
+        values = data[column]
+        if spec["type"] == "categorical":
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                # Check each category once and broadcast through the codes;
+                # missing values have code -1, which lands on the final False
+                categories = values.cat.categories
+                allowed = categories != "" if spec["open"] else categories.isin(spec["values"])
+                bad = ~np.append(allowed, False)[values.cat.codes.to_numpy()]
+            elif spec["open"]:
+                bad = (values.isna() | (values == "")).to_numpy()
+            else:
+                bad = ~values.isin(spec["values"]).to_numpy()
+        else:
+            numbers = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+            low, high = spec["range"]
+            with np.errstate(invalid="ignore"):
+                bad = ~((numbers >= low) & (numbers <= high))  # NaN fails both
+                if spec["type"] != "float":
+                    bad |= numbers != np.floor(numbers)
+        errors[column] = bad
+
+    if "is_stem" in data.columns and "department" in data.columns:
+        stem = data["department"].isin(STEM_DEPARTMENTS).to_numpy()
+        is_stem = pd.to_numeric(data["is_stem"], errors="coerce").to_numpy(dtype=float)
+        errors["is_stem"] = errors["is_stem"] | (is_stem != stem)
+
+    errors = pd.DataFrame(errors, index=data.index)
+    examples = {}
+    for column in errors.columns[errors.to_numpy().any(axis=0)]:
+        if column not in missing:
+            first = int(np.argmax(errors[column].to_numpy()))
+            examples[column] = (data.index[first], data[column].iloc[first])
+    return ValidationReport(errors, missing, examples)
+
+
+_CATEGORIES = {f: frozenset(spec["values"]) for f, spec in FEATURES.items()
+               if spec["type"] == "categorical" and not spec["open"]}
+
+
+def _number(value):
+    if isinstance(value, str):
+        value = value.strip()
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def check_record(record):
+    """Problems with one student dict, as ``"column: rule (value ...)"`` lines.
+
+    Same rules as ``validate`` without building a DataFrame, so checking a
+    single row costs microseconds rather than milliseconds.
+    """
+    problems = []
+    for column, spec in FEATURES.items():
+        if column not in record:
+            problems.append(f"{column}: column missing")
+            continue
+        value = record[column]
+        if spec["type"] == "categorical":
+            if spec["open"]:
+                bad = value is None or value == "" or (isinstance(value, float) and math.isnan(value))
+            else:
+                try:
+                    bad = value not in _CATEGORIES[column]
+                except TypeError:  # unhashable, e.g. a nested object
+                    bad = True
+        else:
+            number = _number(value)
+            low, high = spec["range"]
+            bad = not low <= number <= high  # NaN fails both
+            if not bad and spec["type"] != "float":
+                bad = number != math.floor(number)
+        if not bad and column == "is_stem" and "department" in record:
+            try:
+                bad = _number(value) != (record["department"] in STEM_DEPARTMENTS)
+            except TypeError:
+                bad = True
+        if bad:
+            problems.append(f"{column}: {_rule(column)} (value {value!r})")
+    return problems
+
+
+# ---- documentation drift -------------------------------------------------------
+
+_COLUMN = re.compile(r"^\s*\d+\.\s+(\w+)")
+_FIELD = re.compile(r"^\s*-\s*(Data Type|Values|Range):\s*(.*)$")
+_RANGE = re.compile(r"(\d+(?:\.\d+)?)\s*-\s*(\d+(?:\.\d+)?)")
+
+
+def parse_column_descriptions(path=DESCRIPTION_PATH):
+    """{column: {"type": ..., "values": [...] | None, "range": (lo, hi) | None}}.
+
+    ``type`` is one of integer, float, binary, categorical. Category lists
+    ending in "etc." are marked open (``"open": True``): the documented values
+    are examples, and the reference data may contain more.
+    """
+    columns, current, field = {}, None, None
+    with open(path) as f:
+        for line in f:
+            match = _COLUMN.match(line)
+            if match:
+                current = columns.setdefault(match.group(1), {"type": None, "values": None,
+                                                              "range": None, "open": False})
+                field = None
+                continue
+            if current is None:
+                continue
+            match = _FIELD.match(line)
+            if match:
+                field, text = match.groups()
+            elif field == "Values" and line.strip() and not line.strip().startswith("-"):
+                text = line  # wrapped continuation of a Values list
+            else:
+                field = None if line.strip().startswith("-") else field
+                continue
+
+            if field == "Data Type":
+                kind = text.split("(")[0].strip().lower()
+                current["type"] = {"integer": "integer", "float": "float",
+                                   "binary": "binary"}.get(kind, "categorical")
+            elif field == "Values":
+                values = [v.strip() for v in text.split(",") if v.strip()]
+                if values and values[-1].rstrip(".") == "etc":
+                    current["open"] = True
+                    values = values[:-1]
+                current["values"] = (current["values"] or []) + values
+            elif field == "Range":
+                low, high = _RANGE.search(text).groups()
+                current["range"] = (float(low), float(high))
+
+    # "0 = Will Continue, 1 = Will Dropout" style targets are binary
+    for spec in columns.values():
+        if spec["values"] and all(re.match(r"^\d+\s*=", v) for v in spec["values"]):
+            spec["type"], spec["values"] = "binary", None
+    return columns
+
+
+def check_description(path=DESCRIPTION_PATH):
+    """(differences, undocumented, unused) between FEATURES and the documentation.
+
+    Category order is not compared: the documentation lists some categories
+    high-to-low. An open list only needs to contain the documented examples.
+    """
+    described = parse_column_descriptions(path)
+    differences = []
+    for column, spec in FEATURES.items():
+        doc = described.get(column)
+        if doc is None:
+            continue
+        if doc["type"] != spec["type"]:
+            differences.append(f"{column}: type {spec['type']} vs documented {doc['type']}")
+        if doc["range"] and spec["type"] != "binary" and tuple(doc["range"]) != spec["range"]:
+            differences.append(f"{column}: range {spec['range']} vs documented {doc['range']}")
+        if spec["type"] == "categorical" and doc["values"]:
+            ours, theirs = set(spec["values"]), set(doc["values"])
+            if doc["open"] != spec["open"]:
+                differences.append(f"{column}: open={spec['open']} vs documented open={doc['open']}")
+            if (theirs - ours) if spec["open"] else (ours != theirs):
+                differences.append(f"{column}: categories {sorted(ours)} "
+                                   f"vs documented {sorted(theirs)}")
+    undocumented = [c for c in FEATURES if c not in described]
+    unused = [c for c in described if c not in FEATURES and c != TARGET]
+    return differences, undocumented, unused
+
+
+def _read_batch(path):
+    from data_io import file_format
+
+    fmt = file_format(path)
+    if fmt == "csv":
+        # Raw strings and numbers: no dtype casts, so bad values survive to be reported
+        return pd.read_csv(path, keep_default_na=False, na_values=[""], low_memory=False)
+    if fmt == "parquet":
+        return pd.read_parquet(path)
+    return pd.read_feather(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feature schema checks.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    check = sub.add_parser("check", help="compare the schema with columns_description.txt")
+    check.add_argument("--description", default=DESCRIPTION_PATH,
+                       help=f"column documentation (default: {DESCRIPTION_PATH})")
+    batch = sub.add_parser("validate", help="validate every row of a student file")
+    batch.add_argument("path", help=".csv, .parquet or .arrow/.feather file")
+    batch.add_argument("--invalid-out", metavar="PATH", help="write the rejected rows to this CSV")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("STUDENT DROPOUT PREDICTION - FEATURE SCHEMA")
+    print("=" * 70)
+
+    if args.command == "check":
+        differences, undocumented, unused = check_description(args.description)
+        print(f"\n {len(FEATURES)} features: {len(CATEGORICAL_FEATURES)} categorical, "
+              f"{len(NUMERIC_FEATURES)} numeric")
+        if undocumented:
+            print(f" Not in {args.description}: {', '.join(undocumented)}")
+        if unused:
+            print(f" Documented but not model inputs: {', '.join(unused)}")
+        if differences:
+            print(f"\n {len(differences)} differences from {args.description}:")
+            for line in differences:
+                print(f"   {line}")
+        else:
+            print(f"\n Schema matches {args.description}")
+        print("=" * 70)
+        raise SystemExit(1 if differences else 0)
+
+    start = time.perf_counter()
+    data = _read_batch(args.path)
+    read_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    report = validate(data)
+    seconds = time.perf_counter() - start
+    print(f"\n Read {len(data):,} rows in {read_seconds:.2f}s, "
+          f"validated in {seconds:.2f}s ({len(data) / max(seconds, 1e-9):,.0f} rows/s)")
+    print(f" Invalid rows: {report.n_invalid:,} ({report.n_invalid / max(len(data), 1):.2%})")
+    for line in report.messages():
+        print(f"   {line}")
+    if args.invalid_out and report.n_invalid:
+        data[report.invalid].to_csv(args.invalid_out, index=False)
+        print(f" Rejected rows written to {args.invalid_out}")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+STUDENT DROPOUT PREDICTION - BULK SCORING
+==========================================
+Score a whole cohort CSV in fixed-size chunks with the trained model
+
+Usage:
+    python score_batch.py cohort.csv scored.csv
+    python score_batch.py cohort.csv scored.csv --chunksize 20000 --predictions-only
+"""
+
+import argparse
+import time
+
+import pandas as pd
+from pycaret.classification import load_model, predict_model
+
+from risk_factors import assess
+
+MODEL_NAME = "student_dropout_model"
+TARGET = "will_dropout"
+PREDICTION_COLUMNS = ["prediction_label", "prediction_score"]
+DEFAULT_CHUNKSIZE = 10_000
+
+
+def clean_chunk(chunk):
+    """Apply the same cleaning train.py does before setup()."""
+    if "scholarship_status" in chunk.columns:
+        chunk["scholarship_status"] = chunk["scholarship_status"].fillna("None")
+    return chunk
+
+
+def score_chunks(model, chunks, predictions_only=False, with_factors=False):
+    """Yield one scored DataFrame per input chunk.
+
+    Each chunk is scored with a single predict_model call, so the cost of the
+    pipeline is paid once per chunk rather than once per student. With
+    ``with_factors`` the rule-based factor flags and radar scores from
+    risk_factors.assess are appended as extra columns.
+    """
+    for chunk in chunks:
+        chunk = clean_chunk(chunk)
+        features = chunk.drop(columns=[TARGET], errors="ignore")
+        prediction = predict_model(model, data=features, verbose=False)
+        if predictions_only:
+            scored = prediction[PREDICTION_COLUMNS]
+        else:
+            scored = chunk.copy()
+            scored[PREDICTION_COLUMNS] = prediction[PREDICTION_COLUMNS].values
+        if with_factors:
+            scored = pd.concat([scored, assess(chunk)], axis=1)
+        yield scored
+
+
+def score_file(input_path, output_path, chunksize=DEFAULT_CHUNKSIZE,
+               model_name=MODEL_NAME, predictions_only=False, with_factors=False,
+               verbose=True):
+    """Stream input_path through the model into output_path.
+
+    Only one chunk is held in memory at a time, so memory stays flat
+    regardless of the size of the input file.
+
+    Returns (rows scored, elapsed seconds).
+    """
+    model = load_model(model_name, verbose=False)
+
+    rows = 0
+    start = time.perf_counter()
+    reader = pd.read_csv(input_path, chunksize=chunksize)
+    with open(output_path, "w", newline="") as out:
+        for i, scored in enumerate(score_chunks(model, reader, predictions_only, with_factors)):
+            scored.to_csv(out, header=(i == 0), index=False)
+            rows += len(scored)
+            if verbose:
+                elapsed = time.perf_counter() - start
+                print(f" Chunk {i + 1}: {rows:,} rows scored ({rows / elapsed:,.0f} rows/sec)")
+
+    return rows, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-score a cohort CSV for dropout risk.")
+    parser.add_argument("input", help="CSV shaped like student_dropout_dataset.csv")
+    parser.add_argument("output", help="where to write the scored CSV")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+                        help=f"rows scored per call (default: {DEFAULT_CHUNKSIZE})")
+    parser.add_argument("--model", default=MODEL_NAME,
+                        help=f"saved model name without .pkl (default: {MODEL_NAME})")
+    parser.add_argument("--predictions-only", action="store_true",
+                        help="write only prediction_label and prediction_score")
+    parser.add_argument("--with-factors", action="store_true",
+                        help="append risk/protective factor flags and radar category scores")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("STUDENT DROPOUT PREDICTION - BULK SCORING")
+    print("=" * 70)
+    print(f"\n Input: {args.input}")
+    print(f" Chunk size: {args.chunksize:,} rows\n")
+
+    rows, elapsed = score_file(args.input, args.output, args.chunksize,
+                               args.model, args.predictions_only, args.with_factors)
+
+    print("\n" + "=" * 70)
+    print(f" Scored {rows:,} rows in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/sec)")
+    print(f" Output saved as: {args.output}")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""
+STUDENT DROPOUT PREDICTION - HTTP SCORING SERVICE
+==================================================
+Async JSON API around the dropout model for other campus systems.
+Concurrent requests are merged into micro-batches and scored in one call.
+Each request is checked against the feature schema (schema.check_record, a
+few microseconds per student) before it joins a batch, so a bad request gets
+a 400 on its own; if a merged batch still fails, its requests are rescored
+one by one so only the failing one errors.
+Models are resolved per student through the model registry (see
+model_registry.py), so moving an alias swaps models without a restart.
+
+Usage:
+    python serve.py --port 8000 --max-batch-size 64 --max-wait-ms 5
+
+Endpoints:
+    POST /predict   one student (object) or many (array) using the 41 app.py fields
+    GET  /metrics   p50/p99 latency, throughput, batch and loaded-model statistics
+    GET  /drift     per-feature PSI / KS of the scored students against the
+                    training data, over the sliding window and since startup
+    GET  /health
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+from drift_monitor import DriftMonitor, load_reference
+from model_registry import MODEL_ALIAS, ModelRouter
+from prediction_log import default_logger
+from schema import FEATURES, check_record
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_MS = 5.0
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+
+class MicroBatcher:
+    """Collect pending requests and score them together.
+
+    The wait is adaptive: while requests arrive one at a time (average batch
+    size near 1) a request is scored immediately, and only once traffic is
+    concurrent does the batcher hold a batch open for up to ``max_wait``
+    seconds to let it fill towards ``max_batch_size`` rows.
+
+    Scored rows are passed on to the drift monitor in bulk: at most one
+    binning job runs at a time, and rows scored meanwhile wait in a buffer
+    for the next one.
+    """
+
+    def __init__(self, router, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms=DEFAULT_MAX_WAIT_MS, drift=None):
+        self.router = router
+        self.drift = drift
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.rows = 0
+        self._avg_batch = 1.0
+        self._queue = asyncio.Queue()
+        self._worker = None
+        self._drift_buffer = []
+        self._drift_job = None
+
+    def start(self):
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def score(self, records):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((records, future))
+        return await future
+
+    async def _collect(self):
+        pending = [await self._queue.get()]
+        rows = len(pending[0][0])
+        wait = self.max_wait if self._avg_batch > 1.5 else 0.0
+        deadline = time.monotonic() + wait
+        while rows < self.max_batch_size:
+            if not self._queue.empty():
+                item = self._queue.get_nowait()
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            pending.append(item)
+            rows += len(item[0])
+        return pending, rows
+
+    def _feed_drift(self, records):
+        if self.drift is None:
+            return
+        self._drift_buffer.extend(records)
+        if self._drift_job is None and self._drift_buffer:
+            records, self._drift_buffer = self._drift_buffer, []
+            self._drift_job = asyncio.get_running_loop().run_in_executor(
+                None, self.drift.update, records)
+            self._drift_job.add_done_callback(self._drift_done)
+
+    def _drift_done(self, job):
+        self._drift_job = None
+        if not job.cancelled() and job.exception() is not None:
+            print(f" Drift update failed: {job.exception()!r}")
+        self._feed_drift([])  # bin whatever arrived while this job ran
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending, rows = await self._collect()
+            records = [record for batch, _ in pending for record in batch]
+            try:
+                # Scored in a thread so the event loop keeps accepting requests
+                probabilities, models = await loop.run_in_executor(
+                    None, self.router.score, records)
+            except Exception as exc:
+                if len(pending) == 1:
+                    if not pending[0][1].done():
+                        pending[0][1].set_exception(exc)
+                else:
+                    # Isolate the failing request(s) from the rest of the batch
+                    for batch, future in pending:
+                        try:
+                            result = await loop.run_in_executor(None, self.router.score, batch)
+                        except Exception as item_exc:
+                            if not future.done():
+                                future.set_exception(item_exc)
+                            continue
+                        if not future.done():
+                            future.set_result(result)
+                        self._feed_drift(batch)
+                continue
+
+            start = 0
+            for batch, future in pending:
+                if not future.done():
+                    future.set_result((probabilities[start:start + len(batch)],
+                                       models[start:start + len(batch)]))
+                start += len(batch)
+            self._feed_drift(records)
+
+            self.batches += 1
+            self.rows += rows
+            self._avg_batch = 0.9 * self._avg_batch + 0.1 * len(pending)
+
+
+def _coerce(record):
+    """Copy of a validated record with numeric fields as int / float (JSON may send "20")."""
+    record = dict(record)
+    for name, spec in FEATURES.items():
+        if spec["type"] != "categorical":
+            number = float(record[name])
+            record[name] = number if spec["type"] == "float" else int(number)
+    return record
+
+
+class ServiceMetrics:
+    """Rolling request latencies plus lifetime counters."""
+
+    def __init__(self, window=10_000):
+        self.started = time.monotonic()
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+
+    def record(self, seconds):
+        self.requests += 1
+        self.latencies.append(seconds)
+
+    def snapshot(self, batcher):
+        uptime = time.monotonic() - self.started
+        latencies = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "rows_scored": batcher.rows,
+            "batches": batcher.batches,
+            "mean_batch_rows": batcher.rows / batcher.batches if batcher.batches else 0.0,
+            "uptime_s": round(uptime, 3),
+            "throughput_rps": round(self.requests / uptime, 2) if uptime else 0.0,
+            "latency_ms": {
+                "p50": round(float(np.percentile(latencies, 50)), 3),
+                "p99": round(float(np.percentile(latencies, 99)), 3),
+                "max": round(float(latencies.max()), 3),
+            },
+        }
+
+
+class ScoringService:
+    """Minimal HTTP/1.1 server on asyncio streams (keep-alive, JSON only)."""
+
+    def __init__(self, router, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms=DEFAULT_MAX_WAIT_MS, logger=None, drift=None):
+        self.router = router
+        self.batcher = MicroBatcher(router, max_batch_size, max_wait_ms, drift=drift)
+        self.metrics = ServiceMetrics()
+        self.logger = logger
+        self.drift = drift
+
+    async def handle_predict(self, body):
+        payload = json.loads(body or b"null")
+        if isinstance(payload, dict) and "students" in payload:
+            payload = payload["students"]
+        records = [payload] if isinstance(payload, dict) else payload
+        if not isinstance(records, list) or not records or \
+                not all(isinstance(record, dict) for record in records):
+            raise ValueError("Expected a student object or a non-empty array of student objects")
+        # Checked here, per request, so one bad caller can't fail a shared batch
+        problems = [f"student {i}: {problem}"
+                    for i, record in enumerate(records) for problem in check_record(record)][:10]
+        if problems:
+            raise ValueError("Students don't match the feature schema: " + "; ".join(problems))
+        records = [_coerce(record) for record in records]
+
+        start = time.perf_counter()
+        probabilities, models = await self.batcher.score(records)
+        latency_ms = (time.perf_counter() - start) * 1000
+        predictions = [
+            {
+                "dropout_probability": round(float(p), 6),
+                "prediction_label": int(p >= 0.5),
+                "risk_level": model.risk_level(p, record.get("department")),
+                "model_version": model.version,
+            }
+            for p, record, model in zip(probabilities, records, models)
+        ]
+        if self.logger:
+            for record, prediction, model in zip(records, predictions, models):
+                self.logger.log(record, prediction["dropout_probability"], prediction["risk_level"],
+                                model.model_hash, latency_ms, source="api", batch_rows=len(records),
+                                model_version=model.version)
+        return {"predictions": predictions}
+
+    async def route(self, method, path, body):
+        if method == "POST" and path == "/predict":
+            start = time.perf_counter()
+            result = await self.handle_predict(body)
+            self.metrics.record(time.perf_counter() - start)
+            return 200, result
+        if method == "GET" and path == "/metrics":
+            snapshot = self.metrics.snapshot(self.batcher)
+            if self.logger:
+                snapshot["prediction_log"] = self.logger.stats()
+            if self.drift:
+                snapshot["drift_rows"] = self.drift.rows
+            snapshot["models"] = self.router.stats()
+            return 200, snapshot
+        if method == "GET" and path == "/drift":
+            if not self.drift:
+                return 404, {"error": "Drift monitoring is disabled"}
+            return 200, {scope: self.drift.snapshot(scope) for scope in ("window", "total")}
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok"}
+        return 404, {"error": f"No route for {method} {path}"}
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_BYTES:
+                    status, result = 413, {"error": "Request body too large"}
+                    headers["connection"] = "close"    # body left unread
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    try:
+                        status, result = await self.route(method, path.split("?")[0], body)
+                    except ValueError as exc:     # includes json.JSONDecodeError
+                        self.metrics.errors += 1
+                        status, result = 400, {"error": str(exc)}
+                    except Exception as exc:
+                        self.metrics.errors += 1
+                        status, result = 500, {"error": f"{type(exc).__name__}: {exc}"}
+
+                payload = json.dumps(result).encode()
+                keep_alive = headers.get("connection", "keep-alive").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode()
+                    + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        self.batcher.start()
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve dropout predictions over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE,
+                        help=f"max rows scored per call (default: {DEFAULT_MAX_BATCH_SIZE})")
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS,
+                        help=f"max time a batch is held open (default: {DEFAULT_MAX_WAIT_MS})")
+    parser.add_argument("--no-log", action="store_true",
+                        help="don't append predictions to the audit log (see prediction_log.py)")
+    parser.add_argument("--no-drift", action="store_true",
+                        help="don't track feature drift of scored students (see drift_monitor.py)")
+    parser.add_argument("--alias", default=MODEL_ALIAS,
+                        help=f"registry alias to serve (default: {MODEL_ALIAS}, see model_registry.py)")
+    args = parser.parse_args()
+
+    router = ModelRouter(alias=args.alias)
+    router.model_for()  # load the default version before the first request
+    logger = None if args.no_log else default_logger()
+    drift = None if args.no_drift else DriftMonitor(load_reference())
+    service = ScoringService(router, args.max_batch_size, args.max_wait_ms, logger=logger, drift=drift)
+    print(f" Serving dropout predictions on http://{args.host}:{args.port}")
+    if router.registry.exists():
+        print(f" Models: alias '{args.alias}' from {router.registry.root} (hot-swapped when it moves)")
+    print(f" Micro-batching: up to {args.max_batch_size} rows, {args.max_wait_ms} ms max wait")
+    if logger:
+        print(f" Logging predictions to {logger.path}")
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
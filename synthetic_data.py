@@ -0,0 +1,158 @@
+"""
+STUDENT DROPOUT PREDICTION - SYNTHETIC STUDENT GENERATOR
+========================================================
+Generate realistic student datasets of any size for scale and load testing.
+
+Column types, ranges and category sets come from the feature schema (schema.py).
+Distributions come from a reference dataset (student_dropout_dataset.csv),
+learned separately for dropouts and non-dropouts. Each synthetic student
+draws will_dropout first, then every feature from that class's distribution.
+The marginals match the reference data and each feature keeps its
+relationship with the target.
+
+Rows are generated in vectorized chunks and appended to the output file,
+so memory stays flat whatever the row count.
+
+Usage:
+    python synthetic_data.py synthetic.csv --rows 1000000
+    python synthetic_data.py big.csv.gz --rows 10000000 --chunksize 250000 --seed 7
+"""
+
+import argparse
+import gzip
+import time
+
+import numpy as np
+import pandas as pd
+
+from schema import FEATURES, STEM_DEPARTMENTS, TARGET
+
+REFERENCE_PATH = "student_dropout_dataset.csv"
+DEFAULT_CHUNKSIZE = 100_000
+# Integer columns with at most this many distinct values are sampled from a
+# frequency table instead of a quantile curve, so e.g. binary flags stay exact
+MAX_DISCRETE_VALUES = 32
+QUANTILES = np.linspace(0, 1, 201)
+
+class StudentGenerator:
+    """Class-conditional sampler fitted on a reference dataset."""
+
+    def __init__(self, schema, reference, target=TARGET):
+        self.schema = schema
+        self.target = target
+        self.columns = list(reference.columns)
+        self.dropout_rate = float(reference[target].mean())
+        self.tables = {}  # column -> {class: (values, probabilities)}
+        self.curves = {}  # column -> {class: quantile values}
+
+        for column in self.columns:
+            if column == target or column == "is_stem":
+                continue  # target is drawn first; is_stem follows department
+            spec = schema.get(column, {"type": "categorical", "values": None, "range": None})
+            discrete = (spec["type"] in ("categorical", "binary")
+                        or (spec["type"] == "integer"
+                            and reference[column].nunique() <= MAX_DISCRETE_VALUES))
+            by_class = {}
+            for label, group in reference.groupby(target):
+                values = group[column]
+                if discrete:
+                    counts = values.value_counts()
+                    # Documented categories absent from this class keep a small chance
+                    for value in spec["values"] or []:
+                        if value not in counts.index:
+                            counts[value] = 0.5
+                    by_class[label] = (counts.index.to_numpy(), (counts / counts.sum()).to_numpy())
+                else:
+                    by_class[label] = np.quantile(values.to_numpy(dtype=float), QUANTILES)
+            (self.tables if discrete else self.curves)[column] = by_class
+
+    @classmethod
+    def from_files(cls, reference_path=REFERENCE_PATH):
+        reference = pd.read_csv(reference_path, keep_default_na=False)
+        return cls(FEATURES, reference)
+
+    def sample(self, n, rng):
+        """One DataFrame of n synthetic students, columns in reference order."""
+        target = (rng.random(n) < self.dropout_rate).astype(np.int64)
+        out = {}
+        for column in self.columns:
+            if column == self.target:
+                out[column] = target
+            elif column == "is_stem":
+                continue
+            elif column in self.tables:
+                out[column] = self._sample_discrete(column, target, rng)
+            else:
+                out[column] = self._sample_continuous(column, target, rng)
+        if "is_stem" in self.columns:
+            out["is_stem"] = np.isin(out["department"], STEM_DEPARTMENTS).astype(np.int64)
+        return pd.DataFrame(out, columns=self.columns)
+
+    def _sample_discrete(self, column, target, rng):
+        result = None
+        for label, (values, probabilities) in self.tables[column].items():
+            mask = target == label
+            draws = rng.choice(values, size=int(mask.sum()), p=probabilities)
+            if result is None:
+                result = np.empty(len(target), dtype=draws.dtype)
+            result[mask] = draws
+        return result
+
+    def _sample_continuous(self, column, target, rng):
+        spec = self.schema.get(column, {"type": "float", "range": None})
+        result = np.empty(len(target))
+        for label, curve in self.curves[column].items():
+            mask = target == label
+            # Inverse-CDF sampling from the class's quantile curve
+            result[mask] = np.interp(rng.random(int(mask.sum())), QUANTILES, curve)
+        if spec["range"]:
+            result = np.clip(result, *spec["range"])
+        if spec["type"] == "integer":
+            return np.rint(result).astype(np.int64)
+        return np.round(result, 2)
+
+
+def generate(output_path, rows, chunksize=DEFAULT_CHUNKSIZE, seed=42,
+             reference_path=REFERENCE_PATH, verbose=True):
+    """Stream ``rows`` synthetic students to a CSV file and return elapsed seconds."""
+    generator = StudentGenerator.from_files(reference_path)
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    opener = gzip.open if str(output_path).endswith(".gz") else open
+    with opener(output_path, "wt", newline="") as out:
+        for i, offset in enumerate(range(0, rows, chunksize)):
+            chunk = generator.sample(min(chunksize, rows - offset), rng)
+            chunk.to_csv(out, header=(i == 0), index=False)
+            if verbose:
+                done = offset + len(chunk)
+                elapsed = time.perf_counter() - start
+                print(f" Chunk {i + 1}: {done:,} rows written ({done / elapsed:,.0f} rows/sec)")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic student records.")
+    parser.add_argument("output", help="CSV to write (.csv or .csv.gz)")
+    parser.add_argument("--rows", type=int, required=True, help="number of students to generate")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+                        help=f"rows generated per chunk (default: {DEFAULT_CHUNKSIZE})")
+    parser.add_argument("--seed", type=int, default=42, help="random seed (default: 42)")
+    parser.add_argument("--reference", default=REFERENCE_PATH,
+                        help=f"dataset whose distributions are copied (default: {REFERENCE_PATH})")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("STUDENT DROPOUT PREDICTION - SYNTHETIC DATA")
+    print("=" * 70)
+    print(f"\n Generating {args.rows:,} students in chunks of {args.chunksize:,}\n")
+
+    elapsed = generate(args.output, args.rows, args.chunksize, args.seed, args.reference)
+
+    print("\n" + "=" * 70)
+    print(f" Wrote {args.rows:,} rows in {elapsed:.1f}s ({args.rows / max(elapsed, 1e-9):,.0f} rows/sec)")
+    print(f" Output saved as: {args.output}")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""
+STUDENT DROPOUT PREDICTION - RISK THRESHOLDS
+============================================
+Cost-based HIGH / MODERATE cutoffs instead of fixed 0.7 / 0.4.
+
+The thresholds are chosen on out-of-fold probabilities (every student
+scored by a model that never saw them). Each student in a tier has a cost:
+
+- a dropout left in LOW RISK costs ``miss_cost``
+- a dropout in MODERATE RISK still costs ``moderate_miss_fraction`` of that
+  (light-touch support prevents fewer dropouts than an advisor)
+- every HIGH RISK student costs ``high_cost`` of advisor time, every
+  MODERATE RISK student ``moderate_cost``
+
+All candidate (high, moderate) pairs are scored in one vectorized pass: the
+probabilities are sorted once, cumulative counts give the flagged students
+and dropouts above every candidate cutoff, and the cost of every pair is a
+broadcast over those counts. ``high_capacity`` optionally caps the share of
+students placed in HIGH RISK (advisor caseload). With ``by_department`` the
+sweep is repeated per department; departments with too few students keep
+the overall cutoffs.
+
+train.py runs this after finalize_model and saves the result as
+student_dropout_thresholds.json plus the out-of-fold scores in
+student_dropout_oof.npz, so costs can be re-tuned later in milliseconds.
+inference.risk_level() and the app read the saved thresholds.
+
+Configuration comes from the environment:
+    RISK_THRESHOLDS_PATH   thresholds file (default: student_dropout_thresholds.json)
+
+Usage:
+    python thresholds.py show
+    python thresholds.py optimize --miss-cost 20 --high-capacity 0.25
+    python thresholds.py optimize --refit          # recompute out-of-fold scores first
+"""
+
+import argparse
+import json
+import os
+import warnings
+
+import numpy as np
+
+THRESHOLDS_PATH = os.environ.get("RISK_THRESHOLDS_PATH", "student_dropout_thresholds.json")
+OOF_PATH = "student_dropout_oof.npz"
+MODEL_NAME = "student_dropout_model"
+DATA_PATH = "student_dropout_dataset.csv"
+FORMAT_VERSION = 1
+
+# Used when no thresholds file has been saved
+DEFAULT_HIGH = 0.7
+DEFAULT_MODERATE = 0.4
+
+DEFAULT_COSTS = {
+    "miss_cost": 10.0,
+    "moderate_miss_fraction": 0.5,
+    "high_cost": 1.0,
+    "moderate_cost": 0.25,
+    "high_capacity": None,
+}
+MAX_CANDIDATES = 1000        # distinct cutoffs tried per tier (quantiles beyond that)
+MIN_GROUP_ROWS = 150
+MIN_GROUP_DROPOUTS = 20
+CALIBRATION_BINS = 10
+NOBODY = 1.0 + 1e-9          # a cutoff no probability reaches
+
+
+# ---- sweep ---------------------------------------------------------------------
+
+def _candidates(probability):
+    """Cutoffs to try, highest first, starting with one that flags nobody."""
+    values = np.unique(probability)
+    if len(values) > MAX_CANDIDATES:
+        values = np.unique(np.quantile(probability, np.linspace(0, 1, MAX_CANDIDATES)))
+    return np.concatenate([[NOBODY], values[::-1]])
+
+
+def _cumulative(probability, y, cutoffs):
+    """(students, dropouts) with probability >= each cutoff, from one sort."""
+    order = np.argsort(-probability, kind="stable")
+    descending = probability[order]
+    dropouts = np.concatenate([[0], np.cumsum(y[order])])
+    # Number of probabilities >= cutoff, i.e. of -p <= -cutoff in the ascending -p array
+    flagged = np.searchsorted(-descending, -np.asarray(cutoffs), side="right")
+    return flagged, dropouts[flagged]
+
+
+def tier_counts(probability, y, high, moderate):
+    """Students and dropouts per tier for one pair of cutoffs."""
+    probability, y = np.asarray(probability, dtype=float), np.asarray(y, dtype=int)
+    flagged, caught = _cumulative(probability, y, [high, moderate])
+    return {
+        "high": int(flagged[0]), "high_dropouts": int(caught[0]),
+        "moderate": int(flagged[1] - flagged[0]), "moderate_dropouts": int(caught[1] - caught[0]),
+        "low": int(len(y) - flagged[1]), "low_dropouts": int(y.sum() - caught[1]),
+    }
+
+
+def _cost(high_n, high_pos, flagged_n, flagged_pos, total_pos, costs):
+    moderate_n, moderate_pos = flagged_n - high_n, flagged_pos - high_pos
+    missed = total_pos - flagged_pos
+    return (costs["miss_cost"] * (missed + costs["moderate_miss_fraction"] * moderate_pos)
+            + costs["high_cost"] * high_n + costs["moderate_cost"] * moderate_n)
+
+
+def summarize(probability, y, high, moderate, costs):
+    """Tier sizes, recall and cost per student of one pair of cutoffs."""
+    counts = tier_counts(probability, y, high, moderate)
+    n, dropouts = len(y), max(int(np.sum(y)), 1)
+    flagged_pos = counts["high_dropouts"] + counts["moderate_dropouts"]
+    cost = _cost(counts["high"], counts["high_dropouts"], counts["high"] + counts["moderate"],
+                 flagged_pos, int(np.sum(y)), costs)
+    return {
+        "high": float(high), "moderate": float(moderate), "students": n,
+        "high_share": counts["high"] / n,
+        "flagged_share": (counts["high"] + counts["moderate"]) / n,
+        "recall_high": counts["high_dropouts"] / dropouts,
+        "recall_flagged": flagged_pos / dropouts,
+        "precision_high": counts["high_dropouts"] / max(counts["high"], 1),
+        "cost_per_student": cost / n,
+    }
+
+
+def sweep(probability, y, costs=None):
+    """Cost of every (high, moderate) cutoff pair and the cheapest one.
+
+    Returns (cutoffs, cost matrix, (high, moderate)) where ``cost[i, j]`` is the
+    cost per student of HIGH >= cutoffs[i] and MODERATE >= cutoffs[j];
+    pairs with the moderate cutoff above the high one, or over capacity,
+    are infinite.
+    """
+    costs = {**DEFAULT_COSTS, **(costs or {})}
+    probability, y = np.asarray(probability, dtype=float), np.asarray(y, dtype=int)
+    cutoffs = _candidates(probability)
+    flagged, caught = _cumulative(probability, y, cutoffs)
+
+    cost = _cost(flagged[:, None], caught[:, None], flagged[None, :], caught[None, :],
+                 int(y.sum()), costs) / len(y)
+    cost[np.tril_indices(len(cutoffs), -1)] = np.inf   # moderate cutoff above high
+    if costs["high_capacity"] is not None:
+        cost[flagged / len(y) > costs["high_capacity"], :] = np.inf
+    i, j = np.unravel_index(np.argmin(cost), cost.shape)
+    return cutoffs, cost, (float(cutoffs[i]), float(cutoffs[j]))
+
+
+def calibration(probability, y, bins=CALIBRATION_BINS):
+    """Brier score, expected calibration error and a reliability table."""
+    probability, y = np.asarray(probability, dtype=float), np.asarray(y, dtype=float)
+    which = np.minimum((probability * bins).astype(int), bins - 1)
+    count = np.bincount(which, minlength=bins)
+    mean_p = np.bincount(which, probability, minlength=bins) / np.maximum(count, 1)
+    rate = np.bincount(which, y, minlength=bins) / np.maximum(count, 1)
+    return {
+        "brier": float(np.mean((probability - y) ** 2)),
+        "ece": float(np.sum(count * np.abs(mean_p - rate)) / len(y)),
+        "bins": [[round(float(m), 4), round(float(r), 4), int(c)]
+                 for m, r, c in zip(mean_p, rate, count) if c],
+    }
+
+
+def optimize(probability, y, groups=None, costs=None):
+    """Thresholds overall and (if ``groups`` is given) per group, ready to save."""
+    costs = {**DEFAULT_COSTS, **(costs or {})}
+    probability, y = np.asarray(probability, dtype=float), np.asarray(y, dtype=int)
+    _, _, (high, moderate) = sweep(probability, y, costs)
+    result = {
+        "format_version": FORMAT_VERSION,
+        "costs": costs,
+        "overall": summarize(probability, y, high, moderate, costs),
+        "baseline": summarize(probability, y, DEFAULT_HIGH, DEFAULT_MODERATE, costs),
+        "calibration": calibration(probability, y),
+        "by_department": {},
+    }
+    if groups is not None:
+        groups = np.asarray(groups, dtype=object)
+        for group in sorted(set(groups)):
+            mask = groups == group
+            if mask.sum() < MIN_GROUP_ROWS or y[mask].sum() < MIN_GROUP_DROPOUTS:
+                continue  # too few students to tune; the overall cutoffs apply
+            _, _, (g_high, g_moderate) = sweep(probability[mask], y[mask], costs)
+            result["by_department"][str(group)] = summarize(
+                probability[mask], y[mask], g_high, g_moderate, costs)
+    return result
+
+
+# ---- out-of-fold scores -------------------------------------------------------
+
+def out_of_fold_probability(estimator, folds):
+    """(probability, y) of ``estimator`` refit on every preprocessed CV fold.
+
+    ``folds`` is the list built by train_cache.prepare_folds; rows follow the
+    folds' test rows in order.
+    """
+    from sklearn.base import clone
+
+    parts = []
+    for fold in folds:
+        model = clone(estimator).fit(fold["X_train"], fold["y_train"])
+        parts.append(model.predict_proba(fold["X_test"])[:, list(model.classes_).index(1)])
+    return np.concatenate(parts), np.concatenate([fold["y_test"] for fold in folds])
+
+
+def refit_out_of_fold(pipeline, data_path=DATA_PATH, n_folds=5, seed=42):
+    """(probability, y, department) from cross-validating a full saved pipeline."""
+    import pandas as pd
+    from sklearn.base import clone
+    from sklearn.model_selection import StratifiedKFold
+
+    data = pd.read_csv(data_path, keep_default_na=False, na_values=[""])
+    data["scholarship_status"] = data["scholarship_status"].fillna("None")
+    X, y = data.drop(columns=["will_dropout"]), data["will_dropout"].to_numpy()
+    probability = np.zeros(len(data))
+    for train_idx, test_idx in StratifiedKFold(n_folds, shuffle=True, random_state=seed).split(X, y):
+        model = clone(pipeline).fit(X.iloc[train_idx], y[train_idx])
+        probability[test_idx] = model.predict_proba(X.iloc[test_idx])[:, list(model.classes_).index(1)]
+    return probability, y, X["department"].to_numpy(dtype=object)
+
+
+def save_out_of_fold(probability, y, department, path=OOF_PATH):
+    np.savez_compressed(path, probability=np.asarray(probability, dtype=float),
+                        y=np.asarray(y, dtype=np.int8), department=np.asarray(department, dtype=str))
+
+
+def load_out_of_fold(path=OOF_PATH):
+    with np.load(path) as saved:
+        return saved["probability"], saved["y"], saved["department"]
+
+
+# ---- saved thresholds ----------------------------------------------------------
+
+def export_thresholds(probability, y, department=None, costs=None, by_department=True,
+                      path=THRESHOLDS_PATH, model_name=MODEL_NAME):
+    """Optimize and save thresholds for the saved model; returns the result."""
+    from prediction_cache import file_hash
+
+    result = optimize(probability, y, department if by_department else None, costs)
+    model_path = f"{model_name}.pkl"
+    result["model_sha256"] = file_hash(model_path) if os.path.exists(model_path) else None
+    with open(path, "w") as f:
+        json.dump(result, f, indent=2)
+    return result
+
+
+def load_thresholds(path=THRESHOLDS_PATH):
+    """{"high", "moderate", "by_department": {name: (high, moderate)}}.
+
+    Falls back to 0.7 / 0.4 if no thresholds have been saved.
+    """
+    try:
+        with open(path) as f:
+            saved = json.load(f)
+    except FileNotFoundError:
+        return {"high": DEFAULT_HIGH, "moderate": DEFAULT_MODERATE, "by_department": {}}
+    if saved.get("format_version") != FORMAT_VERSION:
+        warnings.warn(f"{path} has an unknown format; using the default 0.7 / 0.4 cutoffs")
+        return {"high": DEFAULT_HIGH, "moderate": DEFAULT_MODERATE, "by_department": {}}
+    return {
+        "high": saved["overall"]["high"],
+        "moderate": saved["overall"]["moderate"],
+        "by_department": {name: (t["high"], t["moderate"])
+                          for name, t in saved.get("by_department", {}).items()},
+    }
+
+
+def _print_result(result):
+    def row(label, t):
+        print(f" {label:<24}{t['high']:>7.3f}{t['moderate']:>7.3f}{t['high_share']:>8.1%}"
+              f"{t['flagged_share']:>9.1%}{t['recall_high']:>9.1%}{t['recall_flagged']:>9.1%}"
+              f"{t['cost_per_student']:>8.3f}")
+
+    costs = result["costs"]
+    print(f"\n Costs: missed dropout {costs['miss_cost']:g}, dropout in MODERATE "
+          f"{costs['moderate_miss_fraction']:.0%} of that, HIGH student {costs['high_cost']:g}, "
+          f"MODERATE student {costs['moderate_cost']:g}"
+          + (f", HIGH capacity {costs['high_capacity']:.0%}" if costs["high_capacity"] else ""))
+    print(f"\n {'':<24}{'HIGH':>7}{'MOD':>7}{'% HIGH':>8}{'% flag':>9}{'rec HI':>9}"
+          f"{'rec flag':>9}{'cost':>8}")
+    print(" " + "-" * 80)
+    row("Fixed 0.7 / 0.4", result["baseline"])
+    row("Optimized", result["overall"])
+    for name, t in result["by_department"].items():
+        row(f"  {name}", t)
+    cal = result["calibration"]
+    print(f"\n Calibration: Brier {cal['brier']:.4f}, ECE {cal['ece']:.4f} "
+          f"(mean predicted vs observed dropout rate per 0.1 bin)")
+    for mean_p, rate, count in cal["bins"]:
+        print(f"   predicted {mean_p:5.1%}  observed {rate:5.1%}  ({count:,} students)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cost-based risk thresholds.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("show", help=f"print the saved {THRESHOLDS_PATH}")
+    tune = sub.add_parser("optimize", help=f"re-optimize from {OOF_PATH} and save")
+    for name, default in DEFAULT_COSTS.items():
+        if name == "high_capacity":
+            tune.add_argument("--high-capacity", type=float, default=None,
+                              help="max share of students in HIGH RISK, e.g. 0.2 (default: no cap)")
+        else:
+            tune.add_argument(f"--{name.replace('_', '-')}", type=float, default=default,
+                              help=f"(default: {default:g})")
+    tune.add_argument("--no-departments", action="store_true", help="one pair of cutoffs for everyone")
+    tune.add_argument("--refit", action="store_true",
+                      help="recompute out-of-fold scores by cross-validating the saved pipeline")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("STUDENT DROPOUT PREDICTION - RISK THRESHOLDS")
+    print("=" * 70)
+    if args.command == "show":
+        with open(THRESHOLDS_PATH) as f:
+            result = json.load(f)
+        from prediction_cache import file_hash
+        if result.get("model_sha256") not in (None, file_hash(f"{MODEL_NAME}.pkl")):
+            print(f"\n Warning: {THRESHOLDS_PATH} was optimized for a different {MODEL_NAME}.pkl;"
+                  f" run 'python thresholds.py optimize --refit'")
+        _print_result(result)
+    else:
+        if args.refit or not os.path.exists(OOF_PATH):
+            import joblib
+            print(f"\n Cross-validating {MODEL_NAME}.pkl for out-of-fold scores...")
+            save_out_of_fold(*refit_out_of_fold(joblib.load(f"{MODEL_NAME}.pkl")))
+        probability, y, department = load_out_of_fold()
+        costs = {name: getattr(args, name) for name in DEFAULT_COSTS}
+        result = export_thresholds(probability, y, department, costs,
+                                   by_department=not args.no_departments)
+        print(f"\n {len(y):,} out-of-fold scores from {OOF_PATH}")
+        _print_result(result)
+        print(f"\n Saved {THRESHOLDS_PATH}")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
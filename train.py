@@ -2,78 +2,227 @@
 STUDENT DROPOUT PREDICTION - PYCARET TRAINING
 ==============================================
 Clean, simple training script with PyCaret
+
+Usage:
+    python train.py                         # serial compare_models
+    python train.py --parallel --budget 120 # parallel, time-budgeted comparison
+    python train.py --no-cache              # rerun setup() and fold preprocessing from scratch
+    python train.py --timings stages.json   # also write per-stage wall-clock seconds
+    python train.py --miss-cost 20          # weigh missed dropouts more when choosing risk cutoffs
+    python train.py --alias canary          # publish to the model registry as canary instead of prod
 """
 
+import argparse
+import json
+import time
+
 from pycaret.classification import *
 import pandas as pd
+from data_io import drop_invalid, load_students
+from schema import CATEGORICAL_FEATURES, FEATURES, NUMERIC_FEATURES, declared_schema
+from inference import export_scorer
+from attributions import export_explainer
+from drift_monitor import export_reference
+from thresholds import export_thresholds, out_of_fold_probability, save_out_of_fold
+from model_registry import DEFAULT_ALIAS, ModelRegistry
+from model_artifact import export_artifact
+from parallel_compare import compare_models_parallel, print_report, turbo_candidates
+from halving_search import DEFAULT_TRIALS, model_id, print_summary, successive_halving
+from sklearn.base import clone
+from train_cache import TrainingCache, file_hash, prepare_folds, setup_key
+
+parser = argparse.ArgumentParser(description="Train the student dropout model.")
+parser.add_argument("--parallel", action="store_true",
+                    help="cross-validate candidate x fold tasks on a process pool with early stopping")
+parser.add_argument("--budget", type=float, default=None,
+                    help="wall-clock budget in seconds for model comparison (default: unlimited)")
+parser.add_argument("--n-jobs", type=int, default=None,
+                    help="worker processes for --parallel and tuning (default: all cores)")
+parser.add_argument("--n-trials", type=int, default=DEFAULT_TRIALS,
+                    help=f"configurations tried by successive-halving tuning (default: {DEFAULT_TRIALS})")
+parser.add_argument("--no-cache", action="store_true",
+                    help="don't read or write the .cache/train setup and fold cache")
+parser.add_argument("--timings", metavar="PATH",
+                    help="write per-stage timings (load, setup, compare, tune, finalize, save, thresholds) as JSON")
+parser.add_argument("--miss-cost", type=float, default=None,
+                    help="cost of a missed dropout relative to one HIGH RISK intervention (see thresholds.py)")
+parser.add_argument("--alias", action="append",
+                    help=f"registry alias(es) to point at the new version (default: {DEFAULT_ALIAS})")
+parser.add_argument("--no-publish", action="store_true",
+                    help="don't publish the saved files to the model registry (see model_registry.py)")
+args = parser.parse_args()
 
 print("="*70)
 print("STUDENT DROPOUT PREDICTION - TRAINING WITH PYCARET")
 print("="*70)
 
-# Load data
-print("\n[1/6] Loading dataset...")
-data = pd.read_csv("student_dropout_dataset.csv")
-print(f" Loaded: {data.shape[0]} rows, {data.shape[1]} columns")
-
-# Fill missing values
-print("\n[2/6] Cleaning data...")
-data["scholarship_status"] = data["scholarship_status"].fillna("None")
-print(f" Filled missing scholarship_status values")
-
-# Initialize PyCaret
-print("\n[3/6] Setting up PyCaret...")
-clf = setup(
-    data=data,
+DATA_PATH = "student_dropout_dataset.csv"
+FILL_VALUES = {"scholarship_status": "None"}
+SETUP_PARAMS = dict(
     target='will_dropout',
     session_id=42,
     fix_imbalance=True,              # SMOTE for class balance
     normalize=True,                   # Normalize features
     fold=5,                          # 5-fold CV
-    categorical_features=[
-        'gender', 'state_of_origin', 'marital_status', 
-        'secondary_school_type', 'semester_gpa_trend', 
-        'department', 'program_difficulty', 'scholarship_status',
-        'family_income_level', 'fee_payment_status', 
-        'financial_stress_level', 'accommodation_type',
-        'health_status', 'stress_level', 'motivation_level',
-        'career_clarity', 'family_support'
-    ],
-    numeric_features=[
-        'age', 'distance_from_home_km', 'has_children',
-        'admission_score', 'secondary_cgpa', 'year_of_study',
-        'current_cgpa', 'course_load_per_semester',
-        'attendance_percentage', 'number_of_failed_courses',
-        'number_of_repeated_courses', 'has_part_time_job',
-        'receives_allowance', 'library_visits_per_week',
-        'online_platform_usage_hours', 'participation_in_clubs',
-        'has_mentor', 'peer_study_groups', 'social_integration_score',
-        'received_academic_counseling', 'tutoring_sessions_attended',
-        'previous_warnings', 'probation_status', 'is_stem'
-    ]
+    categorical_features=CATEGORICAL_FEATURES,
+    numeric_features=NUMERIC_FEATURES,
 )
-print(" Setup complete!")
+
+# Content-addressed cache: a rerun on unchanged data and setup skips stages 1-3
+# and reuses the preprocessed CV folds (see train_cache.py)
+stage_times = {}
+stage_start = time.perf_counter()
+cache = None if args.no_cache else TrainingCache()
+key = setup_key(file_hash(DATA_PATH), {**SETUP_PARAMS, "fill_values": FILL_VALUES,
+                                        "dtypes": {c: str(d) for c, d in declared_schema().items()},
+                                        # Rows kept by drop_invalid() depend on the validation rules
+                                        "validation": {c: (s["range"], s.get("values"), s.get("open"))
+                                                       for c, s in FEATURES.items()}})
+clf = cache.load_setup(key) if cache else None
+setup_cached = clf is not None
+
+if setup_cached:
+    print(f"\n[1-3/6] Cache hit: restored data split and fitted setup() ({key})")
+    print(f" Train: {get_config('X_train').shape[0]} rows, Test: {get_config('X_test').shape[0]} rows")
+    stage_times["load"] = time.perf_counter() - stage_start
+    stage_start = time.perf_counter()
+else:
+    # Load data
+    print("\n[1/6] Loading dataset...")
+    data = load_students(DATA_PATH)
+    print(f" Loaded: {data.shape[0]} rows, {data.shape[1]} columns "
+          f"({data.memory_usage(deep=True).sum() / 1024**2:.2f} MB, typed)")
+
+    # Fill missing values
+    print("\n[2/6] Cleaning data...")
+    data = data.fillna(FILL_VALUES)
+    print(f" Filled missing scholarship_status values")
+    data, report = drop_invalid(data)
+    if report.missing_columns:
+        raise ValueError(f"{DATA_PATH} is missing feature columns: {report.missing_columns}")
+    if report.n_invalid:
+        print(f" Dropped {report.n_invalid} rows that fail the feature schema:")
+        for line in report.messages(limit=10):
+            print(f"   {line}")
+    else:
+        print(" All rows pass the feature schema checks")
+    stage_times["load"] = time.perf_counter() - stage_start
+    stage_start = time.perf_counter()
+
+    # Initialize PyCaret
+    print("\n[3/6] Setting up PyCaret...")
+    clf = setup(data=data, **SETUP_PARAMS)
+    if cache:
+        cache.save_setup(key, clf)
+        print(f" Cache: stored setup() as {key}")
+    print(" Setup complete!")
+
+# Preprocessed CV folds shared by the parallel comparison and the tuner
+fold_args = (get_config('pipeline'), get_config('X_train'), get_config('y_train'),
+             get_config('fold_generator'))
+folds = cache.fold_data(key, *fold_args) if cache else prepare_folds(*fold_args)[0]
+stage_times["setup"] = time.perf_counter() - stage_start
+stage_start = time.perf_counter()
 
 # Compare models
 print("\n[4/6] Comparing models...")
-best_model = compare_models(sort='Recall', n_select=1)
+if args.parallel:
+    best_id, report = compare_models_parallel(
+        turbo_candidates(models(internal=True)), folds,
+        budget_seconds=args.budget, n_jobs=args.n_jobs
+    )
+    print_report(report)
+    best_model = create_model(best_id, cross_validation=False, verbose=False)
+else:
+    budget_minutes = args.budget / 60 if args.budget else None
+    best_model = compare_models(sort='Recall', n_select=1, budget_time=budget_minutes)
 print(f" Best model selected: {type(best_model).__name__}")
+stage_times["compare"] = time.perf_counter() - stage_start
+stage_start = time.perf_counter()
 
 # Tune model
 print("\n[5/6] Tuning hyperparameters...")
-tuned_model = tune_model(best_model, optimize='Recall', n_iter=20)
+models_table = models(internal=True)
+tune_grid = models_table.loc[model_id(best_model, models_table), 'Tune Grid']
+best_params, trials = successive_halving(best_model, tune_grid, folds,
+                                         n_trials=args.n_trials, n_jobs=args.n_jobs)
+trials.to_csv("tuning_report.csv", index=False)
+print_summary(trials)
+tuned_model = create_model(clone(best_model).set_params(**best_params), verbose=False)
 tuned_results = pull()
 print(f" Tuned model - Recall: {tuned_results.loc['Mean', 'Recall']:.4f}")
+stage_times["tune"] = time.perf_counter() - stage_start
+stage_start = time.perf_counter()
 
 # Finalize model
 print("\n[6/6] Finalizing and saving...")
 final_model = finalize_model(tuned_model)
+stage_times["finalize"] = time.perf_counter() - stage_start
+stage_start = time.perf_counter()
+
 save_model(final_model, "student_dropout_model")
+export_scorer(final_model, "student_dropout_scorer.pkl")
+try:
+    export_artifact(final_model, "student_dropout_scorer.bin")
+    artifact_saved = True
+except ValueError as exc:
+    print(f" Skipped memory-mapped artifact: {exc}")
+    artifact_saved = False
+try:
+    export_explainer(final_model, "student_dropout_explainer.pkl")
+    explainer_saved = True
+except ValueError as exc:
+    print(f" Skipped feature attributions: {exc}")
+    explainer_saved = False
+export_reference(path="student_dropout_drift_reference.json", data_path=DATA_PATH)
+stage_times["save"] = time.perf_counter() - stage_start
+stage_start = time.perf_counter()
+
+# Risk cutoffs chosen on out-of-fold probabilities of the tuned configuration
+oof_probability, oof_y = out_of_fold_probability(clone(best_model).set_params(**best_params), folds)
+X_train = get_config('X_train')
+test_rows = [test for _, test in get_config('fold_generator').split(X_train, get_config('y_train'))]
+oof_department = pd.concat([X_train['department'].iloc[rows] for rows in test_rows]).to_numpy()
+save_out_of_fold(oof_probability, oof_y, oof_department)
+costs = {"miss_cost": args.miss_cost} if args.miss_cost is not None else None
+thresholds = export_thresholds(oof_probability, oof_y, oof_department, costs)
+print(f" Risk cutoffs: HIGH >= {thresholds['overall']['high']:.3f}, "
+      f"MODERATE >= {thresholds['overall']['moderate']:.3f} "
+      f"(cost/student {thresholds['overall']['cost_per_student']:.3f} "
+      f"vs {thresholds['baseline']['cost_per_student']:.3f} at 0.7 / 0.4; "
+      f"{len(thresholds['by_department'])} department overrides)")
+stage_times["thresholds"] = time.perf_counter() - stage_start
+
+# Versioned copy in the model registry; running apps switch when the alias moves
+if not args.no_publish:
+    version = ModelRegistry().publish(
+        metrics={"recall": float(tuned_results.loc['Mean', 'Recall']),
+                 "precision": float(tuned_results.loc['Mean', 'Prec.']),
+                 "f1": float(tuned_results.loc['Mean', 'F1']),
+                 "auc": float(tuned_results.loc['Mean', 'AUC']),
+                 "model": type(best_model).__name__},
+        data_path=DATA_PATH, aliases=args.alias or [DEFAULT_ALIAS], source="train.py")
+
+if args.timings:
+    with open(args.timings, "w") as f:
+        json.dump({"stages": stage_times,
+                   "recall": float(tuned_results.loc['Mean', 'Recall']),
+                   "setup_cached": setup_cached}, f, indent=2)
 
 print("\n" + "="*70)
 print(" MODEL TRAINING COMPLETE!")
 print("="*70)
 print(f"\n Model saved as: student_dropout_model.pkl")
+print(f" Lightweight scorer saved as: student_dropout_scorer.pkl")
+if artifact_saved:
+    print(f" Memory-mapped scorer saved as: student_dropout_scorer.bin")
+if explainer_saved:
+    print(f" Attribution explainer saved as: student_dropout_explainer.pkl")
+print(f" Drift reference saved as: student_dropout_drift_reference.json")
+print(f" Risk thresholds saved as: student_dropout_thresholds.json (out-of-fold scores: student_dropout_oof.npz)")
+print(f" Tuning report saved as: tuning_report.csv")
+if not args.no_publish:
+    print(f" Published to the model registry as {version} ({', '.join(args.alias or [DEFAULT_ALIAS])})")
 print(f" Final Recall: {tuned_results.loc['Mean', 'Recall']*100:.2f}%")
 print(f" Final F1: {tuned_results.loc['Mean', 'F1']*100:.2f}%")
 print(f"\n Ready for deployment!")
@@ -0,0 +1,172 @@
+"""
+STUDENT DROPOUT PREDICTION - TRAINING CACHE
+============================================
+Content-addressed on-disk cache so train.py reruns only redo what changed.
+
+Each entry lives in ``.cache/train/<key>/``. ``key`` hashes the dataset
+bytes, the cleaning and setup() parameters and the PyCaret version, so any
+change produces a new entry instead of a stale hit. An entry holds:
+
+- the fitted setup() experiment, its train/test split and the transformed
+  train/test matrices
+- per CV fold: the fitted preprocessing pipeline (imputation, encoding,
+  SMOTE, scaling) and the resampled train / transformed validation arrays,
+  so candidate models are fitted directly on them
+
+Entries are evicted least-recently-used first once there are more than
+``MAX_ENTRIES`` or they exceed ``TRAIN_CACHE_MAX_MB`` in total. The location
+comes from ``TRAIN_CACHE_DIR``.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = ".cache/train"
+DEFAULT_MAX_MB = 1024
+MAX_ENTRIES = 8
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """sha256 of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def setup_key(data_hash, setup_params):
+    """Cache key for one (dataset, setup parameters, PyCaret version) combination."""
+    import pycaret
+
+    payload = json.dumps(
+        {"data": data_hash, "setup": setup_params, "pycaret": pycaret.__version__},
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def prepare_folds(pipeline, X, y, fold_generator):
+    """Fit the preprocessing pipeline on every CV fold.
+
+    Returns (folds, fitted) where folds is a list of dicts with X_train /
+    y_train (after preprocessing and SMOTE) and X_test / y_test (preprocessed,
+    never resampled), and fitted holds the per-fold pipelines.
+    """
+    from sklearn.base import clone
+
+    folds, fitted = [], []
+    for train_idx, test_idx in fold_generator.split(X, y):
+        fold_pipeline = clone(pipeline)
+        X_train, y_train = fold_pipeline.fit_transform(X.iloc[train_idx], y.iloc[train_idx])
+        X_test = fold_pipeline.transform(X.iloc[test_idx])
+        folds.append({
+            "X_train": np.asarray(X_train, dtype=float),
+            "y_train": np.asarray(y_train),
+            "X_test": np.asarray(X_test, dtype=float),
+            "y_test": np.asarray(y.iloc[test_idx]),
+        })
+        fitted.append(fold_pipeline)
+    return folds, fitted
+
+
+def _dir_size(path):
+    return sum(f.stat().st_size for f in Path(path).rglob("*") if f.is_file())
+
+
+class TrainingCache:
+    """setup() experiment and per-fold preprocessing cache for train.py."""
+
+    def __init__(self, root=None, max_mb=None):
+        self.root = Path(root or os.environ.get("TRAIN_CACHE_DIR", DEFAULT_CACHE_DIR))
+        self.max_bytes = int(float(max_mb or os.environ.get("TRAIN_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024**2)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    # ---- setup() experiment ------------------------------------------------
+
+    def load_setup(self, key):
+        """Restore the setup() experiment for key as the current experiment, or None.
+
+        The experiment is registered with the functional API, so get_config,
+        compare_models, tune_model etc. continue to work as if setup() had run.
+        """
+        entry = self.root / key
+        if not (entry / "experiment.pkl").exists():
+            return None
+        import pandas as pd
+        from pycaret.classification import load_experiment
+
+        data = pd.read_parquet(entry / "data.parquet")
+        experiment = load_experiment(str(entry / "experiment.pkl"), data=data,
+                                     preprocess_data=False)
+        os.utime(entry)  # mark as recently used for eviction
+        return experiment
+
+    def save_setup(self, key, experiment):
+        """Store the experiment, its split data and transformed matrices under key."""
+        entry = self.root / key
+        partial = entry.with_name(entry.name + ".partial")
+        shutil.rmtree(partial, ignore_errors=True)
+        partial.mkdir(parents=True)
+
+        experiment.save_experiment(str(partial / "experiment.pkl"))
+        experiment.data.to_parquet(partial / "data.parquet")
+        experiment.X_train_transformed.to_parquet(partial / "X_train_transformed.parquet")
+        experiment.X_test_transformed.to_parquet(partial / "X_test_transformed.parquet")
+        with open(partial / "meta.json", "w") as f:
+            json.dump({"created": time.time(),
+                       "train_rows": len(experiment.X_train),
+                       "test_rows": len(experiment.X_test)}, f)
+
+        # Publish atomically so an interrupted run never leaves a half entry
+        shutil.rmtree(entry, ignore_errors=True)
+        partial.rename(entry)
+        self.evict()
+
+    # ---- per-fold preprocessing ----------------------------------------------
+
+    def fold_data(self, key, pipeline, X, y, fold_generator):
+        """Per-fold preprocessed arrays for key, computed and stored on first use."""
+        import joblib
+
+        folds_dir = self.root / key / "folds"
+        n_folds = fold_generator.get_n_splits(X, y)
+        paths = [folds_dir / f"fold_{i}.npz" for i in range(n_folds)]
+        if all(path.exists() for path in paths):
+            print(f" Cache hit: loaded {n_folds} preprocessed + SMOTE-resampled folds")
+            return [dict(np.load(path)) for path in paths]
+
+        start = time.perf_counter()
+        folds, fitted = prepare_folds(pipeline, X, y, fold_generator)
+        folds_dir.mkdir(parents=True, exist_ok=True)
+        for i, (fold, fold_pipeline) in enumerate(zip(folds, fitted)):
+            joblib.dump(fold_pipeline, folds_dir / f"fold_{i}_pipeline.pkl")
+            np.savez(folds_dir / f"fold_{i}.partial.npz", **fold)
+            os.replace(folds_dir / f"fold_{i}.partial.npz", paths[i])
+        print(f" Cache: preprocessed {n_folds} folds in {time.perf_counter() - start:.1f}s (stored for next run)")
+        self.evict()
+        return folds
+
+    # ---- housekeeping --------------------------------------------------------
+
+    def evict(self):
+        """Drop least-recently-used entries beyond the count or size limit."""
+        entries = sorted((p for p in self.root.iterdir() if p.is_dir()),
+                         key=lambda p: p.stat().st_mtime, reverse=True)
+        kept = 0
+        for i, entry in enumerate(entries):
+            size = _dir_size(entry)
+            # The newest entry is always kept, even if it alone is over budget
+            if i >= MAX_ENTRIES or (kept and kept + size > self.max_bytes):
+                shutil.rmtree(entry, ignore_errors=True)
+            else:
+                kept += size
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
@@ -0,0 +1,343 @@
+"""
+STUDENT DROPOUT PREDICTION - SEGMENTED TRAINING
+================================================
+Train and tune one model per segment of student_dropout_dataset.csv (e.g.
+per department or per year of study) in parallel, next to the global model
+from train.py.
+
+Each segment is an independent task on a process pool. A task runs its own
+PyCaret setup() on the segment's rows (same preprocessing and SMOTE as
+train.py), then tunes with successive halving (see halving_search.py).
+Tuning starts from the global model's estimator and settings, which are
+trial 0, so a segment only moves away from them when that helps on its own
+folds. ``--compare`` runs the parallel model comparison per segment first
+instead. Risk cutoffs are chosen on the segment's out-of-fold scores.
+
+The global model keeps serving a segment when:
+  - the segment has fewer than --min-rows rows or fewer than --min-class
+    rows of either class
+  - (--by department) the segment model's out-of-fold AUC is below the global
+    model's out-of-fold AUC on that department (student_dropout_oof.npz)
+    by more than --tolerance
+
+Every segment model is published to the model registry (see
+model_registry.py) and its segment alias moves to it. That is
+``prod:<Department>`` for departments and ``prod:<column>=<value>``
+otherwise. Segments that fall back have a stale alias removed.
+ModelRouter, which the app, the cohort dashboard, serve.py and
+risk_table.py score through, groups every batch by segment and sends each
+group to its model in one call. Retraining one faculty is just
+``--only Medicine``.
+
+Usage:
+    python train_segments.py                              # one model per department
+    python train_segments.py --by year_of_study --workers 4
+    python train_segments.py --only Medicine Engineering --n-trials 81
+    python train_segments.py --compare --report segments.json
+    python train_segments.py --no-publish                 # files under segments/ only
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+
+from data_io import drop_invalid, load_students
+from inference import SCORER_PATH, TARGET, load_scorer
+from model_registry import DEFAULT_ALIAS, ModelRegistry, segment_alias
+from schema import CATEGORICAL_FEATURES, FEATURES, NUMERIC_FEATURES
+from thresholds import OOF_PATH, load_out_of_fold
+
+DATA_PATH = "student_dropout_dataset.csv"
+SEGMENTS_DIR = "segments"
+FILL_VALUES = {"scholarship_status": "None"}
+SETUP_PARAMS = dict(
+    target=TARGET,
+    session_id=42,
+    fix_imbalance=True,
+    normalize=True,
+    fold=5,
+    categorical_features=CATEGORICAL_FEATURES,
+    numeric_features=NUMERIC_FEATURES,
+)
+MIN_ROWS = 250
+MIN_CLASS_ROWS = 50
+N_TRIALS = 27
+TOLERANCE = 0.01
+
+
+def load_data(path=DATA_PATH):
+    """The training data with train.py's cleaning; rows failing the schema are dropped."""
+    data, report = drop_invalid(load_students(path).fillna(FILL_VALUES))
+    if report.missing_columns:
+        raise ValueError(f"{path} is missing feature columns: {report.missing_columns}")
+    return data, report.n_invalid
+
+
+def plan_segments(data, by, min_rows=MIN_ROWS, min_class_rows=MIN_CLASS_ROWS, only=None):
+    """[(value, rows, dropouts, reason or None)] per segment, largest first.
+
+    ``reason`` says why a segment stays on the global model.
+    """
+    if by not in data.columns or by == TARGET:
+        raise ValueError(f"Can't segment by {by!r}: not a feature column")
+    counts = data.groupby(by, observed=True)[TARGET].agg(["size", "sum"]).sort_values("size", ascending=False)
+    plan = []
+    for value, (rows, dropouts) in counts.iterrows():
+        if only and str(value) not in only:
+            continue
+        reason = None
+        if rows < min_rows:
+            reason = f"{rows} rows < {min_rows}"
+        elif min(dropouts, rows - dropouts) < min_class_rows:
+            reason = f"{min(dropouts, rows - dropouts)} rows in the smaller class < {min_class_rows}"
+        plan.append((value, int(rows), int(dropouts), reason))
+    return plan
+
+
+def global_baseline(by, value, path=OOF_PATH):
+    """Global model's out-of-fold AUC on a department, or None if not available."""
+    if by != "department" or not os.path.exists(path):
+        return None
+    from sklearn.metrics import roc_auc_score
+
+    probability, y, department = load_out_of_fold(path)
+    rows = department == str(value)
+    if rows.sum() < 2 or len(np.unique(y[rows])) < 2:
+        return None
+    return float(roc_auc_score(y[rows], probability[rows]))
+
+
+def train_segment(by, value, data, options):
+    """Train, tune and export one segment's model; runs in a pool worker.
+
+    Returns the segment's report: metrics, timings and the directory holding
+    its files (named as in the registry: model.pkl, scorer.pkl, ...).
+    """
+    from pycaret.classification import create_model, finalize_model, get_config, models, pull, save_model, setup
+    from sklearn.base import clone
+    from sklearn.metrics import roc_auc_score
+
+    from attributions import export_explainer
+    from halving_search import model_id, successive_halving
+    from inference import export_scorer
+    from model_artifact import export_artifact
+    from parallel_compare import compare_models_parallel, turbo_candidates
+    from thresholds import export_thresholds, out_of_fold_probability
+    from train_cache import prepare_folds
+
+    timings = {}
+    start = stage = time.perf_counter()
+    setup(data=data, **SETUP_PARAMS, verbose=False, html=False, n_jobs=1)
+    folds, _ = prepare_folds(get_config('pipeline'), get_config('X_train'), get_config('y_train'),
+                             get_config('fold_generator'))
+    timings["setup"] = time.perf_counter() - stage
+    stage = time.perf_counter()
+
+    table = models(internal=True)
+    if options["compare"]:
+        best_id, _ = compare_models_parallel(turbo_candidates(table), folds, n_jobs=1)
+        estimator = clone(table.loc[best_id, "Class"](**table.loc[best_id, "Args"]))
+    else:
+        estimator = clone(options["estimator"])
+    params, trials = successive_halving(estimator, table.loc[model_id(estimator, table), "Tune Grid"],
+                                        folds, n_trials=options["n_trials"], n_jobs=1, verbose=False)
+    estimator.set_params(**params)
+    tuned_model = create_model(clone(estimator), verbose=False)
+    cv = pull()
+    timings["tune"] = time.perf_counter() - stage
+    stage = time.perf_counter()
+
+    final_model = finalize_model(tuned_model)
+    directory = Path(options["output"]) / f"{by}={value}"
+    directory.mkdir(parents=True, exist_ok=True)
+    model_name = str(directory / "model")
+    save_model(final_model, model_name, verbose=False)
+    export_scorer(final_model, directory / "scorer.pkl")
+    try:
+        export_artifact(final_model, str(directory / "scorer.bin"), model_name=model_name)
+    except ValueError:
+        pass
+    try:
+        export_explainer(final_model, directory / "explainer.pkl", model_name=model_name,
+                         data_path=options["data_path"])
+    except ValueError:
+        pass
+    timings["finalize"] = time.perf_counter() - stage
+    stage = time.perf_counter()
+
+    probability, y = out_of_fold_probability(estimator, folds)
+    thresholds = export_thresholds(probability, y, costs=options["costs"], by_department=False,
+                                   path=directory / "thresholds.json", model_name=model_name)
+    timings["thresholds"] = time.perf_counter() - stage
+    timings["total"] = time.perf_counter() - start
+    return {
+        "value": value,
+        "directory": str(directory),
+        "model": type(estimator).__name__,
+        "trials": len(trials),
+        "metrics": {"recall": float(cv.loc['Mean', 'Recall']), "precision": float(cv.loc['Mean', 'Prec.']),
+                    "f1": float(cv.loc['Mean', 'F1']), "auc": float(cv.loc['Mean', 'AUC']),
+                    "model": type(estimator).__name__},
+        "oof_auc": float(roc_auc_score(y, probability)),
+        "cutoffs": (thresholds["overall"]["high"], thresholds["overall"]["moderate"]),
+        "timings": timings,
+        "pid": os.getpid(),
+    }
+
+
+def train_segments(by="department", data_path=DATA_PATH, workers=None, only=None,
+                   min_rows=MIN_ROWS, min_class_rows=MIN_CLASS_ROWS, n_trials=N_TRIALS,
+                   compare=False, tolerance=TOLERANCE, costs=None, output=SEGMENTS_DIR, verbose=True):
+    """Train every eligible segment on a process pool; returns the run report."""
+    start = time.perf_counter()
+    data, rejected = load_data(data_path)
+    plan = plan_segments(data, by, min_rows, min_class_rows, only)
+    options = {"compare": compare, "n_trials": n_trials, "costs": costs, "output": output,
+               "data_path": data_path, "estimator": load_scorer(SCORER_PATH).estimator}
+    segments = {value: {"value": value, "rows": rows, "dropouts": dropouts,
+                        "status": "global" if reason else "trained", "reason": reason}
+                for value, rows, dropouts, reason in plan}
+    eligible = [value for value, *_, reason in plan if reason is None]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(eligible) or 1))
+    if verbose:
+        print(f" {len(plan)} segments by {by}: {len(eligible)} to train on {workers} worker(s), "
+              f"{len(plan) - len(eligible)} stay on the global model")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(train_segment, by, value, data[data[by] == value].reset_index(drop=True),
+                               options): value for value in eligible}
+        for future in as_completed(futures):
+            value = futures[future]
+            segment = segments[value]
+            try:
+                segment.update(future.result())
+            except Exception as exc:  # one bad segment shouldn't sink the others
+                segment.update(status="global", reason=f"training failed: {exc}")
+                if verbose:
+                    print(f" {by}={value}: training failed ({exc}) - global model kept")
+                continue
+            baseline = global_baseline(by, value)
+            segment["global_oof_auc"] = baseline
+            if baseline is not None and segment["oof_auc"] < baseline - tolerance:
+                segment.update(status="global", reason=f"out-of-fold AUC {segment['oof_auc']:.3f} "
+                                                       f"< global {baseline:.3f}")
+            if verbose:
+                print(f" {by}={value}: {segment['model']} in {segment['timings']['total']:.1f}s "
+                      f"(recall {segment['metrics']['recall']:.3f}, AUC {segment['oof_auc']:.3f}"
+                      + (f" vs global {baseline:.3f}" if baseline is not None else "") + ")")
+
+    wall = time.perf_counter() - start
+    busy = sum(s["timings"]["total"] for s in segments.values() if "timings" in s)
+    return {"by": by, "data_path": data_path, "rows": len(data), "rejected": rejected,
+            "workers": workers, "seconds": wall, "segment_seconds": busy,
+            "segments": list(segments.values())}
+
+
+def publish_segments(report, aliases=(DEFAULT_ALIAS,), registry=None):
+    """Publish trained segments and move their segment aliases; drop stale ones.
+
+    Returns {segment value: version} for the published segments.
+    """
+    registry = registry or ModelRegistry()
+    published = {}
+    existing = registry.aliases()
+    for segment in report["segments"]:
+        names = [segment_alias(alias, report["by"], segment["value"]) for alias in aliases]
+        if segment["status"] == "trained":
+            directory = Path(segment["directory"])
+            files = {path.name: str(path) for path in directory.iterdir()
+                     if path.name in ("scorer.pkl", "scorer.bin", "explainer.pkl", "thresholds.json")}
+            files["model.pkl"] = str(directory / "model.pkl")
+            published[segment["value"]] = registry.publish(
+                files, metrics=segment["metrics"], data_path=report["data_path"], aliases=names,
+                source="train_segments.py", notes=f"segment {report['by']}={segment['value']}")
+        else:
+            for name in names:
+                if name in existing:
+                    registry.remove_alias(name)
+    return published
+
+
+def print_report(report, published=None):
+    published = published or {}
+    print(f"\n {'Segment':<28}{'Rows':>7}{'Recall':>8}{'AUC':>7}{'Global':>8}{'Seconds':>9}  Serves")
+    for segment in report["segments"]:
+        label = f"{report['by']}={segment['value']}"
+        if "timings" in segment:
+            baseline = segment.get("global_oof_auc")
+            print(f" {label:<28}{segment['rows']:>7}{segment['metrics']['recall']:>8.3f}"
+                  f"{segment['oof_auc']:>7.3f}{'-' if baseline is None else f'{baseline:.3f}':>8}"
+                  f"{segment['timings']['total']:>9.1f}  "
+                  + (published.get(segment["value"], "segment model") if segment["status"] == "trained"
+                     else f"global ({segment['reason']})"))
+        else:
+            print(f" {label:<28}{segment['rows']:>7}{'-':>8}{'-':>7}{'-':>8}{'-':>9}  global ({segment['reason']})")
+    speedup = report["segment_seconds"] / max(report["seconds"], 1e-9)
+    print(f"\n Wall clock {report['seconds']:.1f}s for {report['segment_seconds']:.1f}s of segment "
+          f"training on {report['workers']} worker(s) ({speedup:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train one dropout model per segment in parallel.")
+    parser.add_argument("--by", default="department",
+                        help="segment column, e.g. department or year_of_study (default: department)")
+    parser.add_argument("--data", default=DATA_PATH, help=f"training data (default: {DATA_PATH})")
+    parser.add_argument("--only", nargs="+", metavar="VALUE", help="train just these segments")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="segments trained at once (default: all cores)")
+    parser.add_argument("--min-rows", type=int, default=MIN_ROWS,
+                        help=f"smaller segments keep the global model (default: {MIN_ROWS})")
+    parser.add_argument("--min-class", type=int, default=MIN_CLASS_ROWS,
+                        help=f"minimum rows of each class (default: {MIN_CLASS_ROWS})")
+    parser.add_argument("--n-trials", type=int, default=N_TRIALS,
+                        help=f"tuning configurations per segment (default: {N_TRIALS})")
+    parser.add_argument("--compare", action="store_true",
+                        help="pick each segment's model family by parallel comparison first")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help=f"allowed out-of-fold AUC loss vs the global model (default: {TOLERANCE})")
+    parser.add_argument("--miss-cost", type=float, default=None,
+                        help="cost of a missed dropout when choosing risk cutoffs (see thresholds.py)")
+    parser.add_argument("--alias", action="append",
+                        help=f"base alias(es) for the segment aliases (default: {DEFAULT_ALIAS})")
+    parser.add_argument("--no-publish", action="store_true",
+                        help=f"leave the segment files under {SEGMENTS_DIR}/ without publishing")
+    parser.add_argument("--report", metavar="PATH", help="also write the report as JSON")
+    args = parser.parse_args()
+
+    if args.by not in FEATURES:
+        parser.error(f"--by {args.by}: not a feature in schema.py")
+
+    print("=" * 70)
+    print("STUDENT DROPOUT PREDICTION - SEGMENTED TRAINING")
+    print("=" * 70)
+    print(f"\n Data: {args.data}")
+    print(f" Segments: {args.by}" + (f" ({', '.join(args.only)})" if args.only else "") + "\n")
+
+    costs = {"miss_cost": args.miss_cost} if args.miss_cost is not None else None
+    report = train_segments(args.by, args.data, args.workers, args.only, args.min_rows, args.min_class,
+                            args.n_trials, args.compare, args.tolerance, costs)
+    published = {}
+    if not args.no_publish:
+        published = publish_segments(report, args.alias or [DEFAULT_ALIAS])
+    print_report(report, published)
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({**report, "published": published}, f, indent=2, default=str)
+
+    print("\n" + "=" * 70)
+    trained = sum(s["status"] == "trained" for s in report["segments"])
+    print(f" {trained} segment model(s), {len(report['segments']) - trained} segment(s) on the global model")
+    if published:
+        print(f" Published: {', '.join(f'{value} -> {version}' for value, version in published.items())}")
+        print("   Running apps route these segments to their models on the next request.")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+"""
+STUDENT DROPOUT PREDICTION - OUT-OF-CORE TRAINING
+=================================================
+Trains on datasets larger than RAM by streaming them in chunks.
+
+train.py loads the whole dataset and lets PyCaret balance it with SMOTE,
+which materialises synthetic minority rows and runs a nearest-neighbour
+search over all of them. Here only one chunk is ever in memory:
+
+1. Statistics pass: per-feature means and variances (merged chunk by chunk
+   with Chan's parallel update), category counts and class counts. These
+   give the imputation values, the ordinal / one-hot encoders and the
+   z-score scaler directly - a one-hot column's mean and variance follow
+   from its category share - so no second pass is needed to fit them.
+2. Training passes (``--epochs``): each chunk is encoded with those fixed
+   statistics and fed to an estimator that learns chunk by chunk:
+   ``sgd`` (logistic regression by SGD, partial_fit) or ``lightgbm``
+   (histogram-based boosting, continued for ``--rounds`` trees per chunk).
+   Class imbalance is handled inside the stream by class weights from the
+   statistics pass (``--balance weight``) or by undersampling the majority
+   class per chunk (``--balance undersample``).
+3. Evaluation pass: a holdout of ``--holdout`` of the rows (chosen per
+   chunk with a fixed seed, and never trained on) is scored into
+   fixed-size probability histograms for recall, precision, F1 and AUC.
+
+The result is saved as a DropoutScorer (see inference.py), the same format
+app.py and serve.py load, and with ``--alias`` published to the model
+registry (see model_registry.py). Peak RSS is reported against the dataset
+size.
+
+Usage:
+    python train_streaming.py students_10m.csv
+    python train_streaming.py students.parquet --estimator lightgbm --chunksize 200000
+    python train_streaming.py students.csv --balance undersample --report streaming.json
+    python train_streaming.py students.csv --alias canary     # serve it to the canary share
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+
+import numpy as np
+
+from data_io import DEFAULT_CHUNKSIZE, iter_students
+from inference import DropoutScorer, _encoder
+from schema import CATEGORICAL_FEATURES, FEATURE_NAMES, NUMERIC_FEATURES, TARGET, validate
+
+DATA_PATH = "student_dropout_dataset.csv"
+OUTPUT_PATH = "student_dropout_streaming_scorer.pkl"
+FILL_VALUES = {"scholarship_status": "None"}
+METRIC_BINS = 1000
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+class StreamingStats:
+    """Preprocessing statistics accumulated one chunk at a time."""
+
+    def __init__(self, numeric_features=NUMERIC_FEATURES, categorical_features=CATEGORICAL_FEATURES):
+        self.numeric_features = list(numeric_features)
+        self.categorical_features = list(categorical_features)
+        self.rows = 0
+        self.count = np.zeros(len(self.numeric_features))
+        self.mean = np.zeros(len(self.numeric_features))
+        self.m2 = np.zeros(len(self.numeric_features))
+        self.category_counts = {feature: {} for feature in self.categorical_features}
+        self.classes = np.zeros(2, dtype=np.int64)
+        self.frame_bytes = 0
+
+    def update(self, X, y):
+        values = X[self.numeric_features].to_numpy(dtype=float)
+        observed = ~np.isnan(values)
+        n = observed.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            chunk_mean = np.where(n > 0, np.nansum(values, axis=0) / np.maximum(n, 1), 0.0)
+        chunk_m2 = np.nansum((values - chunk_mean) ** 2, axis=0)
+        # Chan et al.: merge (count, mean, M2) of the chunk into the running totals
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        share = np.divide(n, total, out=np.zeros_like(total), where=total > 0)
+        self.mean += delta * share
+        self.m2 += chunk_m2 + delta**2 * self.count * share
+        self.count = total
+
+        for feature in self.categorical_features:
+            counts = self.category_counts[feature]
+            for value, count in X[feature].value_counts().items():
+                if count:
+                    counts[str(value)] = counts.get(str(value), 0) + int(count)
+        self.classes += np.bincount(y, minlength=2)[:2]
+        self.rows += len(X)
+        self.frame_bytes += int(X.memory_usage(deep=True).sum())
+
+    def scorer(self, estimator=None):
+        """A DropoutScorer with imputation, encoders and scaler from the statistics."""
+        output_columns = list(self.numeric_features)
+        scale_mean = list(self.mean)
+        # Mean imputation leaves the mean alone and adds zero deviation
+        scale_var = list(self.m2 / max(self.rows, 1))
+        categorical_fill, encoders = [], {}
+        for feature in self.categorical_features:
+            counts = dict(self.category_counts[feature])
+            if not counts:
+                raise ValueError(f"{feature}: no values in the training rows")
+            mode = max(counts, key=counts.get)
+            categorical_fill.append(mode)
+            # Missing values are imputed with the mode before encoding
+            counts[mode] += self.rows - sum(counts.values())
+            categories = sorted(counts)
+            shares = np.array([counts[c] for c in categories]) / max(self.rows, 1)
+            if len(categories) == 2:
+                encoders[feature] = _encoder("ordinal", categories, [0, 1], position=len(output_columns))
+                output_columns.append(feature)
+                scale_mean.append(shares[1])
+                scale_var.append(shares[1] * (1 - shares[1]))
+            else:
+                positions = range(len(output_columns), len(output_columns) + len(categories))
+                encoders[feature] = _encoder("onehot", categories, positions)
+                output_columns += [f"{feature}_{c}" for c in categories]
+                scale_mean += list(shares)
+                scale_var += list(shares * (1 - shares))
+
+        scale_std = np.sqrt(np.asarray(scale_var))
+        return DropoutScorer(
+            feature_names=[f for f in FEATURE_NAMES
+                           if f in self.numeric_features or f in self.categorical_features],
+            numeric_features=self.numeric_features,
+            numeric_fill=self.mean,
+            categorical_features=self.categorical_features,
+            categorical_fill=categorical_fill,
+            encoders=encoders,
+            output_columns=output_columns,
+            scale_mean=scale_mean,
+            scale_std=np.where(scale_std > 0, scale_std, 1.0),  # like StandardScaler
+            estimator=estimator,
+        )
+
+
+class StreamingMetrics:
+    """Recall, precision, F1 and AUC from fixed-size probability histograms."""
+
+    def __init__(self, bins=METRIC_BINS):
+        self.bins = bins
+        self.histogram = np.zeros((2, bins), dtype=np.int64)
+
+    def update(self, probability, y):
+        which = np.minimum((np.asarray(probability) * self.bins).astype(int), self.bins - 1)
+        self.histogram += np.bincount(which + np.asarray(y) * self.bins,
+                                      minlength=2 * self.bins).reshape(2, self.bins)
+
+    def summary(self, threshold=0.5):
+        negative, positive = self.histogram
+        cut = int(round(threshold * self.bins))
+        tp, fp = positive[cut:].sum(), negative[cut:].sum()
+        n_positive, n_negative = positive.sum(), negative.sum()
+        recall = tp / max(n_positive, 1)
+        precision = tp / max(tp + fp, 1)
+        # Pairs ranked correctly; ties within a bin count half
+        below = np.cumsum(negative) - negative
+        auc = float(np.sum(positive * (below + 0.5 * negative))) / max(n_positive * n_negative, 1)
+        return {
+            "rows": int(n_positive + n_negative),
+            "recall": float(recall),
+            "precision": float(precision),
+            "f1": float(2 * precision * recall / max(precision + recall, 1e-12)),
+            "auc": auc,
+        }
+
+
+def stream(path, chunksize, rejected=None):
+    """Yield (chunk index, X, y) with invalid rows dropped."""
+    for index, chunk in enumerate(iter_students(path, chunksize)):
+        if TARGET not in chunk.columns:
+            raise ValueError(f"{path} has no {TARGET} column")
+        for column, value in FILL_VALUES.items():
+            if column in chunk.columns and chunk[column].isna().any():
+                if hasattr(chunk[column], "cat") and value not in chunk[column].cat.categories:
+                    chunk[column] = chunk[column].cat.add_categories(value)
+                chunk[column] = chunk[column].fillna(value)
+        report = validate(chunk)
+        if report.missing_columns:
+            raise ValueError(f"missing columns: {', '.join(report.missing_columns)}")
+        valid_target = chunk[TARGET].isin([0, 1]).to_numpy()
+        keep = ~report.invalid & valid_target
+        if rejected is not None:
+            rejected[0] += int((~keep).sum())
+        chunk = chunk[keep]
+        if len(chunk):
+            yield index, chunk, chunk[TARGET].to_numpy(dtype=np.int64)
+
+
+def holdout_mask(n, index, fraction, seed):
+    """The same rows of chunk ``index`` are held out on every pass."""
+    return np.random.default_rng([seed, index]).random(n) < fraction
+
+
+def make_estimator(name, rounds, seed):
+    if name == "sgd":
+        from sklearn.linear_model import SGDClassifier
+        return SGDClassifier(loss="log_loss", alpha=1e-3, random_state=seed)
+    try:
+        from lightgbm import LGBMClassifier
+    except ImportError as exc:
+        raise SystemExit("--estimator lightgbm needs the lightgbm package (pip install lightgbm)") from exc
+    return LGBMClassifier(n_estimators=rounds, learning_rate=0.1, num_leaves=31,
+                          random_state=seed, verbose=-1)
+
+
+def fit_chunk(estimator, Z, y, weight):
+    if type(estimator).__name__ == "SGDClassifier":
+        estimator.partial_fit(Z, y, classes=[0, 1], sample_weight=weight)
+    elif len(np.unique(y)) == 2:
+        # Continue boosting from the trees fitted on earlier chunks
+        init_model = estimator.booster_ if estimator.__sklearn_is_fitted__() else None
+        estimator.fit(Z, y, sample_weight=weight, init_model=init_model)
+
+
+def train_streaming(path=DATA_PATH, chunksize=DEFAULT_CHUNKSIZE, estimator="sgd", epochs=3,
+                    rounds=25, balance="weight", holdout=0.1, seed=42, verbose=True):
+    """Fit a DropoutScorer without loading ``path``; returns (scorer, report)."""
+    say = print if verbose else (lambda *a, **k: None)
+    model = make_estimator(estimator, rounds, seed)  # imported first so the baseline includes it
+    report = {"path": path, "chunksize": chunksize, "estimator": estimator, "epochs": epochs,
+              "balance": balance, "disk_mb": os.path.getsize(path) / 1024**2,
+              "baseline_rss_mb": peak_rss_mb(), "passes": []}
+
+    def finished(name, start):
+        report["passes"].append({"pass": name, "seconds": time.perf_counter() - start,
+                                 "peak_rss_mb": peak_rss_mb()})
+        say(f" {name}: {report['passes'][-1]['seconds']:.1f}s, peak RSS {peak_rss_mb():.0f} MB")
+
+    # 1. Statistics
+    start = time.perf_counter()
+    stats, rejected, chunks = StreamingStats(), [0], 0
+    for index, X, y in stream(path, chunksize, rejected):
+        train = ~holdout_mask(len(X), index, holdout, seed)
+        stats.update(X[train], y[train])
+        chunks += 1
+    if not stats.rows or stats.classes.min() == 0:
+        raise ValueError("Need training rows of both classes")
+    scorer = stats.scorer()
+    finished("statistics", start)
+    say(f"   {stats.rows:,} training rows in {chunks} chunks, {rejected[0]:,} invalid rows skipped, "
+        f"{len(scorer.output_columns)} encoded columns, dropout rate {stats.classes[1] / stats.rows:.1%}")
+
+    # 2. Training
+    class_weight = stats.rows / (2 * stats.classes)
+    minority = int(np.argmin(stats.classes))
+    keep_majority = stats.classes[minority] / stats.classes[1 - minority]
+    for epoch in range(epochs):
+        start = time.perf_counter()
+        for index, X, y in stream(path, chunksize):
+            train = ~holdout_mask(len(X), index, holdout, seed)
+            rng = np.random.default_rng([seed, index, epoch + 1])
+            if balance == "undersample":
+                train &= (y == minority) | (rng.random(len(y)) < keep_majority)
+            order = rng.permutation(np.flatnonzero(train))  # SGD is sensitive to row order
+            if not len(order):
+                continue
+            Z, target = scorer.transform(X.iloc[order]), y[order]
+            weight = class_weight[target] if balance == "weight" else None
+            fit_chunk(model, Z, target, weight)
+        finished(f"epoch {epoch + 1}/{epochs}", start)
+    scorer.estimator = model
+
+    # 3. Holdout evaluation
+    start = time.perf_counter()
+    metrics = StreamingMetrics()
+    for index, X, y in stream(path, chunksize):
+        held = holdout_mask(len(X), index, holdout, seed)
+        if held.any():
+            metrics.update(scorer.dropout_probability(X[held]), y[held])
+    finished("evaluation", start)
+
+    n_out = len(scorer.output_columns)
+    report.update({
+        "rows": stats.rows + metrics.summary()["rows"],
+        "training_rows": stats.rows,
+        "invalid_rows": rejected[0],
+        "holdout": metrics.summary(),
+        "dataframe_mb": stats.frame_bytes / 1024**2,
+        "encoded_matrix_mb": stats.rows * n_out * 8 / 1024**2,
+        "smote_matrix_mb": 2 * int(stats.classes.max()) * n_out * 8 / 1024**2,
+        "peak_rss_mb": peak_rss_mb(),
+    })
+    return scorer, report
+
+
+def print_report(report):
+    holdout = report["holdout"]
+    print(f"\n Holdout ({holdout['rows']:,} rows): Recall {holdout['recall']:.4f}, "
+          f"Precision {holdout['precision']:.4f}, F1 {holdout['f1']:.4f}, AUC {holdout['auc']:.4f}")
+    print(f"\n Memory for {report['rows']:,} rows:")
+    print(f"   {'Dataset on disk':<44}{report['disk_mb']:>10.1f} MB")
+    print(f"   {'Training rows as a typed DataFrame':<44}{report['dataframe_mb']:>10.1f} MB")
+    print(f"   {'Training rows as the encoded float matrix':<44}{report['encoded_matrix_mb']:>10.1f} MB")
+    print(f"   {'SMOTE-balanced encoded matrix (train.py)':<44}{report['smote_matrix_mb']:>10.1f} MB")
+    print(f"   {'Peak RSS of this process':<44}{report['peak_rss_mb']:>10.1f} MB "
+          f"({report['peak_rss_mb'] - report['baseline_rss_mb']:.1f} MB above the "
+          f"{report['baseline_rss_mb']:.0f} MB after imports)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train on a dataset larger than RAM, one chunk at a time.")
+    parser.add_argument("path", nargs="?", default=DATA_PATH,
+                        help=f".csv / .csv.gz, .parquet or .arrow dataset (default: {DATA_PATH})")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+                        help=f"rows per chunk (default: {DEFAULT_CHUNKSIZE})")
+    parser.add_argument("--estimator", choices=["sgd", "lightgbm"], default="sgd",
+                        help="sgd: logistic regression by partial_fit; lightgbm: boosting continued per chunk")
+    parser.add_argument("--epochs", type=int, default=3, help="passes over the data (default: 3)")
+    parser.add_argument("--rounds", type=int, default=25,
+                        help="lightgbm trees added per chunk and epoch (default: 25)")
+    parser.add_argument("--balance", choices=["weight", "undersample", "none"], default="weight",
+                        help="class imbalance: class weights or per-chunk undersampling (default: weight)")
+    parser.add_argument("--holdout", type=float, default=0.1,
+                        help="share of rows held out for evaluation (default: 0.1)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=OUTPUT_PATH, help=f"scorer file to write (default: {OUTPUT_PATH})")
+    parser.add_argument("--report", metavar="PATH", help="also write timings, metrics and memory as JSON")
+    parser.add_argument("--alias", action="append",
+                        help="publish to the model registry and point this alias at it (repeatable)")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("STUDENT DROPOUT PREDICTION - OUT-OF-CORE TRAINING")
+    print("=" * 70)
+    print(f"\n Streaming {args.path} in chunks of {args.chunksize:,} rows "
+          f"({args.estimator}, balance={args.balance})...")
+    scorer, report = train_streaming(args.path, args.chunksize, args.estimator, args.epochs,
+                                     args.rounds, args.balance, args.holdout, args.seed)
+    print_report(report)
+    scorer.save(args.output)
+    print(f"\n Scorer saved as: {args.output}")
+    if args.alias:
+        from model_registry import ModelRegistry
+        version = ModelRegistry().publish(
+            files={"scorer.pkl": args.output}, metrics=report["holdout"], data_path=args.path,
+            aliases=args.alias, source="train_streaming.py", notes=f"{args.estimator}, balance={args.balance}")
+        print(f" Published to the model registry as {version} ({', '.join(args.alias)})")
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f" Report saved as: {args.report}")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+STUDENT DROPOUT PREDICTION - WHAT-IF SWEEPS
+============================================
+"What if attendance rises to 85%?" for one student, answered in one call.
+
+A sweep takes a student record, varies one or two features over their
+schema.py ranges or categories (the full grid for two) and scores every
+variant in a single batched dropout_probability call, so a whole curve or
+heat map costs about as much as scoring one small cohort.
+
+Usage:
+    python what_if.py current_cgpa                                # dataset row 0
+    python what_if.py current_cgpa attendance_percentage --row 12
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from schema import FEATURES, STEM_DEPARTMENTS
+
+# Demographics describe who the student is, not something that can change
+FIXED = {'gender', 'state_of_origin', 'marital_status', 'has_children',
+         'secondary_school_type', 'family_income_level', 'is_stem'}
+# Wide integer ranges are stepped more coarsely; floats always step by 0.1
+STEPS = {'admission_score': 5, 'distance_from_home_km': 10}
+
+
+def _values(feature, spec):
+    if spec["type"] == "categorical":
+        return np.array(spec["values"], dtype=object)
+    low, high = spec["range"]
+    if spec["type"] == "float":
+        return np.round(np.arange(low, high + 1e-9, 0.1), 1)
+    return np.arange(low, high + 1, STEPS.get(feature, 1))
+
+
+# Feature -> values to try, over the schema's categories and ranges
+SWEEPS = {feature: _values(feature, spec) for feature, spec in FEATURES.items()
+          if feature not in FIXED}
+
+
+def variants(student, grid):
+    """The student repeated over every combination of ``grid`` ({feature: values}).
+
+    Rows follow np.meshgrid(..., indexing="ij") order, so the first feature
+    varies slowest. is_stem is kept consistent with department.
+    """
+    features = list(grid)
+    mesh = np.meshgrid(*[np.asarray(grid[f]) for f in features], indexing="ij")
+    n = mesh[0].size
+    batch = {name: np.full(n, value, dtype=object) for name, value in student.items()}
+    for feature, values in zip(features, mesh):
+        batch[feature] = values.ravel()
+    if 'department' in grid and 'is_stem' in batch:
+        batch['is_stem'] = np.isin(batch['department'], STEM_DEPARTMENTS).astype(int)
+    return pd.DataFrame(batch)
+
+
+def sweep(model, student, features, grid=None):
+    """Dropout probability for every combination of one or two swept features.
+
+    ``student`` is a dict of the 41 inputs, as built by app.py. Values come
+    from ``grid`` ({feature: values}) or SWEEPS. Returns (axes, probability)
+    where ``axes`` is a list of value arrays and ``probability`` has shape
+    ``[len(a) for a in axes]``.
+    """
+    grid = grid or {}
+    axes = [np.asarray(grid.get(f, SWEEPS[f])) for f in features]
+    batch = variants(student, dict(zip(features, axes)))
+    probability = np.asarray(model.dropout_probability(batch), dtype=float)
+    return axes, probability.reshape([len(a) for a in axes])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="What-if sweeps for one student.")
+    parser.add_argument("features", nargs="+", choices=sorted(SWEEPS), metavar="feature",
+                        help="one or two features to vary")
+    parser.add_argument("--row", type=int, default=0, help="dataset row to start from (default: 0)")
+    parser.add_argument("--data", default="student_dropout_dataset.csv", help="dataset CSV")
+    args = parser.parse_args()
+    if len(args.features) > 2:
+        parser.error("sweep at most two features at once")
+
+    from inference import TARGET, load_scoring_model
+
+    print("=" * 70)
+    print("STUDENT DROPOUT PREDICTION - WHAT-IF SWEEP")
+    print("=" * 70)
+    data = pd.read_csv(args.data, keep_default_na=False, na_values=[""])
+    student = data.drop(columns=[TARGET]).iloc[args.row].to_dict()
+    model = load_scoring_model()
+    model.dropout_probability(student)  # first call pays one-off setup costs
+
+    start = time.perf_counter()
+    axes, probability = sweep(model, student, args.features)
+    elapsed = time.perf_counter() - start
+    print(f"\n Student {args.row}: {probability.size:,} variants scored in {elapsed * 1000:.1f} ms")
+
+    if len(axes) == 1:
+        feature = args.features[0]
+        print(f"\n {feature:<28} dropout probability   (current: {student[feature]})")
+        for value, p in zip(axes[0], probability):
+            print(f"   {str(value):<26} {p:6.1%}  {'#' * int(round(p * 40))}")
+    else:
+        rows, columns = args.features
+        # At most ~15 values per axis fit on a terminal line
+        row_step, column_step = (-(-len(axis) // 15) for axis in axes)
+        width = max(8, max(len(str(v)) for v in axes[1]) + 2)
+        label = max(8, max(len(str(v)) for v in axes[0]))
+        print(f"\n Rows: {rows} (every {row_step}), columns: {columns} (every {column_step})")
+        print("   " + " " * label + "".join(f"{str(v):>{width}}" for v in axes[1][::column_step]))
+        for value, line in zip(axes[0][::row_step], probability[::row_step, ::column_step]):
+            print(f"   {str(value):>{label}}" + "".join(f"{p:>{width}.0%}" for p in line))
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()